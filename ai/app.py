@@ -1,17 +1,43 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, Response
 from flask_cors import CORS
 from routes.cv_routes import cv_bp
 from routes.chatbot_routes import chatbot_bp
+from routes.common import SESSION_HEADER
 from routes.scholarship_routes import scholarship_bp
+from services.response_cache import get_cache_stats
+from services.metrics import HTTP_REQUESTS, HTTP_REQUEST_DURATION, render_metrics
+from services.lazy import warmup
+from services.llm_client import get_llm_client
+import multiprocessing
 import os
+import threading
+import time
 
 app = Flask(__name__)
-CORS(app)
+CORS(
+    app,
+    origins=[origin.strip() for origin in os.getenv('CORS_ORIGINS', '*').split(',')],
+    allow_headers=['Content-Type', SESSION_HEADER],
+    expose_headers=[SESSION_HEADER]
+)
 
 app.register_blueprint(cv_bp, url_prefix='/api/cv')
 app.register_blueprint(chatbot_bp, url_prefix='/api/chatbot')
 app.register_blueprint(scholarship_bp, url_prefix='/api/scholarship')
 
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method=request.method, endpoint=endpoint)
+        HTTP_REQUESTS.inc(method=request.method, endpoint=endpoint, status=response.status_code)
+    return response
+
 @app.route('/', methods=['GET'])
 def health_check():
     return jsonify({"status": "CV Analyzer API is running"})
@@ -22,12 +48,48 @@ def api_health():
         "status": "healthy",
         "endpoints": {
             "cv_analysis": "/api/cv/analyze",
+            "cv_analysis_stream": "/api/cv/analyze/stream",
+            "cv_analysis_async": "/api/cv/analyze/async",
+            "cv_analysis_batch": "/api/cv/analyze-batch",
             "chatbot": "/api/chatbot/chat",
+            "chatbot_stream": "/api/chatbot/chat/stream",
             "scholarship_timeline": "/api/scholarship/timeline",
             "university_scholarships": "/api/scholarship/university-scholarships",
-            "preparation_timeline": "/api/scholarship/preparation-timeline"
-        }
+            "preparation_timeline": "/api/scholarship/preparation-timeline",
+            "metrics": "/api/metrics",
+            "warmup": "/api/warmup"
+        },
+        "caches": get_cache_stats()
     })
 
+def warm_services():
+    timings = warmup()
+    try:
+        get_llm_client().get_model()
+    except Exception:
+        pass
+    return timings
+
+@app.route('/api/warmup', methods=['GET', 'POST'])
+def api_warmup():
+    start = time.perf_counter()
+    timings = warm_services()
+    return jsonify({"status": "warm", "duration_s": round(time.perf_counter() - start, 4), "timings": timings})
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+def start_warmup():
+    if os.getenv('WARMUP_ON_START', 'true').lower() not in ('1', 'true', 'yes'):
+        return
+    if multiprocessing.parent_process() is not None:
+        return
+    threading.Thread(target=warm_services, name="warmup", daemon=True).start()
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5050)
\ No newline at end of file
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_warmup()
+    app.run(debug=True, host='0.0.0.0', port=5050)
+else:
+    start_warmup()
\ No newline at end of file
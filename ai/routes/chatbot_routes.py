@@ -1,81 +1,114 @@
-from flask import Blueprint, request, jsonify
-from services.chatbot_service import ChatbotService
-import json
+from flask import Blueprint, request, jsonify, g
+from routes.common import chatbot_service, json_object, find_session_id, attach_session, chat_done_event, error_response
+from routes.sse import sse_event, sse_response
 
 chatbot_bp = Blueprint('chatbot', __name__)
-chatbot_service = ChatbotService()
+
+def _json_body():
+    return json_object(request.get_json(silent=True))
+
+def _session_id(create=True):
+    g.chat_session_id = find_session_id(
+        request.headers, request.get_json(silent=True), request.args, request.cookies, create
+    )
+    return g.chat_session_id
+
+@chatbot_bp.after_request
+def attach_session_id(response):
+    return attach_session(response, g.get('chat_session_id'))
 
 @chatbot_bp.route('/set-context', methods=['POST'])
 def set_cv_context():
     try:
-        cv_analysis = request.json.get('cv_analysis')
+        cv_analysis = _json_body().get('cv_analysis')
         if not cv_analysis:
             return jsonify({"error": "CV analysis context required"}), 400
         
-        chatbot_service.set_cv_context(cv_analysis)
-        return jsonify({"status": "Context set successfully"})
+        chatbot_service.set_cv_context(_session_id(), cv_analysis)
+        return jsonify({"status": "Context set successfully", "session_id": g.chat_session_id})
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @chatbot_bp.route('/chat', methods=['POST'])
 def chat():
     try:
-        user_message = request.json.get('message')
+        user_message = _json_body().get('message')
         if not user_message:
             return jsonify({"error": "Message is required"}), 400
         
-        result = chatbot_service.chat(user_message)
+        result = chatbot_service.chat(_session_id(), user_message)
         return jsonify(result)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+@chatbot_bp.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    try:
+        user_message = _json_body().get('message')
+        if not user_message:
+            return jsonify({"error": "Message is required"}), 400
+        
+        session_id = _session_id()
+    
+    except Exception as e:
+        return error_response(e)
+    
+    def generate():
+        try:
+            for text in chatbot_service.chat_stream(session_id, user_message):
+                yield sse_event("token", {"text": text})
+            yield chat_done_event(session_id)
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+    
+    return sse_response(generate())
 
 @chatbot_bp.route('/ask-universities', methods=['POST'])
 def ask_universities():
     try:
-        data = request.json
+        data = _json_body()
         university_name = data.get('university_name')
         specific_question = data.get('question')
         
         if not university_name:
             return jsonify({"error": "University name is required"}), 400
         
-        result = chatbot_service.ask_about_universities(university_name, specific_question)
+        result = chatbot_service.ask_about_universities(_session_id(), university_name, specific_question)
         return jsonify(result)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @chatbot_bp.route('/ask-scholarships', methods=['POST'])
 def ask_scholarships():
     try:
-        data = request.json or {}
+        data = _json_body()
         scholarship_type = data.get('type')
         country = data.get('country')
         
-        result = chatbot_service.ask_about_scholarships(scholarship_type, country)
+        result = chatbot_service.ask_about_scholarships(_session_id(), scholarship_type, country)
         return jsonify(result)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @chatbot_bp.route('/ask-preparation', methods=['POST'])
 def ask_preparation():
     try:
-        data = request.json or {}
-        timeline = data.get('timeline')
+        timeline = _json_body().get('timeline')
         
-        result = chatbot_service.ask_about_preparation(timeline)
+        result = chatbot_service.ask_about_preparation(_session_id(), timeline)
         return jsonify(result)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @chatbot_bp.route('/compare', methods=['POST'])
 def compare_options():
     try:
-        data = request.json
+        data = _json_body()
         option1 = data.get('option1')
         option2 = data.get('option2')
         criteria = data.get('criteria')
@@ -83,26 +116,26 @@ def compare_options():
         if not option1 or not option2:
             return jsonify({"error": "Both options are required"}), 400
         
-        result = chatbot_service.compare_options(option1, option2, criteria)
+        result = chatbot_service.compare_options(_session_id(), option1, option2, criteria)
         return jsonify(result)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @chatbot_bp.route('/summary', methods=['GET'])
 def get_summary():
     try:
-        result = chatbot_service.get_conversation_summary()
+        result = chatbot_service.get_conversation_summary(_session_id(create=False))
         return jsonify(result)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @chatbot_bp.route('/clear', methods=['POST'])
 def clear_conversation():
     try:
-        result = chatbot_service.clear_conversation()
+        result = chatbot_service.clear_conversation(_session_id(create=False))
         return jsonify(result)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return error_response(e)
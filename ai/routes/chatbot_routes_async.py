@@ -0,0 +1,141 @@
+from quart import Blueprint, request, jsonify, g
+from routes.common import chatbot_service, json_object, find_session_id, attach_session, chat_done_event, error_response, sse_event
+from routes.sse_async import sse_response_async
+
+chatbot_bp = Blueprint('chatbot', __name__)
+
+async def _json_body():
+    return json_object(await request.get_json(silent=True))
+
+async def _session_id(create=True):
+    g.chat_session_id = find_session_id(
+        request.headers, await request.get_json(silent=True), request.args, request.cookies, create
+    )
+    return g.chat_session_id
+
+@chatbot_bp.after_request
+async def attach_session_id(response):
+    return attach_session(response, g.get('chat_session_id'))
+
+@chatbot_bp.route('/set-context', methods=['POST'])
+async def set_cv_context():
+    try:
+        cv_analysis = (await _json_body()).get('cv_analysis')
+        if not cv_analysis:
+            return jsonify({"error": "CV analysis context required"}), 400
+        
+        await chatbot_service.set_cv_context_async(await _session_id(), cv_analysis)
+        return jsonify({"status": "Context set successfully", "session_id": g.chat_session_id})
+    
+    except Exception as e:
+        return error_response(e)
+
+@chatbot_bp.route('/chat', methods=['POST'])
+async def chat():
+    try:
+        user_message = (await _json_body()).get('message')
+        if not user_message:
+            return jsonify({"error": "Message is required"}), 400
+        
+        result = await chatbot_service.chat_async(await _session_id(), user_message)
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@chatbot_bp.route('/chat/stream', methods=['POST'])
+async def chat_stream():
+    try:
+        user_message = (await _json_body()).get('message')
+        if not user_message:
+            return jsonify({"error": "Message is required"}), 400
+        
+        session_id = await _session_id()
+    
+    except Exception as e:
+        return error_response(e)
+    
+    async def generate():
+        try:
+            async for text in chatbot_service.chat_stream_async(session_id, user_message):
+                yield sse_event("token", {"text": text})
+            yield chat_done_event(session_id)
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+    
+    return sse_response_async(generate())
+
+@chatbot_bp.route('/ask-universities', methods=['POST'])
+async def ask_universities():
+    try:
+        data = await _json_body()
+        university_name = data.get('university_name')
+        specific_question = data.get('question')
+        
+        if not university_name:
+            return jsonify({"error": "University name is required"}), 400
+        
+        result = await chatbot_service.ask_about_universities_async(await _session_id(), university_name, specific_question)
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@chatbot_bp.route('/ask-scholarships', methods=['POST'])
+async def ask_scholarships():
+    try:
+        data = await _json_body()
+        scholarship_type = data.get('type')
+        country = data.get('country')
+        
+        result = await chatbot_service.ask_about_scholarships_async(await _session_id(), scholarship_type, country)
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@chatbot_bp.route('/ask-preparation', methods=['POST'])
+async def ask_preparation():
+    try:
+        timeline = (await _json_body()).get('timeline')
+        
+        result = await chatbot_service.ask_about_preparation_async(await _session_id(), timeline)
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@chatbot_bp.route('/compare', methods=['POST'])
+async def compare_options():
+    try:
+        data = await _json_body()
+        option1 = data.get('option1')
+        option2 = data.get('option2')
+        criteria = data.get('criteria')
+        
+        if not option1 or not option2:
+            return jsonify({"error": "Both options are required"}), 400
+        
+        result = await chatbot_service.compare_options_async(await _session_id(), option1, option2, criteria)
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@chatbot_bp.route('/summary', methods=['GET'])
+async def get_summary():
+    try:
+        result = chatbot_service.get_conversation_summary(await _session_id(create=False))
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@chatbot_bp.route('/clear', methods=['POST'])
+async def clear_conversation():
+    try:
+        result = chatbot_service.clear_conversation(await _session_id(create=False))
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
@@ -0,0 +1,127 @@
+from services.cv_service import CVService, CV_BATCH_MAX_FILES
+from services.chatbot_service import ChatbotService
+from services.scholarship_service import ScholarshipService
+from services.scholarship_prefetch import ScholarshipPrefetcher
+from services.chat_sessions import valid_session_id, new_session_id, CHAT_SESSION_IDLE_TTL
+from services.llm_client import LLMBusyError
+from services.pdf_extraction import PDFLimitError, PDFTimeoutError
+from services.image_preprocessing import ImageTooLargeError
+from services.job_queue import JobQueue, JobQueueFullError
+from services.lazy import LazyService
+from werkzeug.utils import secure_filename
+import json
+import math
+import os
+
+# Shared by the Flask (routes/*_routes.py) and Quart (routes/*_routes_async.py)
+# blueprints, so nothing here may import either framework.
+
+cv_service = LazyService('cv_service', CVService)
+chatbot_service = LazyService('chatbot_service', ChatbotService)
+scholarship_service = LazyService('scholarship_service', ScholarshipService)
+scholarship_prefetcher = ScholarshipPrefetcher(scholarship_service)
+cv_jobs = JobQueue(
+    'cv_analysis',
+    workers=int(os.getenv('CV_JOB_WORKERS', 4)),
+    max_depth=int(os.getenv('CV_JOB_MAX_QUEUE', 100)),
+    result_ttl=int(os.getenv('CV_JOB_RESULT_TTL', 3600))
+)
+
+SESSION_HEADER = 'X-Session-ID'
+SESSION_COOKIE = 'chat_session_id'
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+class InvalidRequestError(ValueError):
+    pass
+
+class InvalidBudgetError(InvalidRequestError):
+    pass
+
+ERROR_STATUSES = (
+    (InvalidRequestError, 400),
+    ((PDFLimitError, ImageTooLargeError), 413),
+    ((LLMBusyError, JobQueueFullError, PDFTimeoutError), 503)
+)
+
+def error_response(e):
+    headers = {"Retry-After": "5"} if isinstance(e, (JobQueueFullError, PDFTimeoutError)) else {}
+    status = next((status for types, status in ERROR_STATUSES if isinstance(e, types)), 500)
+    return {"error": str(e)}, status, headers
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def parse_bool(value, default=True):
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+def _parse_budget(data, field):
+    value = data.get(field)
+    if not value:
+        return None
+    try:
+        amount = float(value)
+        if amount < 0 or not math.isfinite(amount):
+            raise ValueError(value)
+        return int(amount)
+    except (TypeError, ValueError):
+        raise InvalidBudgetError(f"{field} must be a non-negative number")
+
+def get_budget_params(data):
+    return _parse_budget(data, 'budget_limit'), _parse_budget(data, 'monthly_budget')
+
+def json_object(data):
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise InvalidRequestError("Request body must be a JSON object")
+    return data
+
+def is_pdf(filename):
+    return (filename or '').lower().endswith('.pdf')
+
+def is_image(filename):
+    return (filename or '').lower().endswith(IMAGE_EXTENSIONS)
+
+def read_batch(uploads):
+    if not uploads:
+        raise InvalidRequestError("No files uploaded")
+    if len(uploads) > CV_BATCH_MAX_FILES:
+        raise InvalidRequestError(f"At most {CV_BATCH_MAX_FILES} files can be analyzed per batch")
+    return [(secure_filename(file.filename) or file.filename, file.read()) for file in uploads]
+
+def job_accepted(job_id, status_url):
+    return {"job_id": job_id, "status": "queued", "status_url": status_url}, 202
+
+def prefetch_scholarships(result, data):
+    budget_limit, _ = get_budget_params(data)
+    scholarship_prefetcher.schedule(
+        result,
+        user_country=data.get('user_country'),
+        departure_date=data.get('departure_date'),
+        field_of_study=data.get('field_of_study'),
+        budget_limit=budget_limit
+    )
+
+def find_session_id(headers, body, args, cookies, create=True):
+    for candidate in (headers.get(SESSION_HEADER), json_object(body).get('session_id'),
+                      args.get('session_id'), cookies.get(SESSION_COOKIE)):
+        if valid_session_id(candidate):
+            return candidate
+    return new_session_id() if create else None
+
+def attach_session(response, session_id):
+    if session_id:
+        response.headers[SESSION_HEADER] = session_id
+        response.set_cookie(SESSION_COOKIE, session_id, max_age=CHAT_SESSION_IDLE_TTL, httponly=True, samesite='Lax')
+    return response
+
+def chat_done_event(session_id):
+    return sse_event("done", {
+        "conversation_id": chatbot_service.conversation_length(session_id),
+        "session_id": session_id
+    })
@@ -1,38 +1,120 @@
-from flask import Blueprint, request, jsonify
-from services.cv_service import CVService
-from werkzeug.utils import secure_filename
-import os
+from flask import Blueprint, request, jsonify, url_for
+from routes.common import (
+    cv_service, cv_jobs, json_object, is_pdf, is_image, read_batch, get_budget_params,
+    job_accepted, prefetch_scholarships, error_response
+)
+from routes.sse import sse_event, sse_response
 
 cv_bp = Blueprint('cv', __name__)
-cv_service = CVService()
+
+def _json_body():
+    return json_object(request.get_json(silent=True))
 
 @cv_bp.route('/analyze', methods=['POST'])
 def analyze_cv():
     try:
         if 'file' in request.files:
             file = request.files['file']
-            filename = file.filename.lower()
+            params = request.form
+            budget_limit, monthly_budget = get_budget_params(params)
+            
+            if is_pdf(file.filename):
+                result = cv_service.analyze_cv_pdf(file.read(), budget_limit, monthly_budget)
+            elif is_image(file.filename):
+                result = cv_service.analyze_cv_image(file.read(), budget_limit, monthly_budget)
+            else:
+                return jsonify({"error": "Only PDF, PNG, JPG, JPEG files are supported"}), 400
+        
+        else:
+            params = _json_body()
+            if 'text' not in params:
+                return jsonify({"error": "No CV data provided"}), 400
+            budget_limit, monthly_budget = get_budget_params(params)
+            result = cv_service.analyze_cv_text(params['text'], budget_limit, monthly_budget)
+        
+        prefetch_scholarships(result, params)
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@cv_bp.route('/analyze/stream', methods=['POST'])
+def analyze_cv_stream():
+    try:
+        if 'file' in request.files:
+            file = request.files['file']
+            budget_limit, monthly_budget = get_budget_params(request.form)
             
-            if filename.endswith('.pdf'):
-                pdf_data = file.read()
-                result = cv_service.analyze_cv_pdf(pdf_data)
-            elif filename.endswith(('.png', '.jpg', '.jpeg')):
-                image_data = file.read()
-                result = cv_service.analyze_cv_image(image_data)
+            if is_pdf(file.filename):
+                events = cv_service.analyze_cv_pdf_stream(file.read(), budget_limit, monthly_budget)
+            elif is_image(file.filename):
+                events = cv_service.analyze_cv_image_stream(file.read(), budget_limit, monthly_budget)
             else:
                 return jsonify({"error": "Only PDF, PNG, JPG, JPEG files are supported"}), 400
         
-        elif request.json and 'text' in request.json:
-            cv_text = request.json['text']
-            result = cv_service.analyze_cv_text(cv_text)
+        else:
+            data = _json_body()
+            if 'text' not in data:
+                return jsonify({"error": "No CV data provided"}), 400
+            budget_limit, monthly_budget = get_budget_params(data)
+            events = cv_service.analyze_cv_text_stream(data['text'], budget_limit, monthly_budget)
+    
+    except Exception as e:
+        return error_response(e)
+    
+    def generate():
+        try:
+            for event, payload in events:
+                yield sse_event(event, payload)
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+    
+    return sse_response(generate())
+
+@cv_bp.route('/analyze/async', methods=['POST'])
+def analyze_cv_async():
+    try:
+        if 'file' in request.files:
+            file = request.files['file']
+            budget_limit, monthly_budget = get_budget_params(request.form)
+            
+            if is_pdf(file.filename):
+                job_id = cv_jobs.submit(cv_service.analyze_cv_pdf, file.read(), budget_limit, monthly_budget)
+            elif is_image(file.filename):
+                job_id = cv_jobs.submit(cv_service.analyze_cv_image, file.read(), budget_limit, monthly_budget)
+            else:
+                return jsonify({"error": "Only PDF, PNG, JPG, JPEG files are supported"}), 400
         
         else:
-            return jsonify({"error": "No CV data provided"}), 400
+            data = _json_body()
+            if 'text' not in data:
+                return jsonify({"error": "No CV data provided"}), 400
+            budget_limit, monthly_budget = get_budget_params(data)
+            job_id = cv_jobs.submit(cv_service.analyze_cv_text, data['text'], budget_limit, monthly_budget)
+        
+        return job_accepted(job_id, url_for('cv.get_cv_job', job_id=job_id))
+    
+    except Exception as e:
+        return error_response(e)
+
+@cv_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_cv_job(job_id):
+    job = cv_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify(job)
+
+@cv_bp.route('/analyze-batch', methods=['POST'])
+def analyze_cv_batch():
+    try:
+        files = read_batch(request.files.getlist('files') or request.files.getlist('file'))
+        budget_limit, monthly_budget = get_budget_params(request.form)
+        result = cv_service.analyze_cv_batch(files, budget_limit, monthly_budget)
         
         return jsonify(result)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @cv_bp.route('/analyze-pdf', methods=['POST'])
 def analyze_cv_pdf():
@@ -41,16 +123,17 @@ def analyze_cv_pdf():
             return jsonify({"error": "No file provided"}), 400
         
         file = request.files['file']
-        if not file.filename.lower().endswith('.pdf'):
+        if not is_pdf(file.filename):
             return jsonify({"error": "Only PDF files are supported"}), 400
         
-        pdf_data = file.read()
-        result = cv_service.analyze_cv_pdf(pdf_data)
+        budget_limit, monthly_budget = get_budget_params(request.form)
+        result = cv_service.analyze_cv_pdf(file.read(), budget_limit, monthly_budget)
+        prefetch_scholarships(result, request.form)
         
         return jsonify(result)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @cv_bp.route('/analyze-image', methods=['POST'])
 def analyze_cv_image():
@@ -59,36 +142,38 @@ def analyze_cv_image():
             return jsonify({"error": "No file provided"}), 400
         
         file = request.files['file']
-        if not file.filename.lower().endswith(('.png', '.jpg', '.jpeg')):
+        if not is_image(file.filename):
             return jsonify({"error": "Only PNG, JPG, JPEG files are supported"}), 400
         
-        image_data = file.read()
-        result = cv_service.analyze_cv_image(image_data)
+        budget_limit, monthly_budget = get_budget_params(request.form)
+        result = cv_service.analyze_cv_image(file.read(), budget_limit, monthly_budget)
+        prefetch_scholarships(result, request.form)
         
         return jsonify(result)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @cv_bp.route('/analyze-text', methods=['POST'])
 def analyze_cv_text():
     try:
-        data = request.json
-        if not data or 'text' not in data:
+        data = _json_body()
+        if 'text' not in data:
             return jsonify({"error": "CV text is required"}), 400
         
-        cv_text = data['text']
-        result = cv_service.analyze_cv_text(cv_text)
+        budget_limit, monthly_budget = get_budget_params(data)
+        result = cv_service.analyze_cv_text(data['text'], budget_limit, monthly_budget)
+        prefetch_scholarships(result, data)
         
         return jsonify(result)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @cv_bp.route('/scholarship-timeline', methods=['POST'])
 def get_scholarship_timeline():
     try:
-        data = request.json or {}
+        data = _json_body()
         target_countries = data.get('countries', None)
         field_of_study = data.get('field', None)
         
@@ -97,4 +182,4 @@ def get_scholarship_timeline():
         return jsonify(result)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return error_response(e)
@@ -0,0 +1,194 @@
+from quart import Blueprint, request, jsonify, url_for
+from routes.common import (
+    cv_service, cv_jobs, json_object, is_pdf, is_image, read_batch, get_budget_params,
+    job_accepted, prefetch_scholarships, error_response, sse_event
+)
+from routes.sse_async import sse_response_async
+import asyncio
+
+cv_bp = Blueprint('cv', __name__)
+
+async def _json_body():
+    return json_object(await request.get_json(silent=True))
+
+@cv_bp.route('/analyze', methods=['POST'])
+async def analyze_cv():
+    try:
+        files = await request.files
+        if 'file' in files:
+            file = files['file']
+            params = await request.form
+            budget_limit, monthly_budget = get_budget_params(params)
+            
+            if is_pdf(file.filename):
+                result = await cv_service.analyze_cv_pdf_async(file.read(), budget_limit, monthly_budget)
+            elif is_image(file.filename):
+                result = await cv_service.analyze_cv_image_async(file.read(), budget_limit, monthly_budget)
+            else:
+                return jsonify({"error": "Only PDF, PNG, JPG, JPEG files are supported"}), 400
+        
+        else:
+            params = await _json_body()
+            if 'text' not in params:
+                return jsonify({"error": "No CV data provided"}), 400
+            budget_limit, monthly_budget = get_budget_params(params)
+            result = await cv_service.analyze_cv_text_async(params['text'], budget_limit, monthly_budget)
+        
+        prefetch_scholarships(result, params)
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@cv_bp.route('/analyze/stream', methods=['POST'])
+async def analyze_cv_stream():
+    try:
+        files = await request.files
+        if 'file' in files:
+            file = files['file']
+            budget_limit, monthly_budget = get_budget_params(await request.form)
+            
+            if is_pdf(file.filename):
+                events = await cv_service.analyze_cv_pdf_stream_async(file.read(), budget_limit, monthly_budget)
+            elif is_image(file.filename):
+                events = await cv_service.analyze_cv_image_stream_async(file.read(), budget_limit, monthly_budget)
+            else:
+                return jsonify({"error": "Only PDF, PNG, JPG, JPEG files are supported"}), 400
+        
+        else:
+            data = await _json_body()
+            if 'text' not in data:
+                return jsonify({"error": "No CV data provided"}), 400
+            budget_limit, monthly_budget = get_budget_params(data)
+            events = await cv_service.analyze_cv_text_stream_async(data['text'], budget_limit, monthly_budget)
+    
+    except Exception as e:
+        return error_response(e)
+    
+    async def generate():
+        try:
+            async for event, payload in events:
+                yield sse_event(event, payload)
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+    
+    return sse_response_async(generate())
+
+@cv_bp.route('/analyze/async', methods=['POST'])
+async def analyze_cv_async():
+    try:
+        files = await request.files
+        if 'file' in files:
+            file = files['file']
+            budget_limit, monthly_budget = get_budget_params(await request.form)
+            
+            if is_pdf(file.filename):
+                job_id = cv_jobs.submit(cv_service.analyze_cv_pdf, file.read(), budget_limit, monthly_budget)
+            elif is_image(file.filename):
+                job_id = cv_jobs.submit(cv_service.analyze_cv_image, file.read(), budget_limit, monthly_budget)
+            else:
+                return jsonify({"error": "Only PDF, PNG, JPG, JPEG files are supported"}), 400
+        
+        else:
+            data = await _json_body()
+            if 'text' not in data:
+                return jsonify({"error": "No CV data provided"}), 400
+            budget_limit, monthly_budget = get_budget_params(data)
+            job_id = cv_jobs.submit(cv_service.analyze_cv_text, data['text'], budget_limit, monthly_budget)
+        
+        return job_accepted(job_id, url_for('cv.get_cv_job', job_id=job_id))
+    
+    except Exception as e:
+        return error_response(e)
+
+@cv_bp.route('/jobs/<job_id>', methods=['GET'])
+async def get_cv_job(job_id):
+    job = cv_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify(job)
+
+@cv_bp.route('/analyze-batch', methods=['POST'])
+async def analyze_cv_batch():
+    try:
+        uploads = await request.files
+        batch = read_batch(uploads.getlist('files') or uploads.getlist('file'))
+        budget_limit, monthly_budget = get_budget_params(await request.form)
+        result = await asyncio.to_thread(cv_service.analyze_cv_batch, batch, budget_limit, monthly_budget)
+        
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@cv_bp.route('/analyze-pdf', methods=['POST'])
+async def analyze_cv_pdf():
+    try:
+        files = await request.files
+        if 'file' not in files:
+            return jsonify({"error": "No file provided"}), 400
+        
+        file = files['file']
+        if not is_pdf(file.filename):
+            return jsonify({"error": "Only PDF files are supported"}), 400
+        
+        form = await request.form
+        budget_limit, monthly_budget = get_budget_params(form)
+        result = await cv_service.analyze_cv_pdf_async(file.read(), budget_limit, monthly_budget)
+        prefetch_scholarships(result, form)
+        
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@cv_bp.route('/analyze-image', methods=['POST'])
+async def analyze_cv_image():
+    try:
+        files = await request.files
+        if 'file' not in files:
+            return jsonify({"error": "No file provided"}), 400
+        
+        file = files['file']
+        if not is_image(file.filename):
+            return jsonify({"error": "Only PNG, JPG, JPEG files are supported"}), 400
+        
+        form = await request.form
+        budget_limit, monthly_budget = get_budget_params(form)
+        result = await cv_service.analyze_cv_image_async(file.read(), budget_limit, monthly_budget)
+        prefetch_scholarships(result, form)
+        
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@cv_bp.route('/analyze-text', methods=['POST'])
+async def analyze_cv_text():
+    try:
+        data = await _json_body()
+        if 'text' not in data:
+            return jsonify({"error": "CV text is required"}), 400
+        
+        budget_limit, monthly_budget = get_budget_params(data)
+        result = await cv_service.analyze_cv_text_async(data['text'], budget_limit, monthly_budget)
+        prefetch_scholarships(result, data)
+        
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@cv_bp.route('/scholarship-timeline', methods=['POST'])
+async def get_scholarship_timeline():
+    try:
+        data = await _json_body()
+        target_countries = data.get('countries', None)
+        field_of_study = data.get('field', None)
+        
+        result = await cv_service.get_scholarship_timeline_async(target_countries, field_of_study)
+        
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
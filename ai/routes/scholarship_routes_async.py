@@ -0,0 +1,75 @@
+from quart import Blueprint, request, jsonify
+from routes.common import scholarship_service, json_object, parse_bool, error_response
+import asyncio
+
+scholarship_bp = Blueprint('scholarship', __name__)
+
+async def _json_body():
+    return json_object(await request.get_json(silent=True))
+
+@scholarship_bp.route('/timeline', methods=['POST'])
+async def get_scholarship_timeline():
+    try:
+        data = await _json_body()
+        university_name = data.get('university_name')
+        user_country = data.get('user_country')
+        departure_date = data.get('departure_date')
+        
+        if not university_name or not user_country or not departure_date:
+            return jsonify({"error": "University name, user country, and departure date are required"}), 400
+        
+        result = await scholarship_service.get_scholarship_timeline_async(
+            university_name, user_country, departure_date,
+            data.get('field_of_study'), data.get('budget_limit')
+        )
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@scholarship_bp.route('/university-scholarships', methods=['POST'])
+async def get_university_scholarships():
+    try:
+        data = await _json_body()
+        university_name = data.get('university_name')
+        
+        if not university_name:
+            return jsonify({"error": "University name is required"}), 400
+        
+        result = await scholarship_service.get_university_specific_scholarships_async(university_name, data.get('field_of_study'))
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@scholarship_bp.route('/preparation-timeline', methods=['POST'])
+async def calculate_preparation_timeline():
+    try:
+        data = await _json_body()
+        departure_date = data.get('departure_date')
+        
+        if not departure_date:
+            return jsonify({"error": "Departure date is required"}), 400
+        
+        result = await scholarship_service.calculate_preparation_timeline_async(
+            departure_date, data.get('user_country', 'Indonesia'), parse_bool(data.get('include_narrative'))
+        )
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
+
+@scholarship_bp.route('/search', methods=['POST'])
+async def search_scholarships():
+    try:
+        data = await _json_body()
+        
+        result = await asyncio.to_thread(
+            scholarship_service.search_scholarships_by_criteria,
+            data.get('field_of_study'), data.get('target_countries'), data.get('budget_limit'),
+            data.get('user_country', 'Indonesia'), data.get('query'), data.get('limit', 20)
+        )
+        return jsonify(result)
+    
+    except Exception as e:
+        return error_response(e)
@@ -0,0 +1,13 @@
+from flask import Response, stream_with_context
+from routes.common import sse_event
+
+
+def sse_response(events):
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
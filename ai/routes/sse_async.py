@@ -0,0 +1,14 @@
+from quart import Response
+
+
+def sse_response_async(events):
+    response = Response(
+        events,
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+    response.timeout = None
+    return response
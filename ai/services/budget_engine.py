@@ -0,0 +1,146 @@
+import math
+import os
+
+DEFAULT_EXCHANGE_RATES = {
+    "IDR": 1,
+    "USD": 15800,
+    "EUR": 17200,
+    "GBP": 19500,
+    "AUD": 10400,
+    "CAD": 11600,
+    "NZD": 9500,
+    "SGD": 11700,
+    "MYR": 3400,
+    "JPY": 105,
+    "KRW": 11.5,
+    "TWD": 490,
+    "CNY": 2200,
+    "HKD": 2020,
+    "CHF": 17900,
+    "SEK": 1500,
+    "NOK": 1480,
+    "DKK": 2300,
+    "PLN": 3950,
+    "CZK": 690,
+    "HUF": 43,
+    "TRY": 480
+}
+
+ANNUAL_ALLOWANCE_BY_TIER = {
+    "low": 120000000,
+    "medium": 600000000,
+    "high": None
+}
+
+
+def parse_exchange_rates(spec):
+    rates = dict(DEFAULT_EXCHANGE_RATES)
+    for item in (spec or "").split(','):
+        if '=' not in item:
+            continue
+        currency, rate = item.split('=', 1)
+        rates[currency.strip().upper()] = float(rate)
+    return rates
+
+
+class BudgetEngine:
+    def __init__(self, exchange_rates=None):
+        self.exchange_rates = exchange_rates or parse_exchange_rates(os.getenv('EXCHANGE_RATES'))
+
+    def rate_for(self, currency):
+        if currency is None:
+            currency = "IDR"
+        if not isinstance(currency, str):
+            return None
+        return self.exchange_rates.get(currency.strip().upper())
+
+    def to_idr(self, amount, currency="IDR"):
+        rate = self.rate_for(currency)
+        if rate is None:
+            return None
+        if not isinstance(amount, (int, float)) or isinstance(amount, bool) or not math.isfinite(amount):
+            return None
+        return int(round(amount * rate))
+
+    def annual_allowance(self, tier, budget_limit=None, monthly_budget=None):
+        if budget_limit:
+            return budget_limit
+        if monthly_budget:
+            return monthly_budget * 12
+        return ANNUAL_ALLOWANCE_BY_TIER.get(tier)
+
+    def _unpriced(self, program, **reason):
+        return dict(
+            program,
+            tuition_per_year_idr=None,
+            living_per_month_idr=None,
+            annual_cost_idr=None,
+            scholarship_amount_idr=None,
+            net_cost_idr=None,
+            fits_budget=None,
+            **reason
+        )
+
+    def price_program(self, program, allowance):
+        currency = program.get("currency", "IDR")
+        if self.rate_for(currency) is None:
+            return self._unpriced(program, unsupported_currency=currency)
+
+        tuition_idr = self.to_idr(program.get("tuition_per_year"), currency)
+        living_monthly_idr = self.to_idr(program.get("living_cost_per_month"), currency)
+        missing = [
+            field for field, amount in (("tuition_per_year", tuition_idr), ("living_cost_per_month", living_monthly_idr))
+            if amount is None
+        ]
+        if missing:
+            return self._unpriced(program, unpriced_amounts=missing)
+
+        annual_cost_idr = tuition_idr + living_monthly_idr * 12
+        scholarship_idr = min(self.to_idr(program.get("scholarship_amount_per_year"), currency) or 0, annual_cost_idr)
+        net_cost_idr = annual_cost_idr - scholarship_idr
+
+        return dict(
+            program,
+            tuition_per_year_idr=tuition_idr,
+            living_per_month_idr=living_monthly_idr,
+            annual_cost_idr=annual_cost_idr,
+            scholarship_amount_idr=scholarship_idr,
+            net_cost_idr=net_cost_idr,
+            fits_budget="yes" if allowance is None or net_cost_idr <= allowance else "no"
+        )
+
+    def price_programs(self, programs, tier, budget_limit=None, monthly_budget=None):
+        allowance = self.annual_allowance(tier, budget_limit, monthly_budget)
+        return [
+            self.price_program(program, allowance) if isinstance(program, dict) else program
+            for program in programs or []
+        ]
+
+    def summarize(self, priced_programs):
+        programs = [program for program in priced_programs if isinstance(program, dict) and program.get("annual_cost_idr") is not None]
+        if not programs:
+            return {
+                "average_tuition_idr": 0,
+                "average_living_monthly_idr": 0,
+                "total_annual_cost_idr": 0,
+                "best_scholarship_coverage_idr": 0,
+                "minimum_self_funding_idr": 0
+            }
+
+        count = len(programs)
+        return {
+            "average_tuition_idr": sum(p["tuition_per_year_idr"] for p in programs) // count,
+            "average_living_monthly_idr": sum(p["living_per_month_idr"] for p in programs) // count,
+            "total_annual_cost_idr": sum(p["annual_cost_idr"] for p in programs) // count,
+            "best_scholarship_coverage_idr": max(p["scholarship_amount_idr"] for p in programs),
+            "minimum_self_funding_idr": min(p["net_cost_idr"] for p in programs)
+        }
+
+    def apply(self, analysis, tier, budget_limit=None, monthly_budget=None):
+        if not isinstance(analysis, dict) or "error" in analysis:
+            return analysis
+
+        programs = self.price_programs(analysis.get("recommended_programs"), tier, budget_limit, monthly_budget)
+        analysis["recommended_programs"] = programs
+        analysis["budget_breakdown"] = self.summarize(programs)
+        return analysis
@@ -0,0 +1,187 @@
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+from services.metrics import CallbackGauge
+
+CHAT_MAX_SESSIONS = int(os.getenv('CHAT_MAX_SESSIONS', 10000))
+CHAT_SESSION_MEMORY_MB = int(os.getenv('CHAT_SESSION_MEMORY_MB', 256))
+CHAT_SESSION_IDLE_TTL = int(os.getenv('CHAT_SESSION_IDLE_TTL', 1800))
+CHAT_HISTORY_TURNS = int(os.getenv('CHAT_HISTORY_TURNS', 6))
+SESSION_OVERHEAD_BYTES = 1024
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+def valid_session_id(session_id):
+    return isinstance(session_id, str) and bool(_SESSION_ID.match(session_id))
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+class ChatSession:
+    __slots__ = ("session_id", "lock", "history", "history_turns", "pending", "summary", "summarized_turns",
+                 "summarizing", "cv_context_json", "context_cache", "last_access", "size")
+
+    def __init__(self, session_id, history_turns=CHAT_HISTORY_TURNS):
+        self.session_id = session_id
+        self.lock = threading.Lock()
+        self.history = deque()
+        self.history_turns = history_turns
+        self.pending = []
+        self.summary = ""
+        self.summarized_turns = 0
+        self.summarizing = False
+        self.cv_context_json = None
+        self.context_cache = None
+        self.last_access = time.monotonic()
+        self.size = SESSION_OVERHEAD_BYTES
+
+    @property
+    def has_cv_context(self):
+        return self.cv_context_json is not None
+
+    def append_turn(self, user_message, response_text):
+        self.history.append((user_message, response_text, time.time()))
+        while len(self.history) > self.history_turns:
+            self.pending.append(self.history.popleft())
+
+    def reset(self):
+        self.history.clear()
+        self.pending = []
+        self.summary = ""
+        self.summarized_turns = 0
+
+    def measure(self):
+        self.size = (
+            SESSION_OVERHEAD_BYTES
+            + len(self.cv_context_json or "")
+            + len(self.summary)
+            + sum(len(user) + len(assistant) for user, assistant, _ in self.history)
+            + sum(len(user) + len(assistant) for user, assistant, _ in self.pending)
+        )
+        return self.size
+
+
+class ChatSessionStore:
+    def __init__(self, name="chat", max_sessions=CHAT_MAX_SESSIONS, max_bytes=CHAT_SESSION_MEMORY_MB * 1024 * 1024,
+                 idle_ttl=CHAT_SESSION_IDLE_TTL, history_turns=CHAT_HISTORY_TURNS):
+        self.name = name
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.history_turns = history_turns
+        self.bytes = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+        _stores.append(self)
+
+    def get(self, session_id, create=True):
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None and now - session.last_access > self.idle_ttl:
+                self._remove(session)
+                self.expirations += 1
+                released = [session]
+                session = None
+            else:
+                released = []
+
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            elif create:
+                session = ChatSession(session_id, self.history_turns)
+                self._sessions[session_id] = session
+                self.bytes += session.size
+                self.created += 1
+
+            if session is not None:
+                session.last_access = now
+                released.extend(self._evict(now, keep=session))
+
+        _release(released)
+        return session
+
+    def update(self, session):
+        with self._lock:
+            if self._sessions.get(session.session_id) is not session:
+                return
+            previous = session.size
+            self.bytes += session.measure() - previous
+            released = self._evict(time.monotonic(), keep=session)
+        _release(released)
+
+    def discard(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._remove(session)
+        _release([session] if session is not None else [])
+
+    def _remove(self, session):
+        del self._sessions[session.session_id]
+        self.bytes -= session.size
+
+    def _evict(self, now, keep=None):
+        released = []
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session is keep:
+                break
+            if now - session.last_access > self.idle_ttl:
+                self.expirations += 1
+            elif len(self._sessions) > self.max_sessions or self.bytes > self.max_bytes:
+                self.evictions += 1
+            else:
+                break
+            self._remove(session)
+            released.append(session)
+        return released
+
+    def purge_idle(self):
+        with self._lock:
+            released = self._evict(time.monotonic())
+        _release(released)
+        return len(released)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "idle_ttl": self.idle_ttl,
+                "created": self.created,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+
+def _release(sessions):
+    for session in sessions:
+        context_cache, session.context_cache = session.context_cache, None
+        if context_cache is not None:
+            context_cache.release()
+
+
+_stores = []
+
+
+def _session_metrics():
+    return {(store.name, stat): value for store in list(_stores) for stat, value in store.stats().items()}
+
+
+CallbackGauge("chat_sessions", "Chatbot session store state", ("store", "stat"), _session_metrics)
@@ -1,33 +1,145 @@
-import google.generativeai as genai
+import asyncio
 import os
-from dotenv import load_dotenv
+from services.llm_client import get_llm_client, LLMBusyError
+from services.chat_sessions import ChatSessionStore
+from services.job_queue import JobQueue, JobQueueFullError
 import json
 from datetime import datetime
 
-load_dotenv()
+CHAT_SUMMARY_MAX_CHARS = int(os.getenv('CHAT_SUMMARY_MAX_CHARS', 1500))
+CHAT_SUMMARY_WORKERS = int(os.getenv('CHAT_SUMMARY_WORKERS', 2))
+CHAT_SUMMARY_MAX_QUEUE = int(os.getenv('CHAT_SUMMARY_MAX_QUEUE', 500))
+CHAT_PROMPT_PENDING_TURNS = 4
+CHAT_PROMPT_USER_CHARS = 500
+CHAT_PROMPT_ASSISTANT_CHARS = 300
+
+def _compact_context(value):
+   if isinstance(value, dict):
+       compacted = {key: _compact_context(item) for key, item in value.items()}
+       return {key: item for key, item in compacted.items() if item not in (None, "", [], {})}
+   if isinstance(value, list):
+       compacted = [_compact_context(item) for item in value]
+       return [item for item in compacted if item not in (None, "", [], {})]
+   if isinstance(value, str):
+       return " ".join(value.split())
+   return value
+
+def _extractive_summary(summary, turns):
+   lines = summary.split("\n") if summary else []
+   for user, assistant, _ in turns:
+       lines.append(f"- User asked: {' '.join(user.split())[:160]}")
+       lines.append(f"  Assistant: {' '.join(assistant.split())[:200]}")
+   
+   while len(lines) > 1 and sum(len(line) + 1 for line in lines) > CHAT_SUMMARY_MAX_CHARS:
+       lines.pop(0)
+   return "\n".join(lines)[:CHAT_SUMMARY_MAX_CHARS]
 
 class ChatbotService:
-   def __init__(self):
-       genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-       self.model = genai.GenerativeModel(os.getenv('GEMINI_AI_MODEL'))
-       self.conversation_history = []
-       self.cv_context = None
-       self.analysis_context = None
-   
-   def set_cv_context(self, cv_analysis_result):
-       self.cv_context = cv_analysis_result
-       self.analysis_context = cv_analysis_result
-       self.conversation_history = []
-   
-   def chat(self, user_message):
+   def __init__(self, sessions=None):
+       self.llm = get_llm_client()
+       self.sessions = sessions if sessions is not None else ChatSessionStore()
+       self.summary_jobs = JobQueue('chat_summary', CHAT_SUMMARY_WORKERS, CHAT_SUMMARY_MAX_QUEUE, result_ttl=60)
+   
+   def set_cv_context(self, session_id, cv_analysis_result):
+       cv_context_json = json.dumps(_compact_context(cv_analysis_result), separators=(',', ':'), ensure_ascii=False)
+       context_cache = self.llm.create_context_cache(
+           f"CV analysis context for this study abroad consultation session (JSON):\n{cv_context_json}"
+       )
+       
+       session = self.sessions.get(session_id)
+       with session.lock:
+           previous_cache = session.context_cache
+           session.cv_context_json = cv_context_json
+           session.context_cache = context_cache
+           session.reset()
+       self.sessions.update(session)
+       
+       if previous_cache is not None:
+           previous_cache.release()
+   
+   async def set_cv_context_async(self, session_id, cv_analysis_result):
+       await asyncio.to_thread(self.set_cv_context, session_id, cv_analysis_result)
+   
+   def chat(self, session_id, user_message):
         try:
-            context_prompt = self._build_context_prompt()
+            session = self.sessions.get(session_id)
+            with session.lock:
+                full_prompt = self._build_chat_prompt(session, user_message)
+                context_cache = session.context_cache
+            response = self.llm.generate_content(full_prompt, lane="chat", context_cache=context_cache)
+            turns = self._record_turn(session, user_message, response.text)
+
+            return {
+                "response": response.text,
+                "conversation_id": turns
+            }
+
+        except LLMBusyError:
+            raise
+        except Exception as e:
+            return {"error": f"Chat error: {str(e)}"}
+   
+   async def chat_async(self, session_id, user_message):
+        try:
+            session = self.sessions.get(session_id)
+            with session.lock:
+                full_prompt = self._build_chat_prompt(session, user_message)
+                context_cache = session.context_cache
+            response = await self.llm.generate_content_async(full_prompt, lane="chat", context_cache=context_cache)
+            turns = self._record_turn(session, user_message, response.text)
+
+            return {
+                "response": response.text,
+                "conversation_id": turns
+            }
+
+        except LLMBusyError:
+            raise
+        except Exception as e:
+            return {"error": f"Chat error: {str(e)}"}
+   
+   def chat_stream(self, session_id, user_message):
+        session = self.sessions.get(session_id)
+        with session.lock:
+            full_prompt = self._build_chat_prompt(session, user_message)
+            context_cache = session.context_cache
+
+        chunks = []
+        for text in self.llm.stream_content(full_prompt, lane="chat", context_cache=context_cache):
+            chunks.append(text)
+            yield text
+
+        self._record_turn(session, user_message, "".join(chunks))
+   
+   async def chat_stream_async(self, session_id, user_message):
+        session = self.sessions.get(session_id)
+        with session.lock:
+            full_prompt = self._build_chat_prompt(session, user_message)
+            context_cache = session.context_cache
+
+        chunks = []
+        async for text in self.llm.stream_content_async(full_prompt, lane="chat", context_cache=context_cache):
+            chunks.append(text)
+            yield text
 
-            full_prompt = f"""
+        self._record_turn(session, user_message, "".join(chunks))
+   
+   def conversation_length(self, session_id):
+       session = self.sessions.get(session_id)
+       with session.lock:
+           return self._turn_count(session)
+   
+   def _turn_count(self, session):
+       return session.summarized_turns + len(session.pending) + len(session.history)
+   
+   def _build_chat_prompt(self, session, user_message):
+        context_prompt = self._build_context_prompt(session)
+
+        return f"""
             {context_prompt}
 
             Previous conversation:
-            {self._format_conversation_history()}
+            {self._format_conversation_history(session)}
 
             User question: {user_message}
 
@@ -49,32 +161,85 @@ class ChatbotService:
 
             Now, respond to the user's question: {user_message}
             """
+   
+   def _record_turn(self, session, user_message, response_text):
+        with session.lock:
+            session.append_turn(user_message, response_text)
+            turns = self._turn_count(session)
+            fold = bool(session.pending) and not session.summarizing
+            if fold:
+                session.summarizing = True
+        self.sessions.update(session)
 
-            response = self.model.generate_content(full_prompt)
+        if fold:
+            try:
+                self.summary_jobs.submit(self._fold_summary, session)
+            except JobQueueFullError:
+                self._fold_summary(session, use_llm=False)
+        return turns
+   
+   def _fold_summary(self, session, use_llm=True):
+        try:
+            while True:
+                with session.lock:
+                    turns = list(session.pending)
+                    summary = session.summary
+                    if not turns:
+                        session.summarizing = False
+                        return {"summarized_turns": session.summarized_turns}
 
-            self.conversation_history.append({
-                "user": user_message,
-                "assistant": response.text,
-                "timestamp": datetime.now().isoformat()
-            })
+                updated = None
+                if use_llm:
+                    try:
+                        updated = self.llm.generate_content(
+                            self._build_summary_prompt(summary, turns), lane="chat_summary"
+                        ).text.strip()
+                    except Exception:
+                        updated = None
+                if not updated:
+                    updated = _extractive_summary(summary, turns)
 
-            if len(self.conversation_history) > 10:
-                self.conversation_history = self.conversation_history[-8:]
+                with session.lock:
+                    if session.pending[:len(turns)] != turns:
+                        continue
+                    session.summary = updated[:CHAT_SUMMARY_MAX_CHARS]
+                    del session.pending[:len(turns)]
+                    session.summarized_turns += len(turns)
+                self.sessions.update(session)
+        except Exception:
+            with session.lock:
+                session.summarizing = False
+            raise
+   
+   def _build_summary_prompt(self, summary, turns):
+        conversation_text = "\n".join(
+            f"User: {user[:CHAT_PROMPT_USER_CHARS]}\nAssistant: {assistant[:CHAT_PROMPT_ASSISTANT_CHARS * 2]}"
+            for user, assistant, _ in turns
+        )
 
-            return {
-                "response": response.text,
-                "conversation_id": len(self.conversation_history)
-            }
+        return f"""
+            You maintain the running summary of a study abroad consultation chat.
 
-        except Exception as e:
-            return {"error": f"Chat error: {str(e)}"}
+            Current summary:
+            {summary or "No summary yet."}
+
+            Turns to fold into the summary:
+            {conversation_text}
+
+            Rewrite the summary so it also covers these turns. Keep the candidate's background and goals, target countries and universities, budget, recommendations given, decisions made and open questions. Drop small talk. Plain text, at most {CHAT_SUMMARY_MAX_CHARS} characters.
+            """
    
-   def ask_about_universities(self, university_name, specific_question=None):
-       try:
-           prompt = f"""
+   def ask_about_universities(self, session_id, university_name, specific_question=None):
+       return self._ask(session_id, "University query error", self._university_prompt, university_name, specific_question)
+   
+   async def ask_about_universities_async(self, session_id, university_name, specific_question=None):
+       return await self._ask_async(session_id, "University query error", self._university_prompt, university_name, specific_question)
+   
+   def _university_prompt(self, session, university_name, specific_question=None):
+       return f"""
            Based on the CV analysis context, provide detailed information about {university_name}.
            
-           CV Context: {json.dumps(self.cv_context, indent=2) if self.cv_context else "No CV context available"}
+           CV Context: {self._cv_context_reference(session)}
            
            Specific question: {specific_question or "General information about this university"}
            
@@ -87,19 +252,18 @@ class ChatbotService:
            - Location advantages
            - Application deadlines and process
            """
-           
-           response = self.model.generate_content(prompt)
-           return {"response": response.text}
-           
-       except Exception as e:
-           return {"error": f"University query error: {str(e)}"}
    
-   def ask_about_scholarships(self, scholarship_type=None, country=None):
-       try:
-           prompt = f"""
+   def ask_about_scholarships(self, session_id, scholarship_type=None, country=None):
+       return self._ask(session_id, "Scholarship query error", self._scholarship_prompt, scholarship_type, country)
+   
+   async def ask_about_scholarships_async(self, session_id, scholarship_type=None, country=None):
+       return await self._ask_async(session_id, "Scholarship query error", self._scholarship_prompt, scholarship_type, country)
+   
+   def _scholarship_prompt(self, session, scholarship_type=None, country=None):
+       return f"""
            Based on the CV analysis, provide scholarship information:
            
-           CV Context: {json.dumps(self.cv_context, indent=2) if self.cv_context else "No CV context available"}
+           CV Context: {self._cv_context_reference(session)}
            
            Scholarship focus: {scholarship_type or "all types"}
            Target country: {country or "any country"}
@@ -113,19 +277,18 @@ class ChatbotService:
            - Alternative funding options
            - Success rates and competition level
            """
-           
-           response = self.model.generate_content(prompt)
-           return {"response": response.text}
-           
-       except Exception as e:
-           return {"error": f"Scholarship query error: {str(e)}"}
    
-   def ask_about_preparation(self, timeline=None):
-       try:
-           prompt = f"""
+   def ask_about_preparation(self, session_id, timeline=None):
+       return self._ask(session_id, "Preparation query error", self._preparation_prompt, timeline)
+   
+   async def ask_about_preparation_async(self, session_id, timeline=None):
+       return await self._ask_async(session_id, "Preparation query error", self._preparation_prompt, timeline)
+   
+   def _preparation_prompt(self, session, timeline=None):
+       return f"""
            Create a detailed preparation plan based on the CV analysis:
            
-           CV Context: {json.dumps(self.cv_context, indent=2) if self.cv_context else "No CV context available"}
+           CV Context: {self._cv_context_reference(session)}
            
            Timeline: {timeline or "next 12 months"}
            Current date: {datetime.now().strftime("%Y-%m-%d")}
@@ -140,19 +303,18 @@ class ChatbotService:
            - Financial preparation
            - Monthly milestones
            """
-           
-           response = self.model.generate_content(prompt)
-           return {"response": response.text}
-           
-       except Exception as e:
-           return {"error": f"Preparation query error: {str(e)}"}
    
-   def compare_options(self, option1, option2, comparison_criteria=None):
-       try:
-           prompt = f"""
+   def compare_options(self, session_id, option1, option2, comparison_criteria=None):
+       return self._ask(session_id, "Comparison error", self._comparison_prompt, option1, option2, comparison_criteria)
+   
+   async def compare_options_async(self, session_id, option1, option2, comparison_criteria=None):
+       return await self._ask_async(session_id, "Comparison error", self._comparison_prompt, option1, option2, comparison_criteria)
+   
+   def _comparison_prompt(self, session, option1, option2, comparison_criteria=None):
+       return f"""
            Compare these two options based on the CV analysis:
            
-           CV Context: {json.dumps(self.cv_context, indent=2) if self.cv_context else "No CV context available"}
+           CV Context: {self._cv_context_reference(session)}
            
            Option 1: {option1}
            Option 2: {option2}
@@ -166,54 +328,62 @@ class ChatbotService:
            - Personal fit based on CV
            - Recommendation with reasoning
            """
-           
-           response = self.model.generate_content(prompt)
+   
+   def _ask(self, session_id, error_label, build_prompt, *args):
+       try:
+           session = self.sessions.get(session_id)
+           response = self.llm.generate_content(build_prompt(session, *args), lane="chat", context_cache=session.context_cache)
            return {"response": response.text}
            
+       except LLMBusyError:
+           raise
        except Exception as e:
-           return {"error": f"Comparison error: {str(e)}"}
+           return {"error": f"{error_label}: {str(e)}"}
    
-   def get_conversation_summary(self):
-       if not self.conversation_history:
-           return {"summary": "No conversation yet"}
-       
+   async def _ask_async(self, session_id, error_label, build_prompt, *args):
        try:
-           conversation_text = "\n".join([
-               f"User: {conv['user']}\nAssistant: {conv['assistant']}\n"
-               for conv in self.conversation_history
-           ])
-           
-           prompt = f"""
-           Summarize this conversation about study abroad planning:
-           
-           {conversation_text}
-           
-           Provide:
-           - Key topics discussed
-           - Main recommendations given
-           - Outstanding questions or next steps
-           - Progress in planning process
-           """
-           
-           response = self.model.generate_content(prompt)
-           return {"summary": response.text}
+           session = self.sessions.get(session_id)
+           response = await self.llm.generate_content_async(
+               build_prompt(session, *args), lane="chat", context_cache=session.context_cache
+           )
+           return {"response": response.text}
            
+       except LLMBusyError:
+           raise
        except Exception as e:
-           return {"error": f"Summary error: {str(e)}"}
+           return {"error": f"{error_label}: {str(e)}"}
    
-   def clear_conversation(self):
-       self.conversation_history = []
+   def get_conversation_summary(self, session_id):
+       session = self.sessions.get(session_id, create=False)
+       if session is None:
+           return {"summary": "No conversation yet"}
+       with session.lock:
+           turns = list(session.pending) + list(session.history)
+           summary = session.summary
+           summarized_turns = session.summarized_turns
+       if not summary and not turns:
+           return {"summary": "No conversation yet"}
+       
+       return {
+           "summary": summary or _extractive_summary("", turns),
+           "summarized_turns": summarized_turns,
+           "recent_questions": [" ".join(user.split())[:160] for user, _, _ in turns]
+       }
+   
+   def clear_conversation(self, session_id):
+       session = self.sessions.get(session_id, create=False)
+       if session is not None:
+           with session.lock:
+               session.reset()
+           self.sessions.update(session)
        return {"status": "Conversation cleared"}
    
-   def _build_context_prompt(self):
-       if not self.cv_context:
+   def _build_context_prompt(self, session):
+       if not session.has_cv_context:
            return "No CV analysis context available. Provide general study abroad advice."
        
-       return f"""
-       You are a study abroad consultant chatbot. Use this CV analysis context to provide personalized advice:
-       
-       CV Analysis Context:
-       {json.dumps(self.cv_context, indent=2)}
+       return """
+       You are a study abroad consultant chatbot. Use the CV analysis context provided at the start of this session to provide personalized advice.
        
        Use this information to:
        - Personalize all recommendations
@@ -223,13 +393,20 @@ class ChatbotService:
        - Account for preparation timeline and requirements
        """
    
-   def _format_conversation_history(self):
-       if not self.conversation_history:
+   def _cv_context_reference(self, session):
+       if not session.has_cv_context:
+           return "No CV context available"
+       return "Provided at the start of this session"
+   
+   def _format_conversation_history(self, session):
+       if not session.summary and not session.pending and not session.history:
            return "No previous conversation."
        
        formatted = []
-       for conv in self.conversation_history[-5:]:
-           formatted.append(f"User: {conv['user']}")
-           formatted.append(f"Assistant: {conv['assistant'][:200]}...")
+       if session.summary:
+           formatted.append(f"Summary of earlier conversation: {session.summary}")
+       for user, assistant, _ in session.pending[-CHAT_PROMPT_PENDING_TURNS:] + list(session.history):
+           formatted.append(f"User: {user[:CHAT_PROMPT_USER_CHARS]}")
+           formatted.append(f"Assistant: {assistant[:CHAT_PROMPT_ASSISTANT_CHARS]}...")
        
        return "\n".join(formatted)
\ No newline at end of file
@@ -0,0 +1,179 @@
+import os
+import re
+import unicodedata
+from collections import Counter as Occurrences
+
+from services.metrics import Counter
+
+CV_PROMPT_TOKEN_BUDGET = int(os.getenv('CV_PROMPT_TOKEN_BUDGET', 3000))
+CHARS_PER_TOKEN = 4
+FURNITURE_EDGE_LINES = 2
+
+CV_TEXT_TOKENS = Counter(
+    "cv_text_tokens_total", "Estimated CV text tokens before and after compaction", ("stage",)
+)
+
+SECTION_KEYWORDS = {
+    "summary": ("summary", "profile", "objective", "about me", "ringkasan", "profil", "tentang saya"),
+    "education": ("education", "academic background", "academic", "pendidikan", "riwayat pendidikan"),
+    "experience": ("experience", "work experience", "employment", "professional experience", "internship",
+                   "internships", "pengalaman", "pengalaman kerja", "riwayat pekerjaan", "magang"),
+    "skills": ("skills", "technical skills", "competencies", "keahlian", "keterampilan", "kemampuan"),
+    "languages": ("languages", "language", "bahasa", "language skills"),
+    "test_scores": ("test scores", "tests", "toefl", "ielts", "standardized tests"),
+    "publications": ("publications", "research", "publikasi", "penelitian"),
+    "projects": ("projects", "project", "proyek", "portfolio"),
+    "awards": ("awards", "achievements", "honors", "honours", "scholarships", "prestasi", "penghargaan"),
+    "certifications": ("certifications", "certificates", "licenses", "courses", "training", "sertifikat",
+                       "sertifikasi", "pelatihan"),
+    "organizations": ("organizations", "organisations", "organizational experience", "leadership",
+                      "activities", "extracurricular", "volunteer", "volunteering", "organisasi", "kepanitiaan"),
+    "references": ("references", "referees", "referensi"),
+    "interests": ("interests", "hobbies", "hobi", "minat"),
+    "personal": ("personal information", "personal details", "contact", "data pribadi", "informasi pribadi")
+}
+
+TRIM_ORDER = (
+    "references", "interests", "personal", "organizations", "certifications", "projects",
+    "awards", "publications", "summary", "other", "languages", "test_scores", "skills", "experience", "education"
+)
+
+_HEADING_LOOKUP = {keyword: section for section, keywords in SECTION_KEYWORDS.items() for keyword in keywords}
+_PAGE_LABEL = re.compile(
+    r"^((page|halaman|hal\.?)\s*\d{1,3}(\s*(/|of|dari)\s*\d{1,3})?|\d{1,3}\s*(/|of|dari)\s*\d{1,3})$", re.IGNORECASE
+)
+_BARE_NUMBER = re.compile(r"^\d{1,3}$")
+_HYPHEN_BREAK = re.compile(r"(\w)-\n(\w)")
+_INLINE_SPACE = re.compile(r"[ \t ]+")
+_BULLET = re.compile(r"^[•●▪■‣⁃∙\-\*·]+\s*")
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def normalize_text(text):
+    text = unicodedata.normalize("NFKC", text).replace("\r\n", "\n").replace("\r", "\n").replace("\f", "\n")
+    text = _HYPHEN_BREAK.sub(r"\1\2", text)
+    lines = []
+    for line in text.split("\n"):
+        line = _BULLET.sub("- ", _INLINE_SPACE.sub(" ", line).strip())
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def _edge_positions(indexes):
+    positions = {index: rank for rank, index in enumerate(indexes[:FURNITURE_EDGE_LINES])}
+    for rank, index in enumerate(reversed(indexes[-FURNITURE_EDGE_LINES:])):
+        positions.setdefault(index, -1 - rank)
+    return positions
+
+
+def drop_page_furniture(pages):
+    pages = [page for page in pages if any(page)]
+    multi_page = len(pages) > 1
+
+    page_numbers, edges = [], []
+    for page in pages:
+        filled = [index for index, line in enumerate(page) if line]
+        page_numbers.append({
+            index for index in _edge_positions(filled)
+            if _PAGE_LABEL.match(page[index]) or (multi_page and _BARE_NUMBER.match(page[index]))
+        })
+        edges.append(_edge_positions([index for index in filled if index not in page_numbers[-1]]))
+
+    counts = Occurrences(
+        (position, page[index].lower())
+        for page, positions in zip(pages, edges) for index, position in positions.items()
+        if len(page[index]) <= 80
+    )
+    seen = set()
+    kept = []
+    for page, numbers, positions in zip(pages, page_numbers, edges):
+        for index, line in enumerate(page):
+            if index in numbers:
+                continue
+            key = (positions.get(index), line.lower())
+            if key[0] is not None and counts.get(key, 0) >= 2 and _heading_section(line) is None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            kept.append(line)
+    return kept
+
+
+def _heading_section(line):
+    candidate = line.strip().rstrip(":").strip().lower()
+    if not candidate or len(candidate) > 40:
+        return None
+    return _HEADING_LOOKUP.get(candidate)
+
+
+def split_sections(lines):
+    sections = [["header", []]]
+    for line in lines:
+        section = _heading_section(line)
+        if section:
+            sections.append([section, [line]])
+        else:
+            sections[-1][1].append(line)
+    return [(name, body) for name, body in sections if any(body)]
+
+
+def _trim_rank(name):
+    if name == "header":
+        return len(TRIM_ORDER)
+    return TRIM_ORDER.index(name) if name in TRIM_ORDER else TRIM_ORDER.index("other")
+
+
+def compact_cv_text(text, token_budget=CV_PROMPT_TOKEN_BUDGET):
+    original_tokens = estimate_tokens(text)
+    lines = drop_page_furniture([normalize_text(page).split("\n") for page in text.split("\f")])
+    sections = [[name, body] for name, body in split_sections(lines)]
+
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    total_chars = sum(len(line) + 1 for _, body in sections for line in body)
+    drop_whole_below = TRIM_ORDER.index("organizations")
+
+    keep = max(sections, key=lambda section: _trim_rank(section[0]), default=None)
+    dropped, truncated = [], []
+    for rank in range(len(TRIM_ORDER) + 1):
+        if total_chars <= budget_chars:
+            break
+        for section in [section for section in sections if _trim_rank(section[0]) == rank and section is not keep]:
+            if total_chars <= budget_chars:
+                break
+            name, body = section
+            if rank >= drop_whole_below:
+                while len(body) > 1 and total_chars > budget_chars:
+                    total_chars -= len(body.pop()) + 1
+                if total_chars <= budget_chars:
+                    truncated.append(name)
+                    continue
+            total_chars -= sum(len(line) + 1 for line in body)
+            sections.remove(section)
+            dropped.append(name)
+
+    if keep is not None and total_chars > budget_chars:
+        body = keep[1]
+        while len(body) > 1 and total_chars - len(body[-1]) - 1 >= budget_chars:
+            total_chars -= len(body.pop()) + 1
+        if total_chars > budget_chars:
+            body[-1] = body[-1][:len(body[-1]) - (total_chars - budget_chars)].rstrip()
+        truncated.append(keep[0])
+
+    compacted = "\n".join("\n".join(body) for _, body in sections if body).strip()
+    compacted_tokens = estimate_tokens(compacted)
+    CV_TEXT_TOKENS.inc(original_tokens, stage="original")
+    CV_TEXT_TOKENS.inc(compacted_tokens, stage="compacted")
+
+    return compacted, {
+        "original_tokens": original_tokens,
+        "compacted_tokens": compacted_tokens,
+        "token_reduction": original_tokens - compacted_tokens,
+        "reduction_pct": round(100.0 * (original_tokens - compacted_tokens) / original_tokens, 1) if original_tokens else 0.0,
+        "sections": [name for name, _ in sections],
+        "dropped_sections": dropped,
+        "truncated_sections": truncated
+    }
@@ -0,0 +1,101 @@
+import os
+import time
+
+from services.metrics import Histogram
+from services.schemas import CV_ANALYSIS_SCHEMA
+from services.structured_output import generate_structured, generate_structured_async, sub_schema
+
+CV_ANALYSIS_MODE = os.getenv('CV_ANALYSIS_MODE', 'single')
+CV_SECTION_TIMEOUT = float(os.getenv('CV_SECTION_TIMEOUT', 30))
+CV_SECTION_WORKERS = int(os.getenv('CV_SECTION_WORKERS', 16))
+
+CV_SECTION_DURATION = Histogram(
+    "cv_section_duration_seconds", "Sectioned CV analysis sub-request duration", ("section", "outcome")
+)
+
+CV_SECTIONS = {
+    "profile": ("academic_analysis", "skills_assessment"),
+    "programs": ("recommended_programs",),
+    "scholarships": ("scholarship_priorities",),
+    "preparation": ("preparation_steps", "improvement_areas"),
+    "living": ("religious_facilities", "climate_security")
+}
+
+SECTION_SCHEMAS = {name: sub_schema(CV_ANALYSIS_SCHEMA, fields) for name, fields in CV_SECTIONS.items()}
+
+SECTION_INSTRUCTIONS = {
+    "profile": (
+        "Assess the candidate. academic_analysis: maximum 2 sentences on academic background and GPA. "
+        "skills_assessment: maximum 2 sentences on the most marketable skills and the critical gaps."
+    ),
+    "programs": (
+        "Recommend 3-5 specific study programs abroad that fit this candidate and budget. Use exact university "
+        "and program names, the country and city, a match_score from 1 to 10, the world ranking if known and "
+        "1 sentence of reasoning. Give tuition_per_year, living_cost_per_month and scholarship_amount_per_year "
+        "as plain numbers in the program's local currency (ISO code). Do NOT convert to IDR or compute totals."
+    ),
+    "scholarships": (
+        "List the 3-5 scholarships this candidate should prioritise. Use exact scholarship names, coverage in "
+        "IDR and percent, the next deadline (YYYY-MM-DD), the official application URL, success probability "
+        "(high/medium/low), key requirements and documents needed."
+    ),
+    "preparation": (
+        "preparation_steps: the concrete next actions (tests, documents, essays) with a deadline, cost in IDR "
+        "and priority (high/medium/low). improvement_areas: the biggest gaps with current and target level, "
+        "an action plan, a timeline and the estimated cost in IDR."
+    ),
+    "living": (
+        "For the countries this candidate is most likely to study in, describe religious_facilities (mosques, "
+        "halal food, prayer rooms, Indonesian Muslim community; churches if relevant) and climate_security "
+        "(climate type, temperature range, safety score 1-10, clothing budget in IDR, adaptation tips)."
+    )
+}
+
+
+def empty_value(schema):
+    if schema.get("type") == "array":
+        return []
+    if schema.get("type") == "object":
+        return {}
+    if schema.get("type") in ("integer", "number"):
+        return None
+    return ""
+
+
+def run_section(llm, name, contents, lane="cv_section", deadline=None):
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        result = generate_structured(llm, contents, SECTION_SCHEMAS[name], lane=lane, deadline=deadline)
+        if "error" not in result:
+            outcome = "ok"
+        return result
+    finally:
+        CV_SECTION_DURATION.observe(time.perf_counter() - start, section=name, outcome=outcome)
+
+
+async def run_section_async(llm, name, contents, lane="cv_section"):
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        result = await generate_structured_async(llm, contents, SECTION_SCHEMAS[name], lane=lane)
+        if "error" not in result:
+            outcome = "ok"
+        return result
+    finally:
+        CV_SECTION_DURATION.observe(time.perf_counter() - start, section=name, outcome=outcome)
+
+
+def merge_sections(results, errors):
+    merged = {}
+    for field, schema in CV_ANALYSIS_SCHEMA["properties"].items():
+        section = next(name for name, fields in CV_SECTIONS.items() if field in fields)
+        if field in results.get(section, {}):
+            merged[field] = results[section][field]
+        elif section in results or section in errors:
+            merged[field] = empty_value(schema)
+
+    if errors:
+        merged["partial"] = True
+        merged["section_errors"] = errors
+    return merged
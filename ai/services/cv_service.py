@@ -1,21 +1,62 @@
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv
+from services.llm_client import get_llm_client, LLMBusyError
+from services.response_cache import get_cache, make_cache_key
+from services.single_flight import AsyncSingleFlight, SingleFlight
+from services.json_stream import StreamingJSONParser
+from services.schemas import CV_ANALYSIS_SCHEMA, CV_SCHOLARSHIP_TIMELINE_SCHEMA
+from services.pdf_extraction import PDFLimitError, PDFTimeoutError, PDFTextExtractor
+from services.image_preprocessing import ImagePreprocessor, ImageTooLargeError
+from services.budget_engine import BudgetEngine
+from services.cv_compaction import compact_cv_text
+from services.cv_sections import (
+    CV_ANALYSIS_MODE, CV_SECTION_TIMEOUT, CV_SECTION_WORKERS, CV_SECTIONS, SECTION_INSTRUCTIONS, merge_sections, run_section,
+    run_section_async
+)
+from services.structured_output import (
+    complete_structured, complete_structured_async, generate_structured, generate_structured_async,
+    json_generation_config, parse_structured
+)
+import asyncio
 import base64
-from PIL import Image
-import io
-import json
+import hashlib
+import threading
+import time
 from datetime import datetime, timedelta
-import PyPDF2
-from pdf2image import convert_from_bytes
-import fitz
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
-load_dotenv()
+CV_BATCH_CONCURRENCY = int(os.getenv('CV_BATCH_CONCURRENCY', 2))
+CV_BATCH_EXTRACT_WORKERS = int(os.getenv('CV_BATCH_EXTRACT_WORKERS', 4))
+CV_BATCH_MAX_FILES = int(os.getenv('CV_BATCH_MAX_FILES', 100))
+CV_TEXT_CACHE_SIZE = int(os.getenv('CV_TEXT_CACHE_SIZE', 512))
+CV_TEXT_CACHE_MAX_CHARS = int(os.getenv('CV_TEXT_CACHE_MAX_CHARS', 20000000))
+CV_TEXT_CACHE_TTL = int(os.getenv('CV_TEXT_CACHE_TTL', 24 * 3600))
+CV_ANALYSIS_CACHE_SIZE = int(os.getenv('CV_ANALYSIS_CACHE_SIZE', 512))
+CV_ANALYSIS_CACHE_TTL = int(os.getenv('CV_ANALYSIS_CACHE_TTL', 6 * 3600))
+CV_CPU_WORKERS = int(os.getenv('CV_CPU_WORKERS', 4))
+
+_batch_extract_pool = ThreadPoolExecutor(max_workers=CV_BATCH_EXTRACT_WORKERS, thread_name_prefix="cv-batch-extract")
+_batch_analysis_pool = ThreadPoolExecutor(max_workers=CV_BATCH_CONCURRENCY, thread_name_prefix="cv-batch")
+
+def _content_hash(data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
 
 class CVService:
     def __init__(self):
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-        self.model = genai.GenerativeModel(os.getenv('GEMINI_AI_MODEL'))
+        self.llm = get_llm_client()
+        self.in_flight = SingleFlight()
+        self.async_in_flight = AsyncSingleFlight()
+        self.budget_engine = BudgetEngine()
+        self.pdf_extractor = PDFTextExtractor()
+        self.image_preprocessor = ImagePreprocessor()
+        self.text_cache = get_cache('cv_text', CV_TEXT_CACHE_SIZE, CV_TEXT_CACHE_TTL, CV_TEXT_CACHE_MAX_CHARS, len)
+        self.analysis_cache = get_cache('cv_analysis', CV_ANALYSIS_CACHE_SIZE, CV_ANALYSIS_CACHE_TTL)
+        self.analysis_mode = CV_ANALYSIS_MODE
+        self.section_timeout = CV_SECTION_TIMEOUT
+        self.section_pools = {}
+        self._section_pool_lock = threading.Lock()
+        self.cpu_pool = ThreadPoolExecutor(max_workers=CV_CPU_WORKERS, thread_name_prefix="cv-cpu")
     
     def _get_budget_classification(self, budget_limit=None, monthly_budget=None):
         if monthly_budget:
@@ -34,6 +75,10 @@ class CVService:
                 return "high"
         return "medium"
     
+    def _apply_budget(self, analysis, budget_limit=None, monthly_budget=None):
+        tier = self._get_budget_classification(budget_limit, monthly_budget)
+        return self.budget_engine.apply(analysis, tier, budget_limit, monthly_budget)
+    
     def _get_budget_strategy(self, tier):
         strategies = {
             "low": "BUDGET FRIENDLY: Focus ONLY on full scholarships (80%+ coverage), free universities, work-study programs. Prioritize countries with ultra-low living costs like Taiwan, Poland, Czech Republic.",
@@ -42,65 +87,252 @@ class CVService:
         }
         return strategies.get(tier, strategies["medium"])
 
+    def _analysis_key(self, kind, digest, budget_limit=None, monthly_budget=None):
+        return make_cache_key("cv_analysis", kind, digest, budget_limit, monthly_budget)
+    
+    def _cached_analysis(self, key, generate):
+        result = self.analysis_cache.get(key)
+        if result is not None:
+            return result
+        
+        def generate_and_store():
+            result = generate()
+            if "error" not in result and not result.get("partial"):
+                self.analysis_cache.set(key, result)
+            return result
+        
+        return self.in_flight.do(key, generate_and_store)
+    
+    async def _cached_analysis_async(self, key, generate):
+        result = self.analysis_cache.get(key)
+        if result is not None:
+            return result
+        
+        async def generate_and_store():
+            result = await generate()
+            if "error" not in result and not result.get("partial"):
+                self.analysis_cache.set(key, result)
+            return result
+        
+        return await self.async_in_flight.do(key, generate_and_store)
+    
+    async def _run_cpu(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.cpu_pool, fn, *args)
+    
+    def _store_stream(self, key, events, extra=None):
+        for event, payload in events:
+            if event == "result" and "error" not in payload:
+                payload.update(extra or {})
+                self.analysis_cache.set(key, payload)
+            yield event, payload
+    
+    async def _store_stream_async(self, key, events, extra=None):
+        async for event, payload in events:
+            if event == "result" and "error" not in payload:
+                payload.update(extra or {})
+                self.analysis_cache.set(key, payload)
+            yield event, payload
+    
+    def _replay(self, result):
+        for key, value in result.items():
+            yield "section", {"key": key, "value": value}
+        yield "result", result
+    
+    async def _replay_async(self, result):
+        for event, payload in self._replay(result):
+            yield event, payload
+    
+    def _extract_text_cached(self, pdf_data, digest=None):
+        digest = digest or _content_hash(pdf_data)
+        text = self.text_cache.get(digest)
+        if text is None:
+            text = self._extract_text_from_pdf(pdf_data)
+            self.text_cache.set(digest, text)
+        return text
+    
     def analyze_cv_pdf(self, pdf_data, budget_limit=None, monthly_budget=None):
+        digest = _content_hash(pdf_data)
+        
+        def generate():
+            pdf_text = self._extract_text_cached(pdf_data, digest)
+            return self._analyze_pdf_text(pdf_data, pdf_text, budget_limit, monthly_budget)
+        
+        return self._cached_analysis(self._analysis_key("pdf", digest, budget_limit, monthly_budget), generate)
+    
+    async def analyze_cv_pdf_async(self, pdf_data, budget_limit=None, monthly_budget=None):
+        digest = await self._run_cpu(_content_hash, pdf_data)
+        
+        async def generate():
+            pdf_text = await self._run_cpu(self._extract_text_cached, pdf_data, digest)
+            return await self._analyze_pdf_text_async(pdf_data, pdf_text, budget_limit, monthly_budget)
+        
+        return await self._cached_analysis_async(self._analysis_key("pdf", digest, budget_limit, monthly_budget), generate)
+    
+    def _analyze_pdf_text(self, pdf_data, pdf_text, budget_limit=None, monthly_budget=None, lane="cv"):
         try:
-            pdf_text = self._extract_text_from_pdf(pdf_data)
             if pdf_text.strip():
-                return self.analyze_cv_text(pdf_text, budget_limit, monthly_budget)
+                return self.analyze_cv_text(pdf_text, budget_limit, monthly_budget, lane=lane)
             else:
                 pdf_images = self._convert_pdf_to_images(pdf_data)
                 if pdf_images:
-                    return self.analyze_cv_image(pdf_images[0], budget_limit, monthly_budget)
+                    return self._analyze_cv_images(pdf_images, budget_limit, monthly_budget, lane=lane)
                 else:
                     return {"error": "Could not extract content from PDF"}
+        except (LLMBusyError, PDFTimeoutError):
+            raise
         except Exception as e:
             return {"error": f"Error processing PDF: {str(e)}"}
     
+    async def _analyze_pdf_text_async(self, pdf_data, pdf_text, budget_limit=None, monthly_budget=None):
+        try:
+            if pdf_text.strip():
+                return await self.analyze_cv_text_async(pdf_text, budget_limit, monthly_budget)
+            else:
+                pdf_images = await self._run_cpu(self._convert_pdf_to_images, pdf_data)
+                if pdf_images:
+                    return await self._analyze_cv_images_async(pdf_images, budget_limit, monthly_budget)
+                else:
+                    return {"error": "Could not extract content from PDF"}
+        except (LLMBusyError, PDFTimeoutError):
+            raise
+        except Exception as e:
+            return {"error": f"Error processing PDF: {str(e)}"}
+    
+    def analyze_cv_batch(self, files, budget_limit=None, monthly_budget=None):
+        analyses = []
+        for filename, data in files:
+            key = extraction = None
+            if filename.lower().endswith('.pdf'):
+                key = self._analysis_key("pdf", _content_hash(data), budget_limit, monthly_budget)
+                if self.analysis_cache.get(key) is None:
+                    extraction = _batch_extract_pool.submit(self._extract_text_cached, data)
+            analyses.append(_batch_analysis_pool.submit(
+                self._analyze_batch_file, filename, data, key, extraction, budget_limit, monthly_budget
+            ))
+        results = [future.result() for future in analyses]
+        
+        succeeded = sum(1 for result in results if result["status"] == "ok")
+        return {
+            "results": results,
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded
+        }
+    
+    def _analyze_batch_file(self, filename, data, key, extraction, budget_limit=None, monthly_budget=None):
+        try:
+            name = filename.lower()
+            if name.endswith('.pdf'):
+                result = self._cached_analysis(key, lambda: self._analyze_pdf_text(
+                    data, extraction.result() if extraction else self._extract_text_cached(data),
+                    budget_limit, monthly_budget, lane="cv_batch"
+                ))
+            elif name.endswith(('.png', '.jpg', '.jpeg')):
+                result = self.analyze_cv_image(data, budget_limit, monthly_budget, lane="cv_batch")
+            else:
+                result = {"error": "Only PDF, PNG, JPG, JPEG files are supported"}
+        except Exception as e:
+            result = {"error": str(e)}
+        
+        if "error" in result:
+            return {"filename": filename, "status": "error", "error": result["error"]}
+        return {"filename": filename, "status": "ok", "result": result}
+    
     def _extract_text_from_pdf(self, pdf_data):
         try:
-            pdf_document = fitz.open(stream=pdf_data, filetype="pdf")
-            text = ""
-            for page_num in range(pdf_document.page_count):
-                page = pdf_document[page_num]
-                text += page.get_text()
-            pdf_document.close()
-            return text
-        except:
-            try:
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_data))
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-                return text
-            except:
-                return ""
+            return self.pdf_extractor.extract(pdf_data)
+        except (PDFLimitError, PDFTimeoutError):
+            raise
+        except Exception:
+            return ""
     
     def _convert_pdf_to_images(self, pdf_data):
         try:
-            images = convert_from_bytes(pdf_data, first_page=1, last_page=1)
-            if images:
-                img_byte_arr = io.BytesIO()
-                images[0].save(img_byte_arr, format='PNG')
-                return [img_byte_arr.getvalue()]
-            return []
+            return self.pdf_extractor.render_pages(pdf_data)
+        except PDFTimeoutError:
+            raise
         except:
             return []
     
-    def analyze_cv_image(self, image_data, budget_limit=None, monthly_budget=None):
+    def analyze_cv_image(self, image_data, budget_limit=None, monthly_budget=None, lane="cv"):
+        key = self._analysis_key("image", _content_hash(image_data), budget_limit, monthly_budget)
+        return self._cached_analysis(key, lambda: self._analyze_cv_image(image_data, budget_limit, monthly_budget, lane))
+    
+    async def analyze_cv_image_async(self, image_data, budget_limit=None, monthly_budget=None):
+        digest = await self._run_cpu(_content_hash, image_data)
+        key = self._analysis_key("image", digest, budget_limit, monthly_budget)
+        return await self._cached_analysis_async(
+            key, lambda: self._analyze_cv_image_async(image_data, budget_limit, monthly_budget)
+        )
+    
+    def _analyze_cv_image(self, image_data, budget_limit=None, monthly_budget=None, lane="cv"):
+        try:
+            image, preprocessing = self.image_preprocessor.process(image_data)
+            result = self._analyze_cv_images([image], budget_limit, monthly_budget, lane)
+            if "error" not in result:
+                result["image_preprocessing"] = preprocessing
+            return result
+        except (ImageTooLargeError, LLMBusyError):
+            raise
+        except Exception as e:
+            return {"error": f"Error analyzing CV: {str(e)}"}
+    
+    async def _analyze_cv_image_async(self, image_data, budget_limit=None, monthly_budget=None):
+        try:
+            image, preprocessing = await self._run_cpu(self.image_preprocessor.process, image_data)
+            result = await self._analyze_cv_images_async([image], budget_limit, monthly_budget)
+            if "error" not in result:
+                result["image_preprocessing"] = preprocessing
+            return result
+        except (ImageTooLargeError, LLMBusyError):
+            raise
+        except Exception as e:
+            return {"error": f"Error analyzing CV: {str(e)}"}
+    
+    def _analyze_cv_images(self, images, budget_limit=None, monthly_budget=None, lane="cv"):
         try:
-            image = Image.open(io.BytesIO(image_data))
-            current_date = datetime.now().strftime("%Y-%m-%d")
-            
-            budget_tier = self._get_budget_classification(budget_limit, monthly_budget)
-            budget_strategy = self._get_budget_strategy(budget_tier)
-            
-            budget_context = ""
-            if budget_limit:
-                budget_context += f"Total Budget Limit: {budget_limit:,} IDR\n"
-            if monthly_budget:
-                budget_context += f"Monthly Budget: {monthly_budget:,} IDR\n"
-            
-            prompt = f"""
+            if self.analysis_mode == "sectioned":
+                result = self._generate_sections(
+                    lambda name: [self._build_section_prompt(name, None, budget_limit, monthly_budget)] + list(images),
+                    lane
+                )
+            else:
+                prompt = self._build_image_prompt(budget_limit, monthly_budget)
+                result = generate_structured(self.llm, [prompt] + list(images), CV_ANALYSIS_SCHEMA, lane=lane)
+            return self._apply_budget(result, budget_limit, monthly_budget)
+        except LLMBusyError:
+            raise
+        except Exception as e:
+            return {"error": f"Error analyzing CV: {str(e)}"}
+    
+    async def _analyze_cv_images_async(self, images, budget_limit=None, monthly_budget=None):
+        try:
+            if self.analysis_mode == "sectioned":
+                result = await self._generate_sections_async(
+                    lambda name: [self._build_section_prompt(name, None, budget_limit, monthly_budget)] + list(images)
+                )
+            else:
+                prompt = self._build_image_prompt(budget_limit, monthly_budget)
+                result = await generate_structured_async(self.llm, [prompt] + list(images), CV_ANALYSIS_SCHEMA, lane="cv")
+            return self._apply_budget(result, budget_limit, monthly_budget)
+        except LLMBusyError:
+            raise
+        except Exception as e:
+            return {"error": f"Error analyzing CV: {str(e)}"}
+    
+    def _build_image_prompt(self, budget_limit=None, monthly_budget=None):
+        current_date = datetime.now().strftime("%Y-%m-%d")
+        
+        budget_tier = self._get_budget_classification(budget_limit, monthly_budget)
+        budget_strategy = self._get_budget_strategy(budget_tier)
+        
+        budget_context = ""
+        if budget_limit:
+            budget_context += f"Total Budget Limit: {budget_limit:,} IDR\n"
+        if monthly_budget:
+            budget_context += f"Monthly Budget: {monthly_budget:,} IDR\n"
+        
+        prompt = f"""
 Current Date: {current_date}
 {budget_context}
 Budget Classification: {budget_tier.upper()}
@@ -121,11 +353,11 @@ Analyze this CV and return ONLY this JSON structure:
             "university": "Exact university name",
             "jurusan": "Specific program name",
             "country": "Country",
-            "city": "City", 
-            "annual_cost_idr": 250000000,
-            "scholarship_amount_idr": 200000000,
-            "net_cost_idr": 50000000,
-            "fits_budget": "yes/no",
+            "city": "City",
+            "currency": "EUR",
+            "tuition_per_year": 3000,
+            "living_cost_per_month": 900,
+            "scholarship_amount_per_year": 10000,
             "match_score": 8,
             "reasoning": "1 sentence why this fits"
         }}
@@ -141,13 +373,6 @@ Analyze this CV and return ONLY this JSON structure:
             "requirements": "GPA 3.5+ IELTS 7.0+"
         }}
     ],
-    "budget_breakdown": {{
-        "tuition_per_year_idr": 150000000,
-        "living_per_month_idr": 12000000,
-        "total_per_year_idr": 294000000,
-        "scholarship_potential_idr": 200000000,
-        "net_annual_cost_idr": 94000000
-    }},
     "preparation_steps": [
         {{
             "action": "Take IELTS Academic test",
@@ -181,10 +406,11 @@ Analyze this CV and return ONLY this JSON structure:
         }}
     }},
     "climate_security": {{
-        "climate": "Temperate, 5-25°C year-round",
+        "climate_type": "Temperate",
+        "temperature_range": "5-25°C year-round",
         "safety_score": 8,
         "clothing_budget_idr": 8000000,
-        "adaptation_difficulty": "Medium for Indonesian students"
+        "adaptation_tips": "Medium difficulty for Indonesian students"
     }}
 }}
 
@@ -193,30 +419,74 @@ BUDGET TIER RULES:
 - MEDIUM (15-50M/month): Focus on 50%+ scholarships + affordable countries  
 - HIGH (>50M/month): Include premium options, focus on ranking
 
-Exchange rates: 1 USD = 15,800 IDR, 1 EUR = 17,200 IDR, 1 GBP = 19,500 IDR
+Give tuition, living costs and scholarship amounts as plain numbers in the program's local currency (ISO code). Do NOT convert to IDR or compute totals.
 
 KEEP IT SHORT AND ACTIONABLE!
 """
-            
-            response = self.model.generate_content([prompt, image])
-            return self._parse_response(response.text)
+        return prompt
+    
+    def analyze_cv_text(self, cv_text, budget_limit=None, monthly_budget=None, lane="cv"):
+        key = self._analysis_key("text", _content_hash(cv_text), budget_limit, monthly_budget)
+        return self._cached_analysis(key, lambda: self._analyze_cv_text(cv_text, budget_limit, monthly_budget, lane))
+    
+    async def analyze_cv_text_async(self, cv_text, budget_limit=None, monthly_budget=None):
+        key = self._analysis_key("text", _content_hash(cv_text), budget_limit, monthly_budget)
+        return await self._cached_analysis_async(
+            key, lambda: self._analyze_cv_text_async(cv_text, budget_limit, monthly_budget)
+        )
+    
+    def _analyze_cv_text(self, cv_text, budget_limit=None, monthly_budget=None, lane="cv"):
+        try:
+            compacted_text, compaction = compact_cv_text(cv_text)
+            if self.analysis_mode == "sectioned":
+                result = self._generate_sections(
+                    lambda name: self._build_section_prompt(name, compacted_text, budget_limit, monthly_budget),
+                    lane
+                )
+            else:
+                prompt = self._build_text_prompt(compacted_text, budget_limit, monthly_budget)
+                result = generate_structured(self.llm, prompt, CV_ANALYSIS_SCHEMA, lane=lane)
+            result = self._apply_budget(result, budget_limit, monthly_budget)
+            if "error" not in result:
+                result["text_compaction"] = compaction
+            return result
+        except LLMBusyError:
+            raise
         except Exception as e:
             return {"error": f"Error analyzing CV: {str(e)}"}
     
-    def analyze_cv_text(self, cv_text, budget_limit=None, monthly_budget=None):
+    async def _analyze_cv_text_async(self, cv_text, budget_limit=None, monthly_budget=None):
         try:
-            current_date = datetime.now().strftime("%Y-%m-%d")
-            
-            budget_tier = self._get_budget_classification(budget_limit, monthly_budget)
-            budget_strategy = self._get_budget_strategy(budget_tier)
-            
-            budget_context = ""
-            if budget_limit:
-                budget_context += f"Total Budget Limit: {budget_limit:,} IDR\n"
-            if monthly_budget:
-                budget_context += f"Monthly Budget: {monthly_budget:,} IDR\n"
-            
-            prompt = f"""
+            compacted_text, compaction = compact_cv_text(cv_text)
+            if self.analysis_mode == "sectioned":
+                result = await self._generate_sections_async(
+                    lambda name: self._build_section_prompt(name, compacted_text, budget_limit, monthly_budget)
+                )
+            else:
+                prompt = self._build_text_prompt(compacted_text, budget_limit, monthly_budget)
+                result = await generate_structured_async(self.llm, prompt, CV_ANALYSIS_SCHEMA, lane="cv")
+            result = self._apply_budget(result, budget_limit, monthly_budget)
+            if "error" not in result:
+                result["text_compaction"] = compaction
+            return result
+        except LLMBusyError:
+            raise
+        except Exception as e:
+            return {"error": f"Error analyzing CV: {str(e)}"}
+    
+    def _build_text_prompt(self, cv_text, budget_limit=None, monthly_budget=None):
+        current_date = datetime.now().strftime("%Y-%m-%d")
+        
+        budget_tier = self._get_budget_classification(budget_limit, monthly_budget)
+        budget_strategy = self._get_budget_strategy(budget_tier)
+        
+        budget_context = ""
+        if budget_limit:
+            budget_context += f"Total Budget Limit: {budget_limit:,} IDR\n"
+        if monthly_budget:
+            budget_context += f"Monthly Budget: {monthly_budget:,} IDR\n"
+        
+        prompt = f"""
 Current Date: {current_date}
 {budget_context}
 Budget Classification: {budget_tier.upper()}
@@ -240,10 +510,10 @@ Return ONLY this JSON structure:
             "jurusan": "Specific program (e.g. Computer Science MSc)",
             "country": "Country",
             "city": "City",
-            "annual_cost_idr": 180000000,
-            "scholarship_amount_idr": 150000000,
-            "net_cost_idr": 30000000,
-            "fits_budget": "yes/no",
+            "currency": "PLN",
+            "tuition_per_year": 12000,
+            "living_cost_per_month": 3000,
+            "scholarship_amount_per_year": 30000,
             "match_score": 9,
             "world_ranking": 300,
             "reasoning": "1 sentence explanation"
@@ -261,13 +531,6 @@ Return ONLY this JSON structure:
             "documents_needed": "CV, motivation letter, transcripts, 2 references"
         }}
     ],
-    "budget_breakdown": {{
-        "average_tuition_idr": 120000000,
-        "average_living_monthly_idr": 15000000,
-        "total_annual_cost_idr": 300000000,
-        "best_scholarship_coverage_idr": 250000000,
-        "minimum_self_funding_idr": 50000000
-    }},
     "preparation_steps": [
         {{
             "action": "Complete IELTS Academic test",
@@ -334,22 +597,266 @@ STRICT BUDGET COMPLIANCE:
 - MEDIUM BUDGET: Target 50%+ scholarship coverage
 - HIGH BUDGET: Focus on academic prestige + career ROI
 
-Exchange rates: 1 USD = 15,800 IDR, 1 EUR = 17,200 IDR, 1 GBP = 19,500 IDR
+Give tuition, living costs and scholarship amounts as plain numbers in the program's local currency (ISO code). Do NOT convert to IDR or compute totals.
 
 NO FLUFF - ACTIONABLE ONLY!
 """
-            
-            response = self.model.generate_content(prompt)
-            return self._parse_response(response.text)
-        except Exception as e:
-            return {"error": f"Error analyzing CV: {str(e)}"}
+        return prompt
+    
+    def _section_pool(self, lane):
+        with self._section_pool_lock:
+            pool = self.section_pools.get(lane)
+            if pool is None:
+                workers = self.llm.lane_limits.get(lane, CV_SECTION_WORKERS)
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{lane}-section")
+                self.section_pools[lane] = pool
+            return pool
+    
+    def _generate_sections(self, build_contents, lane="cv"):
+        section_lane = "cv_section" if lane == "cv" else lane
+        pool = self._section_pool(section_lane)
+        deadline = time.monotonic() + self.section_timeout
+        futures = {
+            name: pool.submit(run_section, self.llm, name, build_contents(name), section_lane, deadline)
+            for name in CV_SECTIONS
+        }
+        
+        outcomes = {}
+        for name, future in futures.items():
+            try:
+                outcomes[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                future.cancel()
+                outcomes[name] = {"error": f"Timed out after {self.section_timeout:g}s"}
+            except Exception as e:
+                outcomes[name] = e
+        return self._merge_section_outcomes(outcomes)
+    
+    async def _generate_sections_async(self, build_contents):
+        tasks = {}
+        try:
+            for name in CV_SECTIONS:
+                tasks[name] = asyncio.ensure_future(run_section_async(self.llm, name, build_contents(name)))
+            _, pending = await asyncio.wait(tasks.values(), timeout=self.section_timeout)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        
+        outcomes = {}
+        for name, task in tasks.items():
+            if task in pending:
+                outcomes[name] = {"error": f"Timed out after {self.section_timeout:g}s"}
+            else:
+                outcomes[name] = task.exception() or task.result()
+        return self._merge_section_outcomes(outcomes)
+    
+    def _merge_section_outcomes(self, outcomes):
+        results, errors, busy = {}, {}, None
+        for name, outcome in outcomes.items():
+            if isinstance(outcome, Exception):
+                if isinstance(outcome, LLMBusyError):
+                    busy = outcome
+                errors[name] = str(outcome)
+            elif "error" in outcome:
+                errors[name] = outcome["error"]
+            else:
+                results[name] = outcome
+        
+        if not results:
+            if busy is not None:
+                raise busy
+            return {"error": f"Error analyzing CV: {'; '.join(sorted(set(errors.values())))}"}
+        return merge_sections(results, errors)
+    
+    def _build_section_prompt(self, section, cv_text=None, budget_limit=None, monthly_budget=None):
+        current_date = datetime.now().strftime("%Y-%m-%d")
+        
+        budget_tier = self._get_budget_classification(budget_limit, monthly_budget)
+        budget_strategy = self._get_budget_strategy(budget_tier)
+        
+        budget_context = ""
+        if budget_limit:
+            budget_context += f"Total Budget Limit: {budget_limit:,} IDR\n"
+        if monthly_budget:
+            budget_context += f"Monthly Budget: {monthly_budget:,} IDR\n"
+        
+        cv_content = f"CV Content: {cv_text}" if cv_text is not None else "CV Content: see the attached CV image."
+        
+        return f"""
+Current Date: {current_date}
+{budget_context}
+Budget Classification: {budget_tier.upper()}
+Strategy: {budget_strategy}
+
+{cv_content}
+
+{SECTION_INSTRUCTIONS[section]}
+
+Return ONLY JSON with these fields: {", ".join(CV_SECTIONS[section])}.
+Be CONCISE and ACTIONABLE. NO FLUFF.
+"""
+    
+    def analyze_cv_pdf_stream(self, pdf_data, budget_limit=None, monthly_budget=None):
+        digest = _content_hash(pdf_data)
+        key = self._analysis_key("pdf", digest, budget_limit, monthly_budget)
+        cached = self.analysis_cache.get(key)
+        if cached is not None:
+            return self._replay(cached)
+        
+        pdf_text = self._extract_text_cached(pdf_data, digest)
+        if pdf_text.strip():
+            return self._store_stream(key, self.analyze_cv_text_stream(pdf_text, budget_limit, monthly_budget))
+        
+        pdf_images = self._convert_pdf_to_images(pdf_data)
+        if pdf_images:
+            return self._store_stream(key, self._stream_cv_images(pdf_images, budget_limit, monthly_budget))
+        raise ValueError("Could not extract content from PDF")
+    
+    def analyze_cv_image_stream(self, image_data, budget_limit=None, monthly_budget=None):
+        key = self._analysis_key("image", _content_hash(image_data), budget_limit, monthly_budget)
+        cached = self.analysis_cache.get(key)
+        if cached is not None:
+            return self._replay(cached)
+        
+        image, preprocessing = self.image_preprocessor.process(image_data)
+        return self._store_stream(
+            key, self._stream_cv_images([image], budget_limit, monthly_budget), {"image_preprocessing": preprocessing}
+        )
+    
+    async def analyze_cv_pdf_stream_async(self, pdf_data, budget_limit=None, monthly_budget=None):
+        digest = await self._run_cpu(_content_hash, pdf_data)
+        key = self._analysis_key("pdf", digest, budget_limit, monthly_budget)
+        cached = self.analysis_cache.get(key)
+        if cached is not None:
+            return self._replay_async(cached)
+        
+        pdf_text = await self._run_cpu(self._extract_text_cached, pdf_data, digest)
+        if pdf_text.strip():
+            return self._store_stream_async(key, await self.analyze_cv_text_stream_async(pdf_text, budget_limit, monthly_budget))
+        
+        pdf_images = await self._run_cpu(self._convert_pdf_to_images, pdf_data)
+        if pdf_images:
+            prompt = self._build_image_prompt(budget_limit, monthly_budget)
+            return self._store_stream_async(key, self._stream_analysis_async([prompt] + list(pdf_images), budget_limit, monthly_budget))
+        raise ValueError("Could not extract content from PDF")
+    
+    async def analyze_cv_image_stream_async(self, image_data, budget_limit=None, monthly_budget=None):
+        digest = await self._run_cpu(_content_hash, image_data)
+        key = self._analysis_key("image", digest, budget_limit, monthly_budget)
+        cached = self.analysis_cache.get(key)
+        if cached is not None:
+            return self._replay_async(cached)
+        
+        image, preprocessing = await self._run_cpu(self.image_preprocessor.process, image_data)
+        prompt = self._build_image_prompt(budget_limit, monthly_budget)
+        return self._store_stream_async(
+            key, self._stream_analysis_async([prompt, image], budget_limit, monthly_budget), {"image_preprocessing": preprocessing}
+        )
+    
+    def _stream_cv_images(self, images, budget_limit=None, monthly_budget=None):
+        prompt = self._build_image_prompt(budget_limit, monthly_budget)
+        return self._stream_analysis([prompt] + list(images), budget_limit, monthly_budget)
+    
+    def analyze_cv_text_stream(self, cv_text, budget_limit=None, monthly_budget=None):
+        key = self._analysis_key("text", _content_hash(cv_text), budget_limit, monthly_budget)
+        cached = self.analysis_cache.get(key)
+        if cached is not None:
+            return self._replay(cached)
+        
+        compacted_text, compaction = compact_cv_text(cv_text)
+        prompt = self._build_text_prompt(compacted_text, budget_limit, monthly_budget)
+        return self._store_stream(key, self._stream_analysis(prompt, budget_limit, monthly_budget), {"text_compaction": compaction})
+    
+    async def analyze_cv_text_stream_async(self, cv_text, budget_limit=None, monthly_budget=None):
+        key = self._analysis_key("text", _content_hash(cv_text), budget_limit, monthly_budget)
+        cached = self.analysis_cache.get(key)
+        if cached is not None:
+            return self._replay_async(cached)
+        
+        compacted_text, compaction = compact_cv_text(cv_text)
+        prompt = self._build_text_prompt(compacted_text, budget_limit, monthly_budget)
+        return self._store_stream_async(
+            key, self._stream_analysis_async(prompt, budget_limit, monthly_budget), {"text_compaction": compaction}
+        )
+    
+    def _stream_sections(self, members, budget_limit=None, monthly_budget=None):
+        tier = self._get_budget_classification(budget_limit, monthly_budget)
+        for key, value in members:
+            if key == "recommended_programs":
+                value = self.budget_engine.price_programs(value, tier, budget_limit, monthly_budget)
+                yield "section", {"key": key, "value": value}
+                yield "section", {"key": "budget_breakdown", "value": self.budget_engine.summarize(value)}
+            else:
+                yield "section", {"key": key, "value": value}
+    
+    def _stream_analysis(self, contents, budget_limit=None, monthly_budget=None):
+        parser = StreamingJSONParser()
+        generation_config = json_generation_config(CV_ANALYSIS_SCHEMA)
+        chunks = []
+        
+        for text in self.llm.stream_content(contents, lane="cv", generation_config=generation_config):
+            chunks.append(text)
+            yield from self._stream_sections(parser.feed(text), budget_limit, monthly_budget)
+        
+        yield from self._stream_sections(parser.close(), budget_limit, monthly_budget)
+        
+        data, invalid = parse_structured("".join(chunks), CV_ANALYSIS_SCHEMA)
+        result = complete_structured(self.llm, contents, CV_ANALYSIS_SCHEMA, data, invalid, lane="cv")
+        result = self._apply_budget(result, budget_limit, monthly_budget)
+        yield "result", result
+    
+    async def _stream_analysis_async(self, contents, budget_limit=None, monthly_budget=None):
+        parser = StreamingJSONParser()
+        generation_config = json_generation_config(CV_ANALYSIS_SCHEMA)
+        chunks = []
+        
+        async for text in self.llm.stream_content_async(contents, lane="cv", generation_config=generation_config):
+            chunks.append(text)
+            for event in self._stream_sections(parser.feed(text), budget_limit, monthly_budget):
+                yield event
+        
+        for event in self._stream_sections(parser.close(), budget_limit, monthly_budget):
+            yield event
+        
+        data, invalid = parse_structured("".join(chunks), CV_ANALYSIS_SCHEMA)
+        result = await complete_structured_async(self.llm, contents, CV_ANALYSIS_SCHEMA, data, invalid, lane="cv")
+        result = self._apply_budget(result, budget_limit, monthly_budget)
+        yield "result", result
     
     def get_scholarship_timeline(self, target_countries=None, field_of_study=None, budget_limit=None):
+        current_date = datetime.now().strftime("%Y-%m-%d")
+        budget_tier = self._get_budget_classification(budget_limit, None)
+        key = ("scholarship_timeline",) + make_cache_key(current_date, target_countries, field_of_study, budget_tier)
+        return self.in_flight.do(key, lambda: self._generate_scholarship_timeline(current_date, target_countries, field_of_study, budget_tier))
+    
+    async def get_scholarship_timeline_async(self, target_countries=None, field_of_study=None, budget_limit=None):
+        current_date = datetime.now().strftime("%Y-%m-%d")
+        budget_tier = self._get_budget_classification(budget_limit, None)
+        key = ("scholarship_timeline",) + make_cache_key(current_date, target_countries, field_of_study, budget_tier)
+        return await self.async_in_flight.do(
+            key, lambda: self._generate_scholarship_timeline_async(current_date, target_countries, field_of_study, budget_tier)
+        )
+    
+    def _generate_scholarship_timeline(self, current_date, target_countries, field_of_study, budget_tier):
         try:
-            current_date = datetime.now().strftime("%Y-%m-%d")
-            budget_tier = self._get_budget_classification(budget_limit, None)
-            
-            prompt = f"""
+            prompt = self._build_timeline_prompt(current_date, target_countries, field_of_study, budget_tier)
+            return generate_structured(self.llm, prompt, CV_SCHOLARSHIP_TIMELINE_SCHEMA, lane="cv")
+        except LLMBusyError:
+            raise
+        except Exception as e:
+            return {"error": f"Error getting scholarship timeline: {str(e)}"}
+    
+    async def _generate_scholarship_timeline_async(self, current_date, target_countries, field_of_study, budget_tier):
+        try:
+            prompt = self._build_timeline_prompt(current_date, target_countries, field_of_study, budget_tier)
+            return await generate_structured_async(self.llm, prompt, CV_SCHOLARSHIP_TIMELINE_SCHEMA, lane="cv")
+        except LLMBusyError:
+            raise
+        except Exception as e:
+            return {"error": f"Error getting scholarship timeline: {str(e)}"}
+    
+    def _build_timeline_prompt(self, current_date, target_countries, field_of_study, budget_tier):
+        return f"""
 Current Date: {current_date}
 Target Countries: {target_countries or "Global"}
 Field of Study: {field_of_study or "Any"}
@@ -392,32 +899,3 @@ Return ONLY this JSON:
 
 Focus on PRACTICAL deadlines and REAL scholarship names with ACTUAL websites.
 """
-            
-            response = self.model.generate_content(prompt)
-            return self._parse_response(response.text)
-        except Exception as e:
-            return {"error": f"Error getting scholarship timeline: {str(e)}"}
-    
-    def _parse_response(self, response_text):
-        try:
-            response_text = response_text.strip()
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
-            
-            return json.loads(response_text)
-        except json.JSONDecodeError:
-            try:
-                start_idx = response_text.find('{')
-                end_idx = response_text.rfind('}') + 1
-                if start_idx != -1 and end_idx != -1:
-                    json_str = response_text[start_idx:end_idx]
-                    return json.loads(json_str)
-            except:
-                pass
-            
-            return {
-                "error": "Failed to parse AI response",
-                "raw_response": response_text
-            }
\ No newline at end of file
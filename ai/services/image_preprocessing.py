@@ -0,0 +1,138 @@
+import io
+import os
+
+from services.metrics import Counter
+
+IMAGE_MAX_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', 40000000))
+IMAGE_MAX_SIDE = int(os.getenv('IMAGE_MAX_SIDE', 1600))
+IMAGE_JPEG_QUALITY = int(os.getenv('IMAGE_JPEG_QUALITY', 85))
+IMAGE_GRAYSCALE = os.getenv('IMAGE_GRAYSCALE', 'true').lower() in ('1', 'true', 'yes')
+IMAGE_MAX_DESKEW_ANGLE = float(os.getenv('IMAGE_MAX_DESKEW_ANGLE', 10))
+IMAGE_CROP_MARGIN = float(os.getenv('IMAGE_CROP_MARGIN', 0.02))
+
+IMAGE_BYTES = Counter(
+    "image_preprocess_bytes_total", "CV image bytes before and after preprocessing", ("stage",)
+)
+
+
+class ImageTooLargeError(Exception):
+    pass
+
+
+def _deskew(gray, max_angle):
+    import cv2
+
+    foreground = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
+    coords = cv2.findNonZero(foreground)
+    if coords is None or len(coords) < 100:
+        return gray, 0.0
+
+    angle = cv2.minAreaRect(coords)[-1]
+    if angle > 45:
+        angle -= 90
+    elif angle < -45:
+        angle += 90
+    if abs(angle) < 0.5 or abs(angle) > max_angle:
+        return gray, 0.0
+
+    height, width = gray.shape
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    rotated = cv2.warpAffine(gray, matrix, (width, height), flags=cv2.INTER_LINEAR, borderValue=255)
+    return rotated, round(float(angle), 2)
+
+
+def _crop_box(gray, margin):
+    import cv2
+    import numpy as np
+
+    foreground = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
+    foreground = cv2.morphologyEx(foreground, cv2.MORPH_OPEN, np.ones((3, 3), np.uint8))
+    coords = cv2.findNonZero(foreground)
+    if coords is None:
+        return None
+
+    x, y, width, height = cv2.boundingRect(coords)
+    image_height, image_width = gray.shape
+    pad_x, pad_y = int(image_width * margin), int(image_height * margin)
+    box = (
+        max(0, x - pad_x), max(0, y - pad_y),
+        min(image_width, x + width + pad_x), min(image_height, y + height + pad_y)
+    )
+    if (box[2] - box[0]) * (box[3] - box[1]) > 0.9 * image_width * image_height:
+        return None
+    return box
+
+
+class ImagePreprocessor:
+    def __init__(self, max_pixels=IMAGE_MAX_PIXELS, max_side=IMAGE_MAX_SIDE, quality=IMAGE_JPEG_QUALITY,
+                 grayscale=IMAGE_GRAYSCALE, max_deskew_angle=IMAGE_MAX_DESKEW_ANGLE, crop_margin=IMAGE_CROP_MARGIN):
+        self.max_pixels = max_pixels
+        self.max_side = max_side
+        self.quality = quality
+        self.grayscale = grayscale
+        self.max_deskew_angle = max_deskew_angle
+        self.crop_margin = crop_margin
+
+    def open(self, image_data):
+        from PIL import Image
+
+        try:
+            image = Image.open(io.BytesIO(image_data))
+        except Image.DecompressionBombError as e:
+            raise ImageTooLargeError(str(e))
+        width, height = image.size
+        if width * height > self.max_pixels:
+            raise ImageTooLargeError(f"Image is {width}x{height} pixels, the limit is {self.max_pixels} pixels")
+        return image
+
+    def decode(self, image):
+        from PIL import ImageOps
+
+        if image.format in ("JPEG", "MPO"):
+            image.draft("L" if self.grayscale else "RGB", (self.max_side, self.max_side))
+        image = ImageOps.exif_transpose(image)
+        return image.convert("L" if self.grayscale else "RGB")
+
+    def process(self, image_data):
+        import numpy as np
+        from PIL import Image
+
+        source = self.open(image_data)
+        source_format = source.format
+        original_size = source.size
+        image = self.decode(source)
+        gray = np.asarray(image if image.mode == "L" else image.convert("L"))
+
+        gray, angle = _deskew(gray, self.max_deskew_angle)
+        if angle:
+            if image.mode == "L":
+                image = Image.fromarray(gray)
+            else:
+                image = image.rotate(angle, resample=Image.BILINEAR, fillcolor=(255, 255, 255))
+
+        box = _crop_box(gray, self.crop_margin)
+        if box:
+            image = image.crop(box)
+
+        image.thumbnail((self.max_side, self.max_side), Image.LANCZOS)
+
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=self.quality, optimize=True)
+        processed = output.getvalue()
+        mime_type = "image/jpeg"
+        if len(processed) >= len(image_data) and source_format in ("JPEG", "PNG"):
+            processed = image_data
+            mime_type = Image.MIME[source_format]
+
+        IMAGE_BYTES.inc(len(image_data), stage="original")
+        IMAGE_BYTES.inc(len(processed), stage="processed")
+        stats = {
+            "original_bytes": len(image_data),
+            "processed_bytes": len(processed),
+            "bytes_saved": len(image_data) - len(processed),
+            "original_size": list(original_size),
+            "processed_size": list(image.size),
+            "deskew_angle": angle,
+            "cropped": box is not None
+        }
+        return {"mime_type": mime_type, "data": processed}, stats
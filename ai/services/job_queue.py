@@ -0,0 +1,130 @@
+import queue
+import threading
+import time
+import uuid
+
+from services.metrics import CallbackGauge
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class JobQueue:
+    def __init__(self, name, workers=4, max_depth=100, result_ttl=3600):
+        self.name = name
+        self.workers = workers
+        self.max_depth = max_depth
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue(maxsize=max_depth)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+        self._completed = 0
+        self._failed = 0
+        self._expired = 0
+        self._rejected = 0
+        _queues.append(self)
+
+    def _ensure_workers(self):
+        if len(self._threads) >= self.workers:
+            return
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"{self.name}-worker-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, fn, *args, **kwargs):
+        self._purge_expired()
+        self._ensure_workers()
+
+        job_id = uuid.uuid4().hex
+        job = {"job_id": job_id, "status": "queued", "created_at": time.time()}
+        with self._lock:
+            self._jobs[job_id] = job
+        try:
+            self._queue.put_nowait((job_id, fn, args, kwargs))
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+                self._rejected += 1
+            raise JobQueueFullError(f"Job queue '{self.name}' is full, try again later")
+        return job_id
+
+    def _work(self):
+        while True:
+            job_id, fn, args, kwargs = self._queue.get()
+            try:
+                with self._lock:
+                    job = self._jobs.get(job_id)
+                    if job is None:
+                        continue
+                    job["status"] = "running"
+                    job["started_at"] = time.time()
+
+                try:
+                    result = fn(*args, **kwargs)
+                    error = result.get("error") if isinstance(result, dict) else None
+                except Exception as e:
+                    result, error = None, str(e)
+
+                with self._lock:
+                    job["finished_at"] = time.time()
+                    job["expires_at"] = job["finished_at"] + self.result_ttl
+                    if error:
+                        job["status"] = "failed"
+                        job["error"] = error
+                        self._failed += 1
+                    else:
+                        job["status"] = "done"
+                        job["result"] = result
+                        self._completed += 1
+            finally:
+                del fn, args, kwargs
+                self._queue.task_done()
+
+    def _purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job.get("expires_at", now + 1) <= now]
+            for job_id in expired:
+                del self._jobs[job_id]
+            self._expired += len(expired)
+
+    def get(self, job_id):
+        self._purge_expired()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+
+        if snapshot["status"] == "queued":
+            snapshot["queue_depth"] = self._queue.qsize()
+        return snapshot
+
+    def stats(self):
+        with self._lock:
+            statuses = [job["status"] for job in self._jobs.values()]
+            return {
+                "queued": statuses.count("queued"),
+                "running": statuses.count("running"),
+                "stored_results": statuses.count("done") + statuses.count("failed"),
+                "completed": self._completed,
+                "failed": self._failed,
+                "expired": self._expired,
+                "rejected": self._rejected,
+                "max_depth": self.max_depth,
+                "workers": self.workers
+            }
+
+
+_queues = []
+
+
+def _job_queue_metrics():
+    return {(job_queue.name, stat): value for job_queue in list(_queues) for stat, value in job_queue.stats().items()}
+
+
+CallbackGauge("job_queue", "Background job queue state", ("queue", "stat"), _job_queue_metrics)
@@ -0,0 +1,136 @@
+import json
+import re
+
+_SEEK, _KEY, _IN_KEY, _COLON, _VALUE_START, _VALUE, _AFTER_VALUE, _DONE = range(8)
+_TRAILING_COMMA = re.compile(r",\s*([\]}])")
+
+
+class StreamingJSONParser:
+    def __init__(self):
+        self.state = _SEEK
+        self.result = {}
+        self.errors = {}
+        self._key = None
+        self._key_chars = []
+        self._value_chars = []
+        self._value_depth = 0
+        self._value_is_string = False
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def done(self):
+        return self.state == _DONE
+
+    def feed(self, chunk):
+        completed = []
+        for ch in chunk:
+            if self.state == _DONE:
+                break
+            member = self._consume(ch)
+            if member is not None:
+                completed.append(member)
+        return completed
+
+    def close(self):
+        completed = []
+        if self.state == _VALUE and not self._value_depth and not self._value_is_string:
+            member = self._finish_value()
+            if member is not None:
+                completed.append(member)
+        self.state = _DONE
+        return completed
+
+    def _consume(self, ch):
+        state = self.state
+
+        if state == _SEEK:
+            if ch == '{':
+                self.state = _KEY
+        elif state == _KEY:
+            if ch == '"':
+                self._key_chars = []
+                self._escaped = False
+                self.state = _IN_KEY
+            elif ch == '}':
+                self.state = _DONE
+        elif state == _IN_KEY:
+            if self._escaped:
+                self._escaped = False
+                self._key_chars.append(ch)
+            elif ch == '\\':
+                self._escaped = True
+                self._key_chars.append(ch)
+            elif ch == '"':
+                self._key = json.loads('"' + ''.join(self._key_chars) + '"')
+                self.state = _COLON
+            else:
+                self._key_chars.append(ch)
+        elif state == _COLON:
+            if ch == ':':
+                self.state = _VALUE_START
+        elif state == _VALUE_START:
+            if not ch.isspace():
+                self._value_chars = [ch]
+                self._value_depth = 1 if ch in '{[' else 0
+                self._value_is_string = ch == '"'
+                self._in_string = ch == '"'
+                self._escaped = False
+                self.state = _VALUE
+        elif state == _VALUE:
+            return self._consume_value(ch)
+        elif state == _AFTER_VALUE:
+            if ch == ',':
+                self.state = _KEY
+            elif ch == '}':
+                self.state = _DONE
+        return None
+
+    def _consume_value(self, ch):
+        if self._in_string:
+            self._value_chars.append(ch)
+            if self._escaped:
+                self._escaped = False
+            elif ch == '\\':
+                self._escaped = True
+            elif ch == '"':
+                self._in_string = False
+                if self._value_is_string:
+                    self.state = _AFTER_VALUE
+                    return self._finish_value()
+            return None
+
+        if not self._value_depth and not self._value_is_string:
+            if ch == ',' or ch == '}' or ch.isspace():
+                member = self._finish_value()
+                self.state = _DONE if ch == '}' else (_KEY if ch == ',' else _AFTER_VALUE)
+                return member
+            self._value_chars.append(ch)
+            return None
+
+        self._value_chars.append(ch)
+        if ch == '"':
+            self._in_string = True
+        elif ch in '{[':
+            self._value_depth += 1
+        elif ch in '}]':
+            self._value_depth -= 1
+            if not self._value_depth:
+                self.state = _AFTER_VALUE
+                return self._finish_value()
+        return None
+
+    def _finish_value(self):
+        raw = ''.join(self._value_chars)
+        self._value_chars = []
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            try:
+                value = json.loads(_TRAILING_COMMA.sub(r"\1", raw))
+            except json.JSONDecodeError as e:
+                self.errors[self._key] = str(e)
+                return None
+
+        self.result[self._key] = value
+        return self._key, value
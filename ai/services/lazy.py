@@ -0,0 +1,53 @@
+import importlib
+import threading
+import time
+
+HEAVY_MODULES = (
+    "google.generativeai", "google.generativeai.caching", "google.api_core.exceptions",
+    "fitz", "PyPDF2", "PIL.Image", "numpy", "cv2"
+)
+
+
+class LazyService:
+    def __init__(self, name, factory):
+        self._name = name
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+        _services.append(self)
+
+    def get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    @property
+    def initialized(self):
+        return self._instance is not None
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+_services = []
+_warmup_lock = threading.Lock()
+
+
+def warmup(modules=HEAVY_MODULES):
+    timings = {}
+    with _warmup_lock:
+        for module in modules:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                continue
+            timings[module] = round(time.perf_counter() - start, 4)
+
+        for service in list(_services):
+            start = time.perf_counter()
+            service.get()
+            timings[service._name] = round(time.perf_counter() - start, 4)
+    return timings
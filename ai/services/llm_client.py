@@ -0,0 +1,465 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from dotenv import load_dotenv
+from services.metrics import (
+    CallbackGauge, LLM_CALL_DURATION, LLM_PROMPT_TOKENS, LLM_QUEUE_WAIT, LLM_RESPONSE_TOKENS
+)
+
+load_dotenv()
+
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_QUEUE_TIMEOUT = 30
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_LANE_LIMITS = "cv=3,cv_section=4,cv_batch=2,scholarship=3,chat_summary=2,prefetch=1"
+DEFAULT_CONTEXT_CACHE_MODE = "local"
+DEFAULT_CONTEXT_CACHE_MIN_TOKENS = 4096
+DEFAULT_CONTEXT_CACHE_TTL = 3600
+DEFAULT_CONTEXT_CACHE_RETRY = 300
+
+
+class LLMBusyError(Exception):
+    pass
+
+
+class _AsyncWaiter:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+
+    def wake(self):
+        self.loop.call_soon_threadsafe(self.event.set)
+
+
+class _Limiter:
+    def __init__(self, max_in_flight, max_queue):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.waiting = deque()
+        self.condition = threading.Condition()
+
+    def acquire(self, timeout=None):
+        with self.condition:
+            if not self.waiting and self.in_flight < self.max_in_flight:
+                self.in_flight += 1
+                return
+
+            if len(self.waiting) >= self.max_queue:
+                raise LLMBusyError("LLM service is busy, please retry shortly")
+
+            ticket = object()
+            self.waiting.append(ticket)
+            deadline = time.monotonic() + timeout if timeout else None
+            try:
+                while self.waiting[0] is not ticket or self.in_flight >= self.max_in_flight:
+                    remaining = deadline - time.monotonic() if deadline else None
+                    if remaining is not None and remaining <= 0:
+                        raise LLMBusyError("Timed out waiting for an LLM slot, please retry shortly")
+                    self.condition.wait(remaining)
+            except BaseException:
+                self.waiting.remove(ticket)
+                self._notify()
+                raise
+
+            self.waiting.popleft()
+            self.in_flight += 1
+            self._notify()
+
+    async def acquire_async(self, timeout=None):
+        with self.condition:
+            if not self.waiting and self.in_flight < self.max_in_flight:
+                self.in_flight += 1
+                return
+
+            if len(self.waiting) >= self.max_queue:
+                raise LLMBusyError("LLM service is busy, please retry shortly")
+
+            ticket = _AsyncWaiter()
+            self.waiting.append(ticket)
+
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            while True:
+                with self.condition:
+                    if self.waiting[0] is ticket and self.in_flight < self.max_in_flight:
+                        self.waiting.popleft()
+                        self.in_flight += 1
+                        self._notify()
+                        return
+                    ticket.event.clear()
+
+                remaining = deadline - time.monotonic() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    raise LLMBusyError("Timed out waiting for an LLM slot, please retry shortly")
+                try:
+                    await asyncio.wait_for(ticket.event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self.condition:
+                self.waiting.remove(ticket)
+                self._notify()
+            raise
+
+    def release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self._notify()
+
+    def _notify(self):
+        self.condition.notify_all()
+        if self.waiting and isinstance(self.waiting[0], _AsyncWaiter):
+            self.waiting[0].wake()
+
+    def stats(self):
+        with self.condition:
+            return {
+                "in_flight": self.in_flight,
+                "queued": len(self.waiting),
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue
+            }
+
+
+class LocalContextCache:
+    model = None
+
+    def __init__(self, text):
+        self.text = text
+
+    def contents(self, contents):
+        return [self.text] + (list(contents) if isinstance(contents, list) else [contents])
+
+    def release(self):
+        pass
+
+
+class RemoteContextCache:
+    def __init__(self, cached_content):
+        import google.generativeai as genai
+
+        self.cached_content = cached_content
+        self.model = genai.GenerativeModel.from_cached_content(cached_content)
+
+    def contents(self, contents):
+        return contents
+
+    def release(self):
+        try:
+            self.cached_content.delete()
+        except Exception:
+            pass
+
+
+class LLMClient:
+    def __init__(self, api_key=None, default_model=None, max_in_flight=None, max_queue=None,
+                 queue_timeout=None, max_retries=None, lane_limits=None, model_factory=None):
+        self.default_model = default_model or os.getenv('GEMINI_AI_MODEL')
+        self.max_in_flight = max_in_flight or int(os.getenv('GEMINI_MAX_CONCURRENCY', DEFAULT_MAX_IN_FLIGHT))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv('GEMINI_MAX_QUEUE', DEFAULT_MAX_QUEUE))
+        self.queue_timeout = queue_timeout if queue_timeout is not None else float(os.getenv('GEMINI_QUEUE_TIMEOUT', DEFAULT_QUEUE_TIMEOUT))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('GEMINI_MAX_RETRIES', DEFAULT_MAX_RETRIES))
+        self.lane_limits = lane_limits if lane_limits is not None else self._parse_lane_limits(
+            os.getenv('GEMINI_LANE_LIMITS', DEFAULT_LANE_LIMITS)
+        )
+        self.context_cache_mode = os.getenv('GEMINI_CONTEXT_CACHE', DEFAULT_CONTEXT_CACHE_MODE)
+        self.context_cache_min_tokens = int(os.getenv('GEMINI_CONTEXT_CACHE_MIN_TOKENS', DEFAULT_CONTEXT_CACHE_MIN_TOKENS))
+        self.context_cache_ttl = int(os.getenv('GEMINI_CONTEXT_CACHE_TTL', DEFAULT_CONTEXT_CACHE_TTL))
+        self.context_cache_retry = int(os.getenv('GEMINI_CONTEXT_CACHE_RETRY', DEFAULT_CONTEXT_CACHE_RETRY))
+        self._remote_cache_disabled_until = 0
+
+        self.api_key = api_key
+        self.model_factory = model_factory or self._gemini_model
+        self._configured = False
+
+        self._models = {}
+        self._model_limiters = {}
+        self._lane_limiters = {}
+        self._lock = threading.Lock()
+
+    def _configure(self):
+        import google.generativeai as genai
+
+        if not self._configured:
+            genai.configure(api_key=self.api_key or os.getenv('GEMINI_API_KEY'))
+            self._configured = True
+        return genai
+
+    def _gemini_model(self, model_name):
+        return self._configure().GenerativeModel(model_name)
+
+    def _parse_lane_limits(self, spec):
+        limits = {}
+        for item in spec.split(','):
+            if '=' not in item:
+                continue
+            lane, limit = item.split('=', 1)
+            limits[lane.strip()] = int(limit)
+        return limits
+
+    def get_model(self, model_name=None):
+        model_name = model_name or self.default_model
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is None:
+                model = self.model_factory(model_name)
+                self._models[model_name] = model
+                self._model_limiters[model_name] = _Limiter(self.max_in_flight, self.max_queue)
+            return model
+
+    def _get_limiters(self, model_name, lane):
+        self.get_model(model_name)
+        with self._lock:
+            limiters = []
+            if lane in self.lane_limits:
+                lane_limiter = self._lane_limiters.get(lane)
+                if lane_limiter is None:
+                    lane_limiter = _Limiter(self.lane_limits[lane], self.max_queue)
+                    self._lane_limiters[lane] = lane_limiter
+                limiters.append(lane_limiter)
+            limiters.append(self._model_limiters[model_name])
+            return limiters
+
+    def _acquire(self, limiters, deadline=None):
+        if self.queue_timeout:
+            queue_deadline = time.monotonic() + self.queue_timeout
+            deadline = min(deadline, queue_deadline) if deadline else queue_deadline
+        acquired = []
+        try:
+            for limiter in limiters:
+                remaining = max(deadline - time.monotonic(), 0.001) if deadline else None
+                limiter.acquire(remaining)
+                acquired.append(limiter)
+        except BaseException:
+            self._release(acquired)
+            raise
+        return acquired
+
+    async def _acquire_async(self, limiters):
+        deadline = time.monotonic() + self.queue_timeout if self.queue_timeout else None
+        acquired = []
+        try:
+            for limiter in limiters:
+                remaining = max(deadline - time.monotonic(), 0.001) if deadline else None
+                await limiter.acquire_async(remaining)
+                acquired.append(limiter)
+        except BaseException:
+            self._release(acquired)
+            raise
+        return acquired
+
+    def _release(self, limiters):
+        for limiter in reversed(limiters):
+            limiter.release()
+
+    def create_context_cache(self, text, model_name=None):
+        if (self.context_cache_mode == "remote" and len(text) // 4 >= self.context_cache_min_tokens
+                and time.monotonic() >= self._remote_cache_disabled_until):
+            try:
+                self._configure()
+                from google.generativeai import caching
+
+                cached_content = caching.CachedContent.create(
+                    model=model_name or self.default_model,
+                    contents=[text],
+                    ttl=timedelta(seconds=self.context_cache_ttl)
+                )
+                return RemoteContextCache(cached_content)
+            except Exception:
+                self._remote_cache_disabled_until = time.monotonic() + self.context_cache_retry
+        return LocalContextCache(text)
+
+    def _resolve(self, contents, model_name, context_cache):
+        model = self.get_model(model_name)
+        if context_cache is not None:
+            contents = context_cache.contents(contents)
+            model = context_cache.model or model
+        return model, contents
+
+    def _acquire_timed(self, model_name, lane, deadline=None):
+        start = time.perf_counter()
+        try:
+            return self._acquire(self._get_limiters(model_name, lane), deadline)
+        finally:
+            LLM_QUEUE_WAIT.observe(time.perf_counter() - start, lane=lane)
+
+    async def _acquire_timed_async(self, model_name, lane):
+        start = time.perf_counter()
+        try:
+            return await self._acquire_async(self._get_limiters(model_name, lane))
+        finally:
+            LLM_QUEUE_WAIT.observe(time.perf_counter() - start, lane=lane)
+
+    def _record_usage(self, usage, model_name, lane):
+        if usage is None:
+            return
+        LLM_PROMPT_TOKENS.observe(getattr(usage, 'prompt_token_count', 0) or 0, model=model_name, lane=lane)
+        LLM_RESPONSE_TOKENS.observe(getattr(usage, 'candidates_token_count', 0) or 0, model=model_name, lane=lane)
+
+    def generate_content(self, contents, lane="default", model_name=None, context_cache=None, deadline=None, **kwargs):
+        from google.api_core import exceptions as google_exceptions
+
+        model_name = model_name or self.default_model
+        model, contents = self._resolve(contents, model_name, context_cache)
+        acquired = self._acquire_timed(model_name, lane, deadline)
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            attempt = 0
+            while True:
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise google_exceptions.DeadlineExceeded("Deadline exceeded before the model call")
+                    kwargs["request_options"] = dict(kwargs.get("request_options") or {}, timeout=remaining)
+                try:
+                    response = model.generate_content(contents, **kwargs)
+                    outcome = "ok"
+                    self._record_usage(getattr(response, 'usage_metadata', None), model_name, lane)
+                    return response
+                except google_exceptions.ResourceExhausted:
+                    if attempt >= self.max_retries or (deadline is not None and time.monotonic() + 2 ** attempt >= deadline):
+                        outcome = "rate_limited"
+                        raise
+                    time.sleep(2 ** attempt)
+                    attempt += 1
+        finally:
+            self._release(acquired)
+            LLM_CALL_DURATION.observe(time.perf_counter() - start, model=model_name, lane=lane, outcome=outcome)
+
+    def stream_content(self, contents, lane="default", model_name=None, context_cache=None, **kwargs):
+        model_name = model_name or self.default_model
+        model, contents = self._resolve(contents, model_name, context_cache)
+        acquired = self._acquire_timed(model_name, lane)
+        start = time.perf_counter()
+        outcome = "error"
+        usage = None
+        try:
+            for chunk in model.generate_content(contents, stream=True, **kwargs):
+                usage = getattr(chunk, 'usage_metadata', None) or usage
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue
+                if text:
+                    yield text
+            outcome = "ok"
+            self._record_usage(usage, model_name, lane)
+        finally:
+            self._release(acquired)
+            LLM_CALL_DURATION.observe(time.perf_counter() - start, model=model_name, lane=lane, outcome=outcome)
+
+    async def _call_async(self, model, contents, **kwargs):
+        generate = getattr(model, 'generate_content_async', None)
+        if generate is not None:
+            return await generate(contents, **kwargs)
+        return await asyncio.to_thread(model.generate_content, contents, **kwargs)
+
+    async def generate_content_async(self, contents, lane="default", model_name=None, context_cache=None, **kwargs):
+        from google.api_core import exceptions as google_exceptions
+
+        model_name = model_name or self.default_model
+        model, contents = self._resolve(contents, model_name, context_cache)
+        acquired = await self._acquire_timed_async(model_name, lane)
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            attempt = 0
+            while True:
+                try:
+                    response = await self._call_async(model, contents, **kwargs)
+                    outcome = "ok"
+                    self._record_usage(getattr(response, 'usage_metadata', None), model_name, lane)
+                    return response
+                except google_exceptions.ResourceExhausted:
+                    if attempt >= self.max_retries:
+                        outcome = "rate_limited"
+                        raise
+                    await asyncio.sleep(2 ** attempt)
+                    attempt += 1
+        finally:
+            self._release(acquired)
+            LLM_CALL_DURATION.observe(time.perf_counter() - start, model=model_name, lane=lane, outcome=outcome)
+
+    async def _stream_chunks_async(self, model, contents, **kwargs):
+        if getattr(model, 'generate_content_async', None) is not None:
+            async for chunk in await model.generate_content_async(contents, stream=True, **kwargs):
+                yield chunk
+            return
+
+        chunks = iter(await asyncio.to_thread(model.generate_content, contents, stream=True, **kwargs))
+        done = object()
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, done)
+            if chunk is done:
+                return
+            yield chunk
+
+    async def stream_content_async(self, contents, lane="default", model_name=None, context_cache=None, **kwargs):
+        model_name = model_name or self.default_model
+        model, contents = self._resolve(contents, model_name, context_cache)
+        acquired = await self._acquire_timed_async(model_name, lane)
+        start = time.perf_counter()
+        outcome = "error"
+        usage = None
+        try:
+            async for chunk in self._stream_chunks_async(model, contents, **kwargs):
+                usage = getattr(chunk, 'usage_metadata', None) or usage
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue
+                if text:
+                    yield text
+            outcome = "ok"
+            self._record_usage(usage, model_name, lane)
+        finally:
+            self._release(acquired)
+            LLM_CALL_DURATION.observe(time.perf_counter() - start, model=model_name, lane=lane, outcome=outcome)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "models": {name: limiter.stats() for name, limiter in self._model_limiters.items()},
+                "lanes": {name: limiter.stats() for name, limiter in self._lane_limiters.items()}
+            }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient()
+    return _client
+
+
+def set_llm_client(client):
+    global _client
+    with _client_lock:
+        _client = client
+    return client
+
+
+def _slot_usage():
+    if _client is None:
+        return {}
+    stats = _client.stats()
+    values = {}
+    for scope in ("models", "lanes"):
+        for name, limiter in stats[scope].items():
+            values[(scope[:-1], name, "in_flight")] = limiter["in_flight"]
+            values[(scope[:-1], name, "queued")] = limiter["queued"]
+    return values
+
+
+CallbackGauge("llm_slots", "In-flight and queued Gemini calls per model and lane", ("scope", "name", "state"), _slot_usage)
@@ -0,0 +1,283 @@
+import io
+import multiprocessing
+import os
+import threading
+import time
+from multiprocessing.connection import wait
+
+from services.metrics import PDF_EXTRACTION_DURATION
+
+PDF_MAX_BYTES = int(os.getenv('PDF_MAX_BYTES', 10 * 1024 * 1024))
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', 50))
+PDF_MAX_TEXT_CHARS = int(os.getenv('PDF_MAX_TEXT_CHARS', 200000))
+PDF_EXTRACTION_TIMEOUT = float(os.getenv('PDF_EXTRACTION_TIMEOUT', 15))
+PDF_EXTRACTION_WORKERS = int(os.getenv('PDF_EXTRACTION_WORKERS', min(4, os.cpu_count() or 1)))
+PDF_PARALLEL_PAGE_THRESHOLD = int(os.getenv('PDF_PARALLEL_PAGE_THRESHOLD', 12))
+PDF_PAGES_PER_TASK = int(os.getenv('PDF_PAGES_PER_TASK', 6))
+PDF_WORKER_MAX_TASKS = int(os.getenv('PDF_WORKER_MAX_TASKS', 200))
+PDF_RASTER_DPI = int(os.getenv('PDF_RASTER_DPI', 150))
+PDF_RASTER_MAX_SIDE = int(os.getenv('PDF_RASTER_MAX_SIDE', 2048))
+PDF_RASTER_MAX_PAGES = int(os.getenv('PDF_RASTER_MAX_PAGES', 1))
+PDF_RASTER_GRAYSCALE = os.getenv('PDF_RASTER_GRAYSCALE', 'true').lower() in ('1', 'true', 'yes')
+
+
+class PDFLimitError(Exception):
+    pass
+
+
+class PDFTimeoutError(Exception):
+    pass
+
+
+class _WorkerExited(RuntimeError):
+    pass
+
+
+def _collect(texts, max_chars):
+    buffer = io.StringIO()
+    remaining = max_chars
+    for text in texts:
+        if remaining <= 0:
+            break
+        chunk = text[:remaining]
+        buffer.write(chunk)
+        remaining -= len(chunk)
+    return buffer.getvalue()
+
+
+def _fitz_extract_pages(pdf_data, start, stop, max_chars):
+    import fitz
+
+    with fitz.open(stream=pdf_data, filetype="pdf") as document:
+        return _collect((document[page].get_text() + "\f" for page in range(start, stop)), max_chars)
+
+
+def _fitz_extract_document(pdf_data, max_pages, max_chars, parallel_threshold):
+    import fitz
+
+    with fitz.open(stream=pdf_data, filetype="pdf") as document:
+        page_count = document.page_count
+        if page_count > max_pages:
+            raise PDFLimitError(f"PDF has {page_count} pages, the limit is {max_pages}")
+        if page_count > parallel_threshold:
+            return page_count, None
+        return page_count, _collect((page.get_text() + "\f" for page in document), max_chars)
+
+
+def _fitz_render_pages(pdf_data, max_pages, dpi, max_side, grayscale):
+    import fitz
+
+    colorspace = fitz.csGRAY if grayscale else fitz.csRGB
+    rendered = []
+    with fitz.open(stream=pdf_data, filetype="pdf") as document:
+        for page in document.pages(0, min(max_pages, document.page_count)):
+            zoom = min(dpi / 72.0, max_side / max(page.rect.width, page.rect.height))
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=colorspace, alpha=False)
+            rendered.append((pixmap.width, pixmap.height, pixmap.stride, pixmap.samples))
+    return rendered
+
+
+def _pypdf2_extract_document(pdf_data, max_pages, max_chars):
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_data))
+    page_count = len(reader.pages)
+    if page_count > max_pages:
+        raise PDFLimitError(f"PDF has {page_count} pages, the limit is {max_pages}")
+    return _collect(((page.extract_text() or "") + "\f" for page in reader.pages), max_chars)
+
+
+def _worker_main(conn):
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        fn, args = task
+        try:
+            outcome = (True, fn(*args))
+        except Exception as e:
+            outcome = (False, e)
+        try:
+            conn.send(outcome)
+        except Exception as e:
+            conn.send((False, RuntimeError(f"PDF worker could not return its result: {e}")))
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def submit(self, fn, args):
+        self.tasks += 1
+        self.conn.send((fn, args))
+
+    def result(self):
+        try:
+            ok, value = self.conn.recv()
+        except (EOFError, OSError):
+            raise _WorkerExited("PDF worker exited unexpectedly")
+        if not ok:
+            raise value
+        return value
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(1)
+        self.conn.close()
+
+
+class PDFTextExtractor:
+    def __init__(self, workers=PDF_EXTRACTION_WORKERS, max_bytes=PDF_MAX_BYTES, max_pages=PDF_MAX_PAGES,
+                 max_chars=PDF_MAX_TEXT_CHARS, timeout=PDF_EXTRACTION_TIMEOUT,
+                 parallel_threshold=PDF_PARALLEL_PAGE_THRESHOLD, pages_per_task=PDF_PAGES_PER_TASK):
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.parallel_threshold = parallel_threshold
+        self.pages_per_task = pages_per_task
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(max(1, workers))
+        self._idle = []
+        self._idle_lock = threading.Lock()
+
+    def _checkout(self, deadline, block):
+        acquired = (
+            self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())) if block
+            else self._slots.acquire(blocking=False)
+        )
+        if not acquired:
+            return None
+        with self._idle_lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                worker.kill()
+        try:
+            return _Worker(self._context)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _checkin(self, worker):
+        if worker.tasks >= PDF_WORKER_MAX_TASKS:
+            worker.stop()
+        else:
+            with self._idle_lock:
+                self._idle.append(worker)
+        self._slots.release()
+
+    def _discard(self, worker):
+        worker.kill()
+        self._slots.release()
+
+    def _run(self, deadline, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        return self._gather(deadline, [(fn, args)])[0]
+
+    def _gather(self, deadline, tasks):
+        if not self.workers:
+            return [fn(*args) for fn, args in tasks]
+
+        results = [None] * len(tasks)
+        queued = list(enumerate(tasks))
+        running = {}
+        try:
+            while queued or running:
+                while queued:
+                    worker = self._checkout(deadline, block=not running)
+                    if worker is None:
+                        break
+                    index, (fn, args) = queued.pop(0)
+                    running[worker.conn] = (worker, index)
+                    worker.submit(fn, args)
+                if not running:
+                    raise PDFTimeoutError(f"No PDF worker became free within {self.timeout:g}s")
+
+                ready = wait(list(running), timeout=max(0.0, deadline - time.monotonic()))
+                if not ready:
+                    raise PDFTimeoutError(f"PDF processing timed out after {self.timeout:g}s")
+                for conn in ready:
+                    worker, index = running.pop(conn)
+                    try:
+                        results[index] = worker.result()
+                    except _WorkerExited:
+                        self._discard(worker)
+                        raise
+                    except Exception:
+                        self._checkin(worker)
+                        raise
+                    self._checkin(worker)
+            return results
+        finally:
+            for worker, _ in running.values():
+                self._discard(worker)
+
+    def extract(self, pdf_data):
+        if len(pdf_data) > self.max_bytes:
+            raise PDFLimitError(f"PDF is {len(pdf_data)} bytes, the limit is {self.max_bytes}")
+
+        deadline = time.monotonic() + self.timeout
+        try:
+            with PDF_EXTRACTION_DURATION.time(method="fitz"):
+                return self._extract_fitz(pdf_data, deadline)
+        except (PDFLimitError, PDFTimeoutError):
+            raise
+        except Exception:
+            with PDF_EXTRACTION_DURATION.time(method="pypdf2"):
+                return self._run(deadline, _pypdf2_extract_document, pdf_data, self.max_pages, self.max_chars)
+
+    def render_pages(self, pdf_data, max_pages=PDF_RASTER_MAX_PAGES, dpi=PDF_RASTER_DPI,
+                     max_side=PDF_RASTER_MAX_SIDE, grayscale=PDF_RASTER_GRAYSCALE):
+        from PIL import Image
+
+        if len(pdf_data) > self.max_bytes:
+            raise PDFLimitError(f"PDF is {len(pdf_data)} bytes, the limit is {self.max_bytes}")
+
+        deadline = time.monotonic() + self.timeout
+        mode = "L" if grayscale else "RGB"
+        with PDF_EXTRACTION_DURATION.time(method="fitz_raster"):
+            rendered = self._run(
+                deadline, _fitz_render_pages, pdf_data, min(max_pages, self.max_pages), dpi, max_side, grayscale
+            )
+        return [
+            Image.frombuffer(mode, (width, height), samples, "raw", mode, stride, 1)
+            for width, height, stride, samples in rendered
+        ]
+
+    def _extract_fitz(self, pdf_data, deadline):
+        page_count, text = self._run(
+            deadline, _fitz_extract_document, pdf_data, self.max_pages, self.max_chars, self.parallel_threshold
+        )
+        if text is not None:
+            return text
+
+        tasks = [
+            (_fitz_extract_pages, (pdf_data, start, min(start + self.pages_per_task, page_count), self.max_chars))
+            for start in range(0, page_count, self.pages_per_task)
+        ]
+        return _collect(self._gather(deadline, tasks), self.max_chars)
+
+    def shutdown(self):
+        with self._idle_lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+            worker.process.join(5)
@@ -0,0 +1,129 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from services.metrics import CallbackGauge
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, maxsize=256, ttl=3600, max_weight=None, weigher=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.weight = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at, weight = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.weight -= weight
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        weight = self.weigher(value) if self.weigher else 0
+        if self.max_weight is not None and weight > self.max_weight:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.weight -= previous[2]
+            self._data[key] = (value, expires_at, weight)
+            self.weight += weight
+            while len(self._data) > self.maxsize or (self.max_weight is not None and self.weight > self.max_weight):
+                _, (_, _, evicted_weight) = self._data.popitem(last=False)
+                self.weight -= evicted_weight
+                self.evictions += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and entry[1] > time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.weight = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "weight": self.weight,
+                "max_weight": self.max_weight,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+
+def _normalize(value):
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().lower()
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted((_normalize(item) for item in value), key=str))
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _normalize(v)) for k, v in value.items()))
+    return str(value).strip().lower()
+
+
+def make_cache_key(*parts):
+    return tuple(_normalize(part) for part in parts)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name, maxsize=256, ttl=3600, max_weight=None, weigher=None):
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = TTLCache(maxsize, ttl, max_weight, weigher)
+            _caches[name] = cache
+        return cache
+
+
+def get_cache_stats():
+    with _caches_lock:
+        caches = dict(_caches)
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+def _cache_metrics():
+    values = {}
+    for name, stats in get_cache_stats().items():
+        for stat in ("size", "weight", "hits", "misses", "evictions", "expirations"):
+            values[(name, stat)] = stats[stat]
+    return values
+
+
+CallbackGauge("response_cache", "Response cache size and lookup counters", ("cache", "stat"), _cache_metrics)
@@ -0,0 +1,189 @@
+STRING = {"type": "string"}
+INTEGER = {"type": "integer"}
+NUMBER = {"type": "number"}
+STRING_LIST = {"type": "array", "items": STRING}
+
+
+def _enum(*values):
+    return {"type": "string", "format": "enum", "enum": list(values)}
+
+
+def _nullable(schema):
+    return dict(schema, nullable=True)
+
+
+def _object(properties, optional=()):
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": [name for name in properties if name not in optional]
+    }
+
+
+def _array(items):
+    return {"type": "array", "items": items}
+
+
+def _strings(*names):
+    return {name: STRING for name in names}
+
+
+YES_NO = _enum("yes", "no")
+LEVEL = _enum("high", "medium", "low")
+
+
+CV_ANALYSIS_SCHEMA = _object({
+    "academic_analysis": STRING,
+    "skills_assessment": STRING,
+    "recommended_programs": _array(_object({
+        **_strings("university", "jurusan", "country", "city", "currency"),
+        "tuition_per_year": NUMBER,
+        "living_cost_per_month": NUMBER,
+        "scholarship_amount_per_year": NUMBER,
+        "match_score": INTEGER,
+        "world_ranking": _nullable(INTEGER),
+        "reasoning": STRING
+    }, optional=("world_ranking",))),
+    "scholarship_priorities": _array(_object({
+        "name": STRING,
+        "coverage_idr": INTEGER,
+        "coverage_percentage": INTEGER,
+        **_strings("deadline", "application_url"),
+        "success_probability": LEVEL,
+        **_strings("requirements", "documents_needed")
+    }, optional=("documents_needed",))),
+    "preparation_steps": _array(_object({
+        **_strings("action", "deadline"),
+        "cost_idr": INTEGER,
+        "priority": LEVEL
+    })),
+    "improvement_areas": _array(_object({
+        **_strings("area", "current_level", "target_level", "action_plan", "timeline"),
+        "estimated_cost_idr": INTEGER
+    })),
+    "religious_facilities": _object({
+        "islam": _object(
+            _strings("availability", "mosque_distance", "halal_food", "prayer_rooms", "community"),
+            optional=("community",)
+        ),
+        "christian": _object(_strings("availability", "church_distance", "denominations"))
+    }, optional=("christian",)),
+    "climate_security": _object({
+        **_strings("climate_type", "temperature_range"),
+        "safety_score": INTEGER,
+        "clothing_budget_idr": INTEGER,
+        "adaptation_tips": STRING
+    })
+})
+
+
+CV_SCHOLARSHIP_TIMELINE_SCHEMA = _object({
+    "urgent_deadlines": _array(_object({
+        **_strings("scholarship", "deadline"),
+        "days_remaining": INTEGER,
+        "coverage_idr": INTEGER,
+        **_strings("application_url", "success_rate")
+    })),
+    "upcoming_applications": _array(_object({
+        **_strings("scholarship", "opens", "deadline"),
+        "coverage_idr": INTEGER,
+        **_strings("preparation_time_needed", "key_requirements")
+    })),
+    "budget_focused_options": _array(_object({
+        "scholarship": STRING,
+        "covers_everything": YES_NO,
+        "amount_idr": INTEGER,
+        "remaining_costs_idr": INTEGER,
+        "fits_low_budget": YES_NO
+    }))
+})
+
+
+def _phase(*task_fields):
+    return _object({
+        "timeframe": STRING,
+        "tasks": _array(_object(_strings("task", "deadline", "estimated_cost_idr", *task_fields)))
+    })
+
+
+SCHOLARSHIP_TIMELINE_SCHEMA = _object({
+    "available_scholarships": _array(_object(_strings(
+        "scholarship_name", "provider", "amount_idr", "coverage", "eligibility",
+        "application_deadline", "notification_date", "fits_timeline", "competitiveness"
+    ))),
+    "application_requirements": _object({
+        "documents_needed": _array(_object(_strings(
+            "document", "description", "where_to_get", "processing_time", "cost_idr", "validity_period"
+        ))),
+        "tests_required": _array(_object(_strings(
+            "test_name", "minimum_score", "test_centers", "registration_cost_idr", "preparation_time", "validity_period"
+        ))),
+        "academic_requirements": _array(_object(_strings(
+            "requirement", "minimum_standard", "verification_needed", "processing_time"
+        )))
+    }),
+    "critical_timeline": _array(_object({
+        **_strings("date", "milestone", "description"),
+        "priority": _enum("critical", "high", "medium")
+    })),
+    "preparation_phases": _object({
+        "phase_1_immediate": _phase("dependencies"),
+        "phase_2_documentation": _phase("where_to_do"),
+        "phase_3_application": _phase("submission_method"),
+        "phase_4_post_application": _phase("dependencies")
+    }),
+    "budget_breakdown": _object(_strings(
+        "preparation_costs", "application_fees", "test_costs", "visa_costs", "travel_costs", "total_upfront_investment"
+    )),
+    "success_optimization": _object({
+        "application_tips": STRING_LIST,
+        "common_mistakes": STRING_LIST,
+        "backup_plans": STRING_LIST,
+        "networking_opportunities": STRING_LIST
+    }),
+    "country_specific_notes": _object(_strings("indonesian_students", "cultural_preparation", "community_support"))
+})
+
+
+UNIVERSITY_SCHOLARSHIPS_SCHEMA = _object({
+    "university_scholarships": _array(_object(_strings(
+        "scholarship_name", "type", "amount", "amount_idr", "eligibility", "application_process",
+        "deadline", "renewal_conditions", "number_awarded", "contact_information"
+    ))),
+    "external_scholarships": _array(_object(_strings(
+        "scholarship_name", "provider", "amount_idr", "eligibility", "application_deadline", "university_partnership"
+    ))),
+    "department_specific": _array(_object({
+        "department": STRING,
+        "scholarships": STRING_LIST,
+        **_strings("research_assistantships", "teaching_assistantships")
+    })),
+    "application_strategy": _object({
+        "best_scholarships_to_apply": STRING_LIST,
+        "application_timeline": STRING,
+        "required_documents": STRING_LIST,
+        "tips_for_success": STRING_LIST
+    })
+})
+
+
+PREPARATION_TIMELINE_SCHEMA = _object({
+    "timeline_analysis": _object({
+        **_strings("total_preparation_time", "recommended_minimum"),
+        "is_sufficient": YES_NO,
+        "risk_level": LEVEL
+    }),
+    "backward_timeline": _array(_object({
+        **_strings("milestone", "date", "days_before_departure"),
+        "tasks_before": STRING_LIST
+    }, optional=("days_before_departure",))),
+    "critical_deadlines": _array(_object(_strings(
+        "deadline_type", "latest_possible_date", "preparation_needed_before", "buffer_time_included"
+    ))),
+    "recommendations": _object({
+        "start_immediately": STRING_LIST,
+        "start_this_week": STRING_LIST,
+        "start_this_month": STRING_LIST,
+        "emergency_actions": STRING_LIST
+    })
+})
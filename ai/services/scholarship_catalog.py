@@ -0,0 +1,359 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+from services.structured_output import parse_number
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_SEED_PATH = os.path.join(DATA_DIR, 'scholarships.json')
+DEFAULT_DB_PATH = os.path.join(DATA_DIR, 'scholarship_catalog.db')
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = int(os.getenv('SCHOLARSHIP_SEARCH_MAX_LIMIT', 100))
+
+ANY = "*"
+ANY_FIELD = "any"
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_MONTH_DAY = re.compile(r"^\d{2}-\d{2}$")
+_WORD = re.compile(r"\w+")
+_URL = re.compile(r"^https?://\S+$", re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scholarships (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    university TEXT NOT NULL DEFAULT '',
+    provider TEXT,
+    coverage TEXT,
+    coverage_idr INTEGER,
+    min_self_funding_idr INTEGER,
+    deadline TEXT,
+    eligibility TEXT,
+    url TEXT,
+    fields_text TEXT,
+    source TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE (name, university)
+);
+CREATE INDEX IF NOT EXISTS idx_scholarships_coverage ON scholarships (coverage_idr);
+CREATE INDEX IF NOT EXISTS idx_scholarships_self_funding ON scholarships (min_self_funding_idr);
+CREATE INDEX IF NOT EXISTS idx_scholarships_deadline ON scholarships (deadline);
+CREATE TABLE IF NOT EXISTS scholarship_tags (
+    scholarship_id INTEGER NOT NULL REFERENCES scholarships (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (kind, value, scholarship_id)
+);
+CREATE INDEX IF NOT EXISTS idx_scholarship_tags_owner ON scholarship_tags (scholarship_id);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS scholarships_fts USING fts5 (
+    name, provider, university, fields_text, coverage, eligibility,
+    content='scholarships', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS scholarships_ai AFTER INSERT ON scholarships BEGIN
+    INSERT INTO scholarships_fts (rowid, name, provider, university, fields_text, coverage, eligibility)
+    VALUES (new.id, new.name, new.provider, new.university, new.fields_text, new.coverage, new.eligibility);
+END;
+CREATE TRIGGER IF NOT EXISTS scholarships_ad AFTER DELETE ON scholarships BEGIN
+    INSERT INTO scholarships_fts (scholarships_fts, rowid, name, provider, university, fields_text, coverage, eligibility)
+    VALUES ('delete', old.id, old.name, old.provider, old.university, old.fields_text, old.coverage, old.eligibility);
+END;
+CREATE TRIGGER IF NOT EXISTS scholarships_au AFTER UPDATE ON scholarships BEGIN
+    INSERT INTO scholarships_fts (scholarships_fts, rowid, name, provider, university, fields_text, coverage, eligibility)
+    VALUES ('delete', old.id, old.name, old.provider, old.university, old.fields_text, old.coverage, old.eligibility);
+    INSERT INTO scholarships_fts (rowid, name, provider, university, fields_text, coverage, eligibility)
+    VALUES (new.id, new.name, new.provider, new.university, new.fields_text, new.coverage, new.eligibility);
+END;
+"""
+
+
+def _tag(value):
+    return re.sub(r"\s+", " ", str(value or "")).strip().lower()
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [item for item in (part.strip() for part in value.split(',')) if item]
+    return [item for item in value if item]
+
+
+def _to_int(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    number = parse_number(str(value)) if value else None
+    return int(number) if number is not None else None
+
+
+def _stored_deadline(value):
+    value = str(value or "").strip()
+    return value if _ISO_DATE.match(value) or _MONTH_DAY.match(value) else None
+
+
+def _next_deadline(value, today=None):
+    value = str(value or "").strip()
+    today = today or datetime.now()
+    if _ISO_DATE.match(value):
+        return value
+    if _MONTH_DAY.match(value):
+        candidate = f"{today.year}-{value}"
+        if candidate < today.strftime("%Y-%m-%d"):
+            candidate = f"{today.year + 1}-{value}"
+        return candidate
+    return None
+
+
+def _url(value):
+    value = str(value or "").strip()
+    return value if _URL.match(value) else None
+
+
+def _fts_query(text, operator="OR"):
+    words = _WORD.findall(text or "")
+    return f" {operator} ".join(f'"{word}"' for word in words)
+
+
+class ScholarshipCatalog:
+    def __init__(self, db_path=None, seed_path=None):
+        self.db_path = db_path or os.getenv('SCHOLARSHIP_CATALOG_DB', DEFAULT_DB_PATH)
+        self.seed_path = seed_path or DEFAULT_SEED_PATH
+        self._lock = threading.Lock()
+        self.university_countries = {}
+
+        if self.db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.create_function("next_deadline", 1, _next_deadline)
+        self.conn.executescript(SCHEMA)
+        self.full_text = self._create_fts()
+        self.load_seed(self.seed_path)
+
+    def _create_fts(self):
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def load_seed(self, path):
+        if not path or not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            seed = json.load(f)
+        self.university_countries.update({_tag(name): country for name, country in seed.get("universities", {}).items()})
+        return self.upsert_many(seed.get("scholarships", []), source="curated")
+
+    def upsert_many(self, entries, source="llm"):
+        today = datetime.now()
+        count = 0
+        with self._lock, self.conn:
+            for entry in entries:
+                if self._upsert(entry, source, today):
+                    count += 1
+        return count
+
+    def _upsert(self, entry, source, today):
+        name = (entry.get("name") or "").strip()
+        if not name:
+            return False
+
+        university = (entry.get("university") or "").strip()
+        countries = _as_list(entry.get("countries"))
+        if not countries and university:
+            country = self.university_countries.get(_tag(university))
+            countries = [country] if country else []
+        fields = _as_list(entry.get("fields")) or [ANY_FIELD]
+        nationalities = _as_list(entry.get("nationalities")) or [ANY]
+
+        if source != "curated" and self.conn.execute(
+            "SELECT 1 FROM scholarships WHERE name = ? COLLATE NOCASE AND source = 'curated'", (name,)
+        ).fetchone():
+            return False
+
+        existing = self.conn.execute(
+            "SELECT id FROM scholarships WHERE name = ? AND university = ?", (name, university)
+        ).fetchone()
+
+        values = (
+            entry.get("provider"), entry.get("coverage"), _to_int(entry.get("coverage_idr")),
+            _to_int(entry.get("min_self_funding_idr")), _stored_deadline(entry.get("deadline")),
+            entry.get("eligibility"), entry.get("url"), ", ".join(fields), source, today.isoformat(timespec="seconds")
+        )
+        if existing:
+            scholarship_id = existing["id"]
+            self.conn.execute(
+                "UPDATE scholarships SET provider = ?, coverage = ?, coverage_idr = ?, min_self_funding_idr = ?, "
+                "deadline = ?, eligibility = ?, url = ?, fields_text = ?, source = ?, updated_at = ? WHERE id = ?",
+                values + (scholarship_id,)
+            )
+            self.conn.execute("DELETE FROM scholarship_tags WHERE scholarship_id = ?", (scholarship_id,))
+        else:
+            scholarship_id = self.conn.execute(
+                "INSERT INTO scholarships (name, university, provider, coverage, coverage_idr, min_self_funding_idr, "
+                "deadline, eligibility, url, fields_text, source, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (name, university) + values
+            ).lastrowid
+
+        tags = [("country", _tag(value)) for value in countries]
+        tags += [("field", _tag(value)) for value in fields]
+        tags += [("nationality", _tag(value)) for value in nationalities]
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO scholarship_tags (scholarship_id, kind, value) VALUES (?, ?, ?)",
+            [(scholarship_id, kind, value) for kind, value in tags]
+        )
+        return True
+
+    def _tag_filter(self, kind, values, wildcard):
+        placeholders = ", ".join("?" for _ in values)
+        clause = (
+            "s.id IN (SELECT scholarship_id FROM scholarship_tags "
+            f"WHERE kind = ? AND value IN ({placeholders}, ?))"
+        )
+        return clause, [kind] + [_tag(value) for value in values] + [wildcard]
+
+    def search(self, field_of_study=None, target_countries=None, budget_limit=None, user_country=None,
+               query=None, include_expired=False, limit=SEARCH_DEFAULT_LIMIT):
+        clauses = []
+        params = []
+
+        if field_of_study:
+            clause, clause_params = self._tag_filter("field", [field_of_study], ANY_FIELD)
+            fts = _fts_query(field_of_study, "AND") if self.full_text else ""
+            if fts:
+                clause = f"({clause} OR s.id IN (SELECT rowid FROM scholarships_fts WHERE scholarships_fts MATCH ?))"
+                clause_params.append(f"fields_text : ({fts})")
+            clauses.append(clause)
+            params.extend(clause_params)
+
+        countries = _as_list(target_countries)
+        if countries:
+            clause, clause_params = self._tag_filter("country", countries, ANY)
+            clauses.append(clause)
+            params.extend(clause_params)
+
+        if user_country:
+            clause, clause_params = self._tag_filter("nationality", [user_country], ANY)
+            clauses.append(clause)
+            params.extend(clause_params)
+
+        ranking = []
+        budget = _to_int(budget_limit)
+        if budget is not None:
+            clauses.append("(s.min_self_funding_idr IS NULL OR s.min_self_funding_idr <= ?)")
+            params.append(budget)
+            ranking.append("s.min_self_funding_idr IS NULL")
+
+        if not include_expired:
+            clauses.append("(s.deadline IS NULL OR next_deadline(s.deadline) >= ?)")
+            params.append(datetime.now().strftime("%Y-%m-%d"))
+
+        fts = _fts_query(query) if query and self.full_text else ""
+        if fts:
+            sql = (
+                "SELECT s.* FROM scholarships_fts JOIN scholarships s ON s.id = scholarships_fts.rowid "
+                "WHERE scholarships_fts MATCH ?"
+            )
+            params.insert(0, fts)
+            ranking.append("bm25(scholarships_fts)")
+        elif query:
+            sql = "SELECT s.* FROM scholarships s WHERE (s.name LIKE ? OR s.eligibility LIKE ? OR s.coverage LIKE ?)"
+            params[:0] = [f"%{query}%"] * 3
+        else:
+            sql = "SELECT s.* FROM scholarships s WHERE 1 = 1"
+
+        for clause in clauses:
+            sql += f" AND {clause}"
+        ranking += ["s.deadline IS NULL", "next_deadline(s.deadline)", "s.coverage_idr DESC"]
+        sql += f" ORDER BY {', '.join(ranking)} LIMIT ?"
+        limit = _to_int(limit)
+        params.append(SEARCH_DEFAULT_LIMIT if limit is None else max(1, min(limit, SEARCH_MAX_LIMIT)))
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+            results = [self._row_to_dict(row) for row in rows]
+        return results
+
+    def _row_to_dict(self, row):
+        tags = self.conn.execute(
+            "SELECT kind, value FROM scholarship_tags WHERE scholarship_id = ? ORDER BY kind, value", (row["id"],)
+        ).fetchall()
+        grouped = {"country": [], "field": [], "nationality": []}
+        for tag in tags:
+            grouped.setdefault(tag["kind"], []).append(tag["value"])
+
+        return {
+            "scholarship_name": row["name"],
+            "provider": row["provider"],
+            "university": row["university"] or None,
+            "countries": grouped["country"],
+            "fields_of_study": grouped["field"],
+            "eligible_nationalities": grouped["nationality"],
+            "coverage": row["coverage"],
+            "coverage_idr": row["coverage_idr"],
+            "min_self_funding_idr": row["min_self_funding_idr"],
+            "covers_everything": "yes" if row["min_self_funding_idr"] == 0 else "no",
+            "application_deadline": _next_deadline(row["deadline"]),
+            "eligibility": row["eligibility"],
+            "application_url": row["url"],
+            "source": row["source"]
+        }
+
+    def ingest_university_scholarships(self, result, university_name, field_of_study=None):
+        if not isinstance(result, dict) or "error" in result:
+            return 0
+        entries = []
+        for item in result.get("university_scholarships") or []:
+            entries.append({
+                "name": item.get("scholarship_name"),
+                "provider": university_name,
+                "university": university_name,
+                "fields": [field_of_study] if field_of_study else None,
+                "coverage": item.get("amount"),
+                "coverage_idr": item.get("amount_idr"),
+                "deadline": item.get("deadline"),
+                "eligibility": item.get("eligibility"),
+                "url": _url(item.get("contact_information"))
+            })
+        for item in result.get("external_scholarships") or []:
+            entries.append({
+                "name": item.get("scholarship_name"),
+                "provider": item.get("provider"),
+                "university": university_name,
+                "fields": [field_of_study] if field_of_study else None,
+                "coverage_idr": item.get("amount_idr"),
+                "deadline": item.get("application_deadline"),
+                "eligibility": item.get("eligibility")
+            })
+        return self.upsert_many(entries)
+
+    def ingest_scholarship_timeline(self, result, university_name, user_country, field_of_study=None):
+        if not isinstance(result, dict) or "error" in result:
+            return 0
+        entries = [{
+            "name": item.get("scholarship_name"),
+            "provider": item.get("provider"),
+            "university": university_name,
+            "fields": [field_of_study] if field_of_study else None,
+            "nationalities": [user_country] if user_country else None,
+            "coverage": item.get("coverage"),
+            "coverage_idr": item.get("amount_idr"),
+            "deadline": item.get("application_deadline"),
+            "eligibility": item.get("eligibility")
+        } for item in result.get("available_scholarships") or []]
+        return self.upsert_many(entries)
+
+    def stats(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT source, COUNT(*) AS count FROM scholarships GROUP BY source").fetchall()
+        return {row["source"]: row["count"] for row in rows}
@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from collections import deque
+
+from services.job_queue import JobQueue, JobQueueFullError
+from services.llm_client import LLMBusyError
+from services.metrics import Counter
+
+SCHOLARSHIP_PREFETCH_ENABLED = os.getenv('SCHOLARSHIP_PREFETCH_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+SCHOLARSHIP_PREFETCH_TOP_N = int(os.getenv('SCHOLARSHIP_PREFETCH_TOP_N', 3))
+SCHOLARSHIP_PREFETCH_WORKERS = int(os.getenv('SCHOLARSHIP_PREFETCH_WORKERS', 1))
+SCHOLARSHIP_PREFETCH_MAX_QUEUE = int(os.getenv('SCHOLARSHIP_PREFETCH_MAX_QUEUE', 50))
+SCHOLARSHIP_PREFETCH_BUDGET = int(os.getenv('SCHOLARSHIP_PREFETCH_BUDGET', 120))
+SCHOLARSHIP_PREFETCH_WINDOW = int(os.getenv('SCHOLARSHIP_PREFETCH_WINDOW', 3600))
+SCHOLARSHIP_PREFETCH_MAX_LOAD = float(os.getenv('SCHOLARSHIP_PREFETCH_MAX_LOAD', 0.5))
+PREFETCH_LANE = "prefetch"
+
+SCHOLARSHIP_PREFETCH = Counter(
+    "scholarship_prefetch_total", "Speculative scholarship prefetches by kind and outcome", ("kind", "outcome")
+)
+
+
+def top_universities(analysis, top_n):
+    programs = [
+        program for program in (analysis.get("recommended_programs") or [])
+        if isinstance(program, dict) and program.get("university")
+    ]
+    programs.sort(key=lambda program: program.get("match_score") or 0, reverse=True)
+
+    universities, seen = [], set()
+    for program in programs:
+        key = " ".join(program["university"].split()).lower()
+        if key not in seen:
+            seen.add(key)
+            universities.append(program["university"])
+    return universities[:top_n]
+
+
+class ScholarshipPrefetcher:
+    def __init__(self, scholarship_service, top_n=SCHOLARSHIP_PREFETCH_TOP_N, budget=SCHOLARSHIP_PREFETCH_BUDGET,
+                 window=SCHOLARSHIP_PREFETCH_WINDOW, max_load=SCHOLARSHIP_PREFETCH_MAX_LOAD,
+                 enabled=SCHOLARSHIP_PREFETCH_ENABLED):
+        self.service = scholarship_service
+        self.top_n = top_n
+        self.budget = budget
+        self.window = window
+        self.max_load = max_load
+        self.enabled = enabled
+        self.jobs = JobQueue(
+            'scholarship_prefetch', SCHOLARSHIP_PREFETCH_WORKERS, SCHOLARSHIP_PREFETCH_MAX_QUEUE, result_ttl=60
+        )
+        self._spent = deque()
+        self._lock = threading.Lock()
+
+    def schedule(self, analysis, user_country=None, departure_date=None, field_of_study=None, budget_limit=None):
+        if not self.enabled or not isinstance(analysis, dict) or "error" in analysis:
+            return []
+
+        tasks = []
+        for university in top_universities(analysis, self.top_n):
+            tasks.append(("university_scholarships", (university, field_of_study)))
+            if departure_date:
+                tasks.append((
+                    "scholarship_timeline",
+                    (university, user_country or "Indonesia", departure_date, field_of_study, budget_limit)
+                ))
+
+        scheduled = []
+        for kind, args in tasks:
+            if self._is_cached(kind, args):
+                SCHOLARSHIP_PREFETCH.inc(kind=kind, outcome="cached")
+                continue
+            try:
+                self.jobs.submit(self._prefetch, kind, args)
+                scheduled.append({"kind": kind, "university": args[0]})
+            except JobQueueFullError:
+                SCHOLARSHIP_PREFETCH.inc(kind=kind, outcome="dropped")
+        return scheduled
+
+    def _is_cached(self, kind, args):
+        if kind == "scholarship_timeline":
+            return self.service.scholarship_timeline_key(*args) in self.service.timeline_cache
+        return self.service.university_scholarships_key(*args) in self.service.university_cache
+
+    def _llm_busy(self):
+        for limiter in self.service.llm.stats()["models"].values():
+            if limiter["queued"] or limiter["in_flight"] >= limiter["max_in_flight"] * self.max_load:
+                return True
+        return False
+
+    def _take_budget(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._spent and now - self._spent[0] > self.window:
+                self._spent.popleft()
+            if len(self._spent) >= self.budget:
+                return False
+            self._spent.append(now)
+            return True
+
+    def _prefetch(self, kind, args):
+        if self._is_cached(kind, args):
+            outcome = "cached"
+        elif self._llm_busy():
+            outcome = "skipped_busy"
+        elif not self._take_budget():
+            outcome = "skipped_budget"
+        else:
+            try:
+                if kind == "scholarship_timeline":
+                    result = self.service.get_scholarship_timeline(*args, lane=PREFETCH_LANE)
+                else:
+                    result = self.service.get_university_specific_scholarships(*args, lane=PREFETCH_LANE)
+                outcome = "error" if "error" in result else "fetched"
+            except LLMBusyError:
+                outcome = "skipped_busy"
+
+        SCHOLARSHIP_PREFETCH.inc(kind=kind, outcome=outcome)
+        return {"kind": kind, "university": args[0], "outcome": outcome}
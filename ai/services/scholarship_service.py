@@ -1,21 +1,186 @@
-import google.generativeai as genai
+import asyncio
 import os
-from dotenv import load_dotenv
-import json
+from services.llm_client import get_llm_client, LLMBusyError
+from services.scholarship_catalog import ScholarshipCatalog
+from services.response_cache import get_cache, make_cache_key
+from services.single_flight import AsyncSingleFlight, SingleFlight
+from services.schemas import PREPARATION_TIMELINE_SCHEMA, SCHOLARSHIP_TIMELINE_SCHEMA, UNIVERSITY_SCHOLARSHIPS_SCHEMA
+from services.structured_output import generate_structured, generate_structured_async, sub_schema
+from services.timeline_engine import TimelineEngine
 from datetime import datetime, timedelta
 
-load_dotenv()
+SCHOLARSHIP_CACHE_SIZE = int(os.getenv('SCHOLARSHIP_CACHE_SIZE', 512))
+SCHOLARSHIP_TIMELINE_CACHE_TTL = int(os.getenv('SCHOLARSHIP_TIMELINE_CACHE_TTL', 6 * 3600))
+UNIVERSITY_SCHOLARSHIPS_CACHE_TTL = int(os.getenv('UNIVERSITY_SCHOLARSHIPS_CACHE_TTL', 24 * 3600))
+PREPARATION_NARRATIVE_CACHE_TTL = int(os.getenv('PREPARATION_NARRATIVE_CACHE_TTL', 24 * 3600))
+PREPARATION_NARRATIVE_ENABLED = os.getenv('PREPARATION_NARRATIVE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+PREPARATION_RECOMMENDATIONS_SCHEMA = sub_schema(PREPARATION_TIMELINE_SCHEMA, ["recommendations"])
 
 class ScholarshipService:
    def __init__(self):
-       genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-       self.model = genai.GenerativeModel(os.getenv('GEMINI_AI_MODEL'))
+       self.llm = get_llm_client()
+       self.timeline_cache = get_cache('scholarship_timeline', SCHOLARSHIP_CACHE_SIZE, SCHOLARSHIP_TIMELINE_CACHE_TTL)
+       self.university_cache = get_cache('university_scholarships', SCHOLARSHIP_CACHE_SIZE, UNIVERSITY_SCHOLARSHIPS_CACHE_TTL)
+       self.narrative_cache = get_cache('preparation_narrative', SCHOLARSHIP_CACHE_SIZE, PREPARATION_NARRATIVE_CACHE_TTL)
+       self.timeline_engine = TimelineEngine()
+       self.catalog = ScholarshipCatalog()
+       self.in_flight = SingleFlight()
+       self.async_in_flight = AsyncSingleFlight()
+   
+   def _cached_call(self, cache, key, generate):
+       result = cache.get(key)
+       if result is not None:
+           return result
+       
+       def generate_and_store():
+           result = generate()
+           if "error" not in result:
+               cache.set(key, result)
+           return result
+       
+       return self.in_flight.do((id(cache),) + key, generate_and_store)
+   
+   async def _cached_call_async(self, cache, key, generate):
+       result = cache.get(key)
+       if result is not None:
+           return result
+       
+       async def generate_and_store():
+           result = await generate()
+           if "error" not in result:
+               cache.set(key, result)
+           return result
+       
+       return await self.async_in_flight.do((id(cache),) + key, generate_and_store)
    
-   def get_scholarship_timeline(self, university_name, user_country, departure_date, field_of_study=None, budget_limit=None):
+   def _ingest(self, ingest, result, *args):
        try:
-           current_date = datetime.now().strftime("%Y-%m-%d")
-           
-           prompt = f"""
+           ingest(result, *args)
+       except Exception:
+           pass
+   
+   def search_scholarships_by_criteria(self, field_of_study=None, target_countries=None, budget_limit=None,
+                                       user_country="Indonesia", query=None, limit=20):
+       try:
+           scholarships = self.catalog.search(
+               field_of_study=field_of_study,
+               target_countries=target_countries,
+               budget_limit=budget_limit,
+               user_country=user_country,
+               query=query,
+               limit=limit
+           )
+           return {
+               "scholarships": scholarships,
+               "total": len(scholarships),
+               "filters": {
+                   "field_of_study": field_of_study,
+                   "target_countries": target_countries,
+                   "budget_limit": budget_limit,
+                   "user_country": user_country,
+                   "query": query
+               }
+           }
+       except Exception as e:
+           return {"error": f"Error searching scholarships: {str(e)}"}
+   
+   def scholarship_timeline_key(self, university_name, user_country, departure_date, field_of_study=None, budget_limit=None):
+       return make_cache_key(
+           datetime.now().strftime("%Y-%m-%d"), university_name, user_country, departure_date, field_of_study, budget_limit
+       )
+   
+   def university_scholarships_key(self, university_name, field_of_study=None):
+       return make_cache_key(university_name, field_of_study)
+   
+   def get_scholarship_timeline(self, university_name, user_country, departure_date, field_of_study=None, budget_limit=None,
+                                lane="scholarship"):
+       key = self.scholarship_timeline_key(university_name, user_country, departure_date, field_of_study, budget_limit)
+       return self._cached_call(
+           self.timeline_cache, key,
+           lambda: self._generate_scholarship_timeline(
+               university_name, user_country, departure_date, field_of_study, budget_limit, lane
+           )
+       )
+   
+   async def get_scholarship_timeline_async(self, university_name, user_country, departure_date, field_of_study=None,
+                                            budget_limit=None, lane="scholarship"):
+       key = self.scholarship_timeline_key(university_name, user_country, departure_date, field_of_study, budget_limit)
+       return await self._cached_call_async(
+           self.timeline_cache, key,
+           lambda: self._generate_scholarship_timeline_async(
+               university_name, user_country, departure_date, field_of_study, budget_limit, lane
+           )
+       )
+   
+   def get_university_specific_scholarships(self, university_name, field_of_study=None, lane="scholarship"):
+       key = self.university_scholarships_key(university_name, field_of_study)
+       return self._cached_call(
+           self.university_cache, key,
+           lambda: self._generate_university_specific_scholarships(university_name, field_of_study, lane)
+       )
+   
+   async def get_university_specific_scholarships_async(self, university_name, field_of_study=None, lane="scholarship"):
+       key = self.university_scholarships_key(university_name, field_of_study)
+       return await self._cached_call_async(
+           self.university_cache, key,
+           lambda: self._generate_university_specific_scholarships_async(university_name, field_of_study, lane)
+       )
+   
+   def _generate_scholarship_timeline(self, university_name, user_country, departure_date, field_of_study=None, budget_limit=None,
+                                      lane="scholarship"):
+       try:
+           prompt = self._scholarship_timeline_prompt(university_name, user_country, departure_date, field_of_study, budget_limit)
+           result = generate_structured(self.llm, prompt, SCHOLARSHIP_TIMELINE_SCHEMA, lane=lane)
+           self._ingest(self.catalog.ingest_scholarship_timeline, result, university_name, user_country, field_of_study)
+           return result
+       except LLMBusyError:
+           raise
+       except Exception as e:
+           return {"error": f"Error generating scholarship timeline: {str(e)}"}
+   
+   async def _generate_scholarship_timeline_async(self, university_name, user_country, departure_date, field_of_study=None,
+                                                  budget_limit=None, lane="scholarship"):
+       try:
+           prompt = self._scholarship_timeline_prompt(university_name, user_country, departure_date, field_of_study, budget_limit)
+           result = await generate_structured_async(self.llm, prompt, SCHOLARSHIP_TIMELINE_SCHEMA, lane=lane)
+           await asyncio.to_thread(
+               self._ingest, self.catalog.ingest_scholarship_timeline, result, university_name, user_country, field_of_study
+           )
+           return result
+       except LLMBusyError:
+           raise
+       except Exception as e:
+           return {"error": f"Error generating scholarship timeline: {str(e)}"}
+   
+   def _generate_university_specific_scholarships(self, university_name, field_of_study=None, lane="scholarship"):
+       try:
+           prompt = self._university_scholarships_prompt(university_name, field_of_study)
+           result = generate_structured(self.llm, prompt, UNIVERSITY_SCHOLARSHIPS_SCHEMA, lane=lane)
+           self._ingest(self.catalog.ingest_university_scholarships, result, university_name, field_of_study)
+           return result
+       except LLMBusyError:
+           raise
+       except Exception as e:
+           return {"error": f"Error getting university scholarships: {str(e)}"}
+   
+   async def _generate_university_specific_scholarships_async(self, university_name, field_of_study=None, lane="scholarship"):
+       try:
+           prompt = self._university_scholarships_prompt(university_name, field_of_study)
+           result = await generate_structured_async(self.llm, prompt, UNIVERSITY_SCHOLARSHIPS_SCHEMA, lane=lane)
+           await asyncio.to_thread(
+               self._ingest, self.catalog.ingest_university_scholarships, result, university_name, field_of_study
+           )
+           return result
+       except LLMBusyError:
+           raise
+       except Exception as e:
+           return {"error": f"Error getting university scholarships: {str(e)}"}
+   
+   def _scholarship_timeline_prompt(self, university_name, user_country, departure_date, field_of_study=None, budget_limit=None):
+       current_date = datetime.now().strftime("%Y-%m-%d")
+       
+       return f"""
            Current date: {current_date}
            Target university: {university_name}
            Student nationality: {user_country}
@@ -153,17 +318,11 @@ class ScholarshipService:
            6. Consider academic calendar alignment
            7. Account for embassy/consulate processing times in {user_country}
            """
-           
-           response = self.model.generate_content(prompt)
-           return self._parse_response(response.text)
-       except Exception as e:
-           return {"error": f"Error generating scholarship timeline: {str(e)}"}
    
-   def get_university_specific_scholarships(self, university_name, field_of_study=None):
-       try:
-           current_date = datetime.now().strftime("%Y-%m-%d")
-           
-           prompt = f"""
+   def _university_scholarships_prompt(self, university_name, field_of_study=None):
+       current_date = datetime.now().strftime("%Y-%m-%d")
+       
+       return f"""
            Current date: {current_date}
            Target university: {university_name}
            Field of study: {field_of_study or "any"}
@@ -211,78 +370,90 @@ class ScholarshipService:
                }}
            }}
            """
-           
-           response = self.model.generate_content(prompt)
-           return self._parse_response(response.text)
+   
+   def calculate_preparation_timeline(self, departure_date, user_country="Indonesia", include_narrative=True):
+       try:
+           timeline = self.timeline_engine.build(departure_date, user_country)
        except Exception as e:
-           return {"error": f"Error getting university scholarships: {str(e)}"}
+           return {"error": f"Error calculating timeline: {str(e)}"}
+       
+       recommendations = None
+       if include_narrative and PREPARATION_NARRATIVE_ENABLED:
+           key = make_cache_key(user_country, timeline["days_bucket"])
+           try:
+               result = self._cached_call(
+                   self.narrative_cache, key,
+                   lambda: self._generate_preparation_recommendations(user_country, timeline)
+               )
+               recommendations = result.get("recommendations")
+           except LLMBusyError:
+               recommendations = None
+       
+       timeline["recommendations"] = recommendations or self.timeline_engine.default_recommendations(timeline)
+       return timeline
    
-   def calculate_preparation_timeline(self, departure_date, user_country="Indonesia"):
+   async def calculate_preparation_timeline_async(self, departure_date, user_country="Indonesia", include_narrative=True):
        try:
-           departure_dt = datetime.strptime(departure_date, "%Y-%m-%d")
-           current_dt = datetime.now()
-           days_until_departure = (departure_dt - current_dt).days
-           
-           prompt = f"""
-           Current date: {current_dt.strftime("%Y-%m-%d")}
-           Departure date: {departure_date}
-           Days until departure: {days_until_departure}
+           timeline = self.timeline_engine.build(departure_date, user_country)
+       except Exception as e:
+           return {"error": f"Error calculating timeline: {str(e)}"}
+       
+       recommendations = None
+       if include_narrative and PREPARATION_NARRATIVE_ENABLED:
+           key = make_cache_key(user_country, timeline["days_bucket"])
+           try:
+               result = await self._cached_call_async(
+                   self.narrative_cache, key,
+                   lambda: self._generate_preparation_recommendations_async(user_country, timeline)
+               )
+               recommendations = result.get("recommendations")
+           except LLMBusyError:
+               recommendations = None
+       
+       timeline["recommendations"] = recommendations or self.timeline_engine.default_recommendations(timeline)
+       return timeline
+   
+   def _generate_preparation_recommendations(self, user_country, timeline):
+       try:
+           prompt = self._preparation_prompt(user_country, timeline)
+           result = generate_structured(self.llm, prompt, PREPARATION_RECOMMENDATIONS_SCHEMA, lane="scholarship")
+           if "error" not in result and not isinstance(result.get("recommendations"), dict):
+               return {"error": "AI response did not include recommendations"}
+           return result
+       except LLMBusyError:
+           raise
+       except Exception as e:
+           return {"error": f"Error generating recommendations: {str(e)}"}
+   
+   async def _generate_preparation_recommendations_async(self, user_country, timeline):
+       try:
+           prompt = self._preparation_prompt(user_country, timeline)
+           result = await generate_structured_async(self.llm, prompt, PREPARATION_RECOMMENDATIONS_SCHEMA, lane="scholarship")
+           if "error" not in result and not isinstance(result.get("recommendations"), dict):
+               return {"error": "AI response did not include recommendations"}
+           return result
+       except LLMBusyError:
+           raise
+       except Exception as e:
+           return {"error": f"Error generating recommendations: {str(e)}"}
+   
+   def _preparation_prompt(self, user_country, timeline):
+       milestones = "\n".join(
+           f"- {item['milestone']}: {item.get('days_before_departure', '0')} days before departure"
+           for item in timeline["backward_timeline"]
+       )
+       
+       return f"""
            Student country: {user_country}
+           Days until departure: {timeline["days_bucket"]}
+           Recommended minimum preparation: {timeline["timeline_analysis"]["recommended_minimum"]}
+           
+           The backward preparation timeline has already been calculated:
+           {milestones}
            
-           Calculate the optimal preparation timeline working backwards from departure date:
+           Write practical recommendations for a student from {user_country} on this timeline in JSON format:
            
            {{
-               "timeline_analysis": {{
-                   "total_preparation_time": "{days_until_departure} days",
-                   "is_sufficient": "yes/no - whether this timeline is realistic",
-                   "recommended_minimum": "minimum days needed for proper preparation",
-                   "risk_level": "low/medium/high risk of missing deadlines"
-               }},
-               "backward_timeline": [
-                   {{
-                       "milestone": "departure/travel",
-                       "date": "{departure_date}",
-                       "tasks_before": ["final preparations needed before this date"]
-                   }},
-                   {{
-                       "milestone": "visa collection/final documents",
-                       "date": "calculated date",
-                       "days_before_departure": "number of days before departure",
-                       "tasks_before": ["what must be completed before this milestone"]
-                   }},
-                   {{
-                       "milestone": "visa application submission",
-                       "date": "calculated date", 
-                       "days_before_departure": "number of days before departure",
-                       "tasks_before": ["documents and requirements needed"]
-                   }},
-                   {{
-                       "milestone": "scholarship results/university admission",
-                       "date": "calculated date",
-                       "days_before_departure": "number of days before departure", 
-                       "tasks_before": ["application submissions needed"]
-                   }},
-                   {{
-                       "milestone": "application submissions",
-                       "date": "calculated date",
-                       "days_before_departure": "number of days before departure",
-                       "tasks_before": ["document preparation and tests needed"]
-                   }},
-                   {{
-                       "milestone": "document preparation start",
-                       "date": "calculated date",
-                       "days_before_departure": "number of days before departure",
-                       "tasks_before": ["initial research and planning"]
-                   }}
-               ],
-               "critical_deadlines": [
-                   {{
-                       "deadline_type": "scholarship application",
-                       "latest_possible_date": "calculated date",
-                       "preparation_needed_before": "what must be ready",
-                       "buffer_time_included": "safety margin included"
-                   }}
-               ],
                "recommendations": {{
                    "start_immediately": ["tasks to start right now"],
                    "start_this_week": ["tasks to start within 7 days"],
@@ -290,33 +461,6 @@ class ScholarshipService:
                    "emergency_actions": ["if timeline is very tight, what to prioritize"]
                }}
            }}
-           """
-           
-           response = self.model.generate_content(prompt)
-           return self._parse_response(response.text)
-       except Exception as e:
-           return {"error": f"Error calculating timeline: {str(e)}"}
-   
-   def _parse_response(self, response_text):
-       try:
-           response_text = response_text.strip()
-           if response_text.startswith('```json'):
-               response_text = response_text[7:]
-           if response_text.endswith('```'):
-               response_text = response_text[:-3]
-           
-           return json.loads(response_text)
-       except json.JSONDecodeError:
-           try:
-               start_idx = response_text.find('{')
-               end_idx = response_text.rfind('}') + 1
-               if start_idx != -1 and end_idx != -1:
-                   json_str = response_text[start_idx:end_idx]
-                   return json.loads(json_str)
-           except:
-               pass
            
-           return {
-               "error": "Failed to parse AI response",
-               "raw_response": response_text
-           }
\ No newline at end of file
+           Do NOT include specific calendar dates.
+           """
@@ -0,0 +1,218 @@
+import json
+import re
+from services.json_stream import StreamingJSONParser
+from services.metrics import STRUCTURED_PARSE
+
+_NUMBER_NOISE = re.compile(r"[^\d.,\-]")
+_DOTTED_THOUSANDS = re.compile(r"^-?\d{1,3}(\.\d{3})+$")
+_COMMA_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}(?!\d))")
+_DECIMAL_COMMA = re.compile(r"^-?\d+,\d{1,2}$")
+_RATIO_OR_RANGE = re.compile(r"\d\s*(/|[-–—]|to\b|sampai\b|hingga\b)\s*-?\d", re.IGNORECASE)
+
+
+def json_generation_config(schema):
+    return {
+        "response_mime_type": "application/json",
+        "response_schema": schema
+    }
+
+
+def validate(value, schema, path=""):
+    if value is None:
+        return [] if schema.get("nullable") else [(path, "missing value")]
+
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        if not isinstance(value, dict):
+            return [(path, "expected object")]
+        errors = []
+        for name in schema.get("required", []):
+            if name not in value:
+                errors.append((_join(path, name), "missing field"))
+        for name, sub_schema in schema.get("properties", {}).items():
+            if name in value:
+                errors.extend(validate(value[name], sub_schema, _join(path, name)))
+        return errors
+
+    if schema_type == "array":
+        if not isinstance(value, list):
+            return [(path, "expected array")]
+        errors = []
+        for index, item in enumerate(value):
+            errors.extend(validate(item, schema["items"], f"{path}[{index}]"))
+        return errors
+
+    if schema_type == "integer":
+        if not isinstance(value, int) or isinstance(value, bool):
+            return [(path, "expected integer")]
+    elif schema_type == "number":
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return [(path, "expected number")]
+    elif schema_type == "boolean":
+        if not isinstance(value, bool):
+            return [(path, "expected boolean")]
+    elif schema_type == "string":
+        if not isinstance(value, str):
+            return [(path, "expected string")]
+        if "enum" in schema and value not in schema["enum"]:
+            return [(path, f"expected one of {schema['enum']}")]
+    return []
+
+
+def repair(value, schema):
+    schema_type = schema.get("type")
+
+    if schema_type == "object":
+        if not isinstance(value, dict):
+            return value
+        properties = schema.get("properties", {})
+        return {
+            name: repair(item, properties[name]) if name in properties else item
+            for name, item in value.items()
+        }
+
+    if schema_type == "array":
+        if isinstance(value, dict):
+            value = [value]
+        elif isinstance(value, str) and schema["items"].get("type") == "string":
+            value = [value]
+        if not isinstance(value, list):
+            return value
+        return [repair(item, schema["items"]) for item in value]
+
+    if schema_type in ("integer", "number"):
+        if isinstance(value, str):
+            value = parse_number(value, value)
+        if schema_type == "integer" and isinstance(value, float):
+            value = int(round(value))
+        return value
+
+    if schema_type == "string":
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        elif isinstance(value, list) and all(isinstance(item, str) for item in value):
+            value = ", ".join(value)
+        if isinstance(value, str) and "enum" in schema and value not in schema["enum"]:
+            normalized = value.strip().lower()
+            for option in schema["enum"]:
+                if normalized == option or normalized.startswith(option):
+                    return option
+        return value
+
+    return value
+
+
+def parse_number(text, default=None):
+    if _RATIO_OR_RANGE.search(text):
+        return default
+    cleaned = _NUMBER_NOISE.sub("", _COMMA_THOUSANDS.sub("", text))
+    if _DECIMAL_COMMA.match(cleaned):
+        cleaned = cleaned.replace(",", ".")
+    if _DOTTED_THOUSANDS.match(cleaned):
+        cleaned = cleaned.replace(".", "")
+    try:
+        return float(cleaned) if "." in cleaned else int(cleaned)
+    except ValueError:
+        return default
+
+
+def _join(path, name):
+    return f"{path}.{name}" if path else name
+
+
+def _top_level_field(path):
+    return re.split(r"[.\[]", path, maxsplit=1)[0]
+
+
+def parse_structured(response_text, schema):
+    try:
+        data = json.loads(response_text)
+    except json.JSONDecodeError:
+        parser = StreamingJSONParser()
+        parser.feed(response_text)
+        parser.close()
+        data = parser.result
+
+    if not isinstance(data, dict):
+        data = {}
+
+    data = repair(data, schema)
+    broken = {_top_level_field(path) for path, _ in validate(data, schema)}
+    invalid = [name for name in schema["properties"] if name in broken]
+
+    if not data:
+        STRUCTURED_PARSE.inc(outcome="unparseable")
+    elif invalid:
+        STRUCTURED_PARSE.inc(outcome="invalid_fields")
+    else:
+        STRUCTURED_PARSE.inc(outcome="valid")
+    return data, invalid
+
+
+def sub_schema(schema, fields):
+    properties = {name: schema["properties"][name] for name in fields}
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": [name for name in schema.get("required", []) if name in properties]
+    }
+
+
+def _retry_request(contents, schema, invalid):
+    retry_schema = sub_schema(schema, invalid)
+    retry_contents = (list(contents) if isinstance(contents, list) else [contents]) + [
+        "Your previous answer had missing or malformed values for: "
+        f"{', '.join(invalid)}. Return ONLY these fields as JSON."
+    ]
+    return retry_contents, retry_schema
+
+
+def _apply_patch(data, invalid, response_text, retry_schema):
+    patch, still_invalid = parse_structured(response_text, retry_schema)
+    for name in invalid:
+        if name in patch and name not in still_invalid:
+            data[name] = patch[name]
+
+
+def _finish(data):
+    if not data:
+        return {"error": "Failed to parse AI response"}
+    return data
+
+
+def complete_structured(llm, contents, schema, data, invalid, lane="default", deadline=None):
+    if invalid:
+        retry_contents, retry_schema = _retry_request(contents, schema, invalid)
+        try:
+            response = llm.generate_content(
+                retry_contents, lane=lane, deadline=deadline, generation_config=json_generation_config(retry_schema)
+            )
+            _apply_patch(data, invalid, response.text, retry_schema)
+        except Exception:
+            pass
+    return _finish(data)
+
+
+async def complete_structured_async(llm, contents, schema, data, invalid, lane="default"):
+    if invalid:
+        retry_contents, retry_schema = _retry_request(contents, schema, invalid)
+        try:
+            response = await llm.generate_content_async(
+                retry_contents, lane=lane, generation_config=json_generation_config(retry_schema)
+            )
+            _apply_patch(data, invalid, response.text, retry_schema)
+        except Exception:
+            pass
+    return _finish(data)
+
+
+def generate_structured(llm, contents, schema, lane="default", deadline=None):
+    response = llm.generate_content(contents, lane=lane, deadline=deadline, generation_config=json_generation_config(schema))
+    data, invalid = parse_structured(response.text, schema)
+    return complete_structured(llm, contents, schema, data, invalid, lane, deadline)
+
+
+async def generate_structured_async(llm, contents, schema, lane="default"):
+    response = await llm.generate_content_async(contents, lane=lane, generation_config=json_generation_config(schema))
+    data, invalid = parse_structured(response.text, schema)
+    return await complete_structured_async(llm, contents, schema, data, invalid, lane)
@@ -0,0 +1,224 @@
+from datetime import datetime, timedelta
+
+DEFAULT_LEAD_TIMES = {
+    "visa_collection": 14,
+    "visa_processing": 45,
+    "admission_to_visa": 30,
+    "decision_wait": 120,
+    "document_preparation": 60,
+    "test_preparation": 60,
+    "score_reporting": 14,
+    "buffer": 14
+}
+
+COUNTRY_TEMPLATES = {
+    "indonesia": {
+        "lead_times": {"document_preparation": 75, "visa_processing": 45},
+        "document_tasks": [
+            "Request passport (paspor) at the Kantor Imigrasi if it expires within 18 months",
+            "Get legalised transcripts and diploma from the university",
+            "Apostille academic documents at Kemenkumham",
+            "Sworn translation (penerjemah tersumpah) of documents into English",
+            "SKCK police certificate from Polri"
+        ],
+        "visa_tasks": [
+            "Book the embassy or VFS Global appointment in Jakarta",
+            "Prepare proof of funds or scholarship letter (LPDP/sponsor)",
+            "Translate and legalise the birth certificate and family card (Kartu Keluarga)"
+        ]
+    },
+    "malaysia": {
+        "lead_times": {"document_preparation": 45},
+        "document_tasks": [
+            "Renew passport at the Jabatan Imigresen if it expires within 18 months",
+            "Certify transcripts and degree scroll with the university registrar",
+            "Obtain the Certificate of Good Conduct from PDRM if required"
+        ],
+        "visa_tasks": ["Book the embassy or VFS Global appointment in Kuala Lumpur"]
+    },
+    "philippines": {
+        "lead_times": {"document_preparation": 75, "visa_processing": 60},
+        "document_tasks": [
+            "Secure passport from DFA if it expires within 18 months",
+            "Request Transcript of Records and CAV from CHED",
+            "Apostille academic documents at the DFA",
+            "NBI clearance"
+        ],
+        "visa_tasks": ["Book the embassy or VFS Global appointment in Manila"]
+    },
+    "vietnam": {
+        "lead_times": {"document_preparation": 60, "visa_processing": 60},
+        "document_tasks": [
+            "Renew passport if it expires within 18 months",
+            "Notarised English translations of transcripts and diploma",
+            "Consular legalisation of academic documents",
+            "Judicial record certificate (Phieu ly lich tu phap)"
+        ],
+        "visa_tasks": ["Book the embassy or VFS Global appointment in Hanoi or Ho Chi Minh City"]
+    },
+    "india": {
+        "lead_times": {"document_preparation": 60, "visa_processing": 60},
+        "document_tasks": [
+            "Renew passport via Passport Seva if it expires within 18 months",
+            "Get transcripts and degree attested by the university",
+            "Apostille documents through the MEA",
+            "Police Clearance Certificate (PCC)"
+        ],
+        "visa_tasks": ["Book the embassy or VFS Global appointment"]
+    }
+}
+
+DEFAULT_DOCUMENT_TASKS = [
+    "Renew passport if it expires within 18 months",
+    "Request certified transcripts and degree certificate",
+    "Legalise or apostille academic documents",
+    "Certified English translations of all non-English documents",
+    "Police clearance certificate"
+]
+
+DEFAULT_VISA_TASKS = ["Book the embassy or visa centre appointment"]
+
+DAYS_BUCKETS = (30, 60, 90, 180, 270, 365, 540)
+
+
+def days_bucket(days):
+    for bound in DAYS_BUCKETS:
+        if days <= bound:
+            return f"<={bound}"
+    return f">{DAYS_BUCKETS[-1]}"
+
+
+class TimelineEngine:
+    def __init__(self, templates=None):
+        self.templates = templates or COUNTRY_TEMPLATES
+
+    def template_for(self, user_country):
+        template = self.templates.get((user_country or "").strip().lower(), {})
+        return {
+            "lead_times": dict(DEFAULT_LEAD_TIMES, **template.get("lead_times", {})),
+            "document_tasks": template.get("document_tasks", DEFAULT_DOCUMENT_TASKS),
+            "visa_tasks": template.get("visa_tasks", DEFAULT_VISA_TASKS) + [
+                "Health insurance and medical check-up if required",
+                "Proof of accommodation"
+            ]
+        }
+
+    def milestone_offsets(self, lead_times):
+        visa_collection = lead_times["visa_collection"]
+        visa_submission = visa_collection + lead_times["visa_processing"]
+        admission = visa_submission + lead_times["admission_to_visa"]
+        applications = admission + lead_times["decision_wait"]
+        documents = applications + max(lead_times["document_preparation"], lead_times["test_preparation"])
+        return {
+            "visa_collection": visa_collection,
+            "visa_submission": visa_submission,
+            "admission": admission,
+            "applications": applications,
+            "documents": documents,
+            "recommended_minimum": documents + lead_times["buffer"]
+        }
+
+    def risk_level(self, days_until_departure, recommended_minimum):
+        if days_until_departure >= recommended_minimum * 1.25:
+            return "low"
+        if days_until_departure >= recommended_minimum:
+            return "medium"
+        return "high"
+
+    def build(self, departure_date, user_country="Indonesia", today=None):
+        departure_dt = datetime.strptime(departure_date, "%Y-%m-%d")
+        today = today or datetime.now()
+        days_until_departure = (departure_dt - today).days
+
+        template = self.template_for(user_country)
+        lead_times = template["lead_times"]
+        offsets = self.milestone_offsets(lead_times)
+
+        def date_before(days):
+            return (departure_dt - timedelta(days=days)).strftime("%Y-%m-%d")
+
+        def milestone(name, days, tasks_before):
+            return {
+                "milestone": name,
+                "date": date_before(days),
+                "days_before_departure": str(days),
+                "tasks_before": tasks_before,
+                "status": "overdue" if days > days_until_departure else "upcoming"
+            }
+
+        backward_timeline = [
+            {
+                "milestone": "departure/travel",
+                "date": departure_date,
+                "tasks_before": ["Book flights", "Arrange airport pickup and first weeks of accommodation", "Pack documents in carry-on"],
+                "status": "overdue" if days_until_departure < 0 else "upcoming"
+            },
+            milestone("visa collection/final documents", offsets["visa_collection"], [
+                "Collect passport with visa", "Confirm accommodation", "Buy travel insurance"
+            ]),
+            milestone("visa application submission", offsets["visa_submission"], template["visa_tasks"]),
+            milestone("scholarship results/university admission", offsets["admission"], [
+                "Accept the admission offer", "Pay the enrolment deposit if required", "Sign the scholarship agreement"
+            ]),
+            milestone("application submissions", offsets["applications"], [
+                "Submit university applications", "Submit scholarship applications",
+                "Recommendation letters from referees", "Statement of purpose and CV"
+            ]),
+            milestone("document preparation start", offsets["documents"], [
+                "Shortlist universities and scholarships", "Register for IELTS/TOEFL and other required tests"
+            ] + template["document_tasks"])
+        ]
+
+        critical_deadlines = [
+            {
+                "deadline_type": "scholarship application",
+                "latest_possible_date": date_before(offsets["applications"]),
+                "preparation_needed_before": "Test scores, legalised documents, recommendation letters, statement of purpose",
+                "buffer_time_included": f"{lead_times['buffer']} days"
+            },
+            {
+                "deadline_type": "language test results",
+                "latest_possible_date": date_before(offsets["applications"] + lead_times["score_reporting"]),
+                "preparation_needed_before": "Test registration and preparation",
+                "buffer_time_included": f"{lead_times['score_reporting']} days score reporting"
+            },
+            {
+                "deadline_type": "visa application",
+                "latest_possible_date": date_before(offsets["visa_submission"]),
+                "preparation_needed_before": "Admission letter, proof of funds or scholarship letter, passport",
+                "buffer_time_included": f"{lead_times['visa_collection']} days before departure for collection"
+            }
+        ]
+
+        return {
+            "timeline_analysis": {
+                "total_preparation_time": f"{days_until_departure} days",
+                "is_sufficient": "yes" if days_until_departure >= offsets["recommended_minimum"] else "no",
+                "recommended_minimum": f"{offsets['recommended_minimum']} days",
+                "risk_level": self.risk_level(days_until_departure, offsets["recommended_minimum"])
+            },
+            "backward_timeline": backward_timeline,
+            "critical_deadlines": critical_deadlines,
+            "days_until_departure": days_until_departure,
+            "days_bucket": days_bucket(days_until_departure)
+        }
+
+    def default_recommendations(self, timeline):
+        overdue = [item["milestone"] for item in timeline["backward_timeline"] if item["status"] == "overdue"]
+        upcoming = [item for item in timeline["backward_timeline"] if item["status"] == "upcoming"]
+        next_milestone = upcoming[-1] if upcoming else None
+
+        start_immediately = [f"Catch up on: {name}" for name in reversed(overdue)]
+        if next_milestone:
+            start_immediately.append(f"Work towards {next_milestone['milestone']} by {next_milestone['date']}")
+
+        return {
+            "start_immediately": start_immediately,
+            "start_this_week": next_milestone["tasks_before"][:3] if next_milestone else [],
+            "start_this_month": next_milestone["tasks_before"][3:] if next_milestone else [],
+            "emergency_actions": [
+                "Prioritise programs with rolling admission or late deadlines",
+                "Use express services for passport, legalisation and visa where available",
+                "Consider deferring departure to the next intake"
+            ] if timeline["timeline_analysis"]["risk_level"] == "high" else []
+        }
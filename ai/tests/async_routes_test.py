@@ -0,0 +1,98 @@
+import asyncio
+import os
+import subprocess
+import sys
+from io import BytesIO
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+AI_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+BAD_REQUESTS = (
+    ('/api/cv/analyze-text', {"text": "CV", "budget_limit": "lots"}),
+    ('/api/cv/analyze-text', {}),
+    ('/api/cv/analyze', {}),
+    ('/api/chatbot/chat', {}),
+    ('/api/chatbot/compare', {"option1": "ITB"}),
+    ('/api/scholarship/timeline', {"university_name": "ITB"}),
+    ('/api/scholarship/preparation-timeline', {"user_country": "Indonesia"})
+)
+
+def make_apps():
+    from flask import Flask
+    from quart import Quart
+    from routes import cv_routes, cv_routes_async, chatbot_routes, chatbot_routes_async
+    from routes import scholarship_routes, scholarship_routes_async
+    flask_app, quart_app = Flask(__name__), Quart(__name__)
+    for app, modules in ((flask_app, (cv_routes, chatbot_routes, scholarship_routes)),
+                         (quart_app, (cv_routes_async, chatbot_routes_async, scholarship_routes_async))):
+        cv, chatbot, scholarship = modules
+        app.register_blueprint(cv.cv_bp, url_prefix='/api/cv')
+        app.register_blueprint(chatbot.chatbot_bp, url_prefix='/api/chatbot')
+        app.register_blueprint(scholarship.scholarship_bp, url_prefix='/api/scholarship')
+    return flask_app.test_client(), quart_app.test_client()
+
+def test_shared_route_module_imports_neither_framework():
+    probe = "import sys, routes.common; print([name for name in ('flask', 'quart') if name in sys.modules])"
+    env = dict(os.environ, SCHOLARSHIP_CATALOG_DB=":memory:")
+    output = subprocess.run(
+        [sys.executable, "-c", probe], cwd=AI_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "[]"
+
+def test_async_routes_reject_bad_requests_like_flask():
+    from werkzeug.datastructures import FileStorage
+    flask_client, quart_client = make_apps()
+    
+    async def check():
+        for path, body in BAD_REQUESTS:
+            expected = flask_client.post(path, json=body)
+            response = await quart_client.post(path, json=body)
+            assert response.status_code == expected.status_code == 400
+            assert await response.get_json() == expected.get_json()
+        
+        expected = flask_client.post('/api/cv/analyze', data={"file": (BytesIO(b"cv"), "cv.txt")})
+        response = await quart_client.post('/api/cv/analyze', files={"file": FileStorage(BytesIO(b"cv"), "cv.txt")})
+        assert response.status_code == expected.status_code == 400
+        assert (await response.get_json())["error"] == "Only PDF, PNG, JPG, JPEG files are supported"
+    
+    asyncio.run(check())
+
+def test_non_object_json_bodies_are_rejected():
+    flask_client, quart_client = make_apps()
+    paths = ('/api/cv/analyze-text', '/api/cv/analyze', '/api/chatbot/chat', '/api/chatbot/clear',
+             '/api/scholarship/timeline', '/api/scholarship/search')
+    
+    async def check():
+        for path in paths:
+            expected = flask_client.post(path, json=["not", "an", "object"])
+            response = await quart_client.post(path, json=["not", "an", "object"])
+            assert response.status_code == expected.status_code == 400
+            assert (await response.get_json())["error"] == "Request body must be a JSON object"
+    
+    asyncio.run(check())
+
+def test_async_preparation_timeline_skips_narrative():
+    from services.llm_client import LLMClient, set_llm_client
+    from fake_gemini import FakeGeminiModel
+    model = FakeGeminiModel(latency=0.0)
+    set_llm_client(LLMClient(default_model="fake-gemini", model_factory=lambda name: model))
+    _, quart_client = make_apps()
+    
+    async def check():
+        response = await quart_client.post('/api/scholarship/preparation-timeline', json={
+            "departure_date": "2027-09-01", "include_narrative": "false"
+        })
+        assert response.status_code == 200
+        return await response.get_json()
+    
+    result = asyncio.run(check())
+    assert "error" not in result
+    assert model.calls == 0
+
+if __name__ == "__main__":
+    test_shared_route_module_imports_neither_framework()
+    test_async_routes_reject_bad_requests_like_flask()
+    test_non_object_json_bodies_are_rejected()
+    test_async_preparation_timeline_skips_narrative()
+    print("Async route tests passed")
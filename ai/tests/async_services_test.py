@@ -0,0 +1,157 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SCHOLARSHIP_CATALOG_DB', ':memory:')
+
+from services.chat_sessions import ChatSessionStore
+from services.llm_client import LLMBusyError, LLMClient, set_llm_client
+from fake_gemini import FakeGeminiModel
+
+CV_TEXT = "Rizky Pratama\nEducation\nB.Eng. Electrical Engineering, Institut Teknologi Bandung, GPA 3.61\nSkills\nC++, MATLAB"
+
+class SlowSectionModel(FakeGeminiModel):
+    def __init__(self, slow_field=None, slow_latency=2.0, **options):
+        super().__init__(**options)
+        self.slow_field = slow_field
+        self.slow_latency = slow_latency
+
+    async def generate_content_async(self, contents, generation_config=None, stream=False, **kwargs):
+        schema = (generation_config or {}).get("response_schema") or {}
+        if self.slow_field in schema.get("properties", {}):
+            await asyncio.sleep(self.slow_latency)
+        return await super().generate_content_async(contents, generation_config=generation_config, stream=stream, **kwargs)
+
+def make_client(model, **options):
+    client = LLMClient(default_model="fake-gemini", model_factory=lambda name: model, **options)
+    set_llm_client(client)
+    return client
+
+def test_hundreds_of_chats_in_flight_on_one_thread():
+    model = FakeGeminiModel(latency=0.2, jitter=0.0)
+    make_client(model, max_in_flight=500, max_queue=1000)
+    from services.chatbot_service import ChatbotService
+    service = ChatbotService(ChatSessionStore("test_async_chat", max_sessions=5000))
+    threads_before = threading.active_count()
+
+    async def converse():
+        return await asyncio.gather(*(
+            service.chat_async(f"async-user-{index}", f"question {index}") for index in range(300)
+        ))
+
+    start = time.perf_counter()
+    results = asyncio.run(converse())
+    elapsed = time.perf_counter() - start
+
+    assert all("error" not in result for result in results)
+    assert model.calls == 300
+    assert elapsed < 1.0
+    assert threading.active_count() <= threads_before + 1
+    assert service.sessions.get("async-user-7").history[0][0] == "question 7"
+
+def test_async_waiters_respect_concurrency_limit():
+    model = FakeGeminiModel(latency=0.05, jitter=0.0)
+    client = make_client(model, max_in_flight=4, max_queue=100)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        task = asyncio.ensure_future(client.generate_content_async("hello"))
+        await asyncio.sleep(0)
+        peak = max(peak, client.stats()["models"]["fake-gemini"]["in_flight"])
+        return await task
+
+    async def run():
+        threaded = asyncio.to_thread(client.generate_content, "from a worker thread")
+        return await asyncio.gather(threaded, *(call() for _ in range(40)))
+
+    start = time.perf_counter()
+    responses = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    assert len(responses) == 41 and model.calls == 41
+    assert peak <= 4
+    assert elapsed >= 0.45
+    stats = client.stats()["models"]["fake-gemini"]
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+def test_timed_out_async_waiter_frees_its_queue_slot():
+    client = make_client(FakeGeminiModel(latency=0.2, jitter=0.0), max_in_flight=1, max_queue=10, queue_timeout=0.05)
+
+    async def run():
+        return await asyncio.gather(
+            client.generate_content_async("first"), client.generate_content_async("second"), return_exceptions=True
+        )
+
+    first, second = asyncio.run(run())
+    assert first.text
+    assert isinstance(second, LLMBusyError)
+    stats = client.stats()["models"]["fake-gemini"]
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+def test_identical_async_cv_analyses_coalesce():
+    model = FakeGeminiModel(latency=0.1, jitter=0.0)
+    make_client(model, max_in_flight=50)
+    from services.cv_service import CVService
+    service = CVService()
+    service.analysis_cache.clear()
+
+    async def run():
+        return await asyncio.gather(*(service.analyze_cv_text_async(CV_TEXT, 300000000) for _ in range(20)))
+
+    results = asyncio.run(run())
+    assert model.calls == 1
+    assert all(result is results[0] for result in results)
+    assert "budget_breakdown" in results[0]
+    assert service.analyze_cv_text(CV_TEXT, 300000000) is results[0]
+    assert model.calls == 1
+
+def test_async_sections_time_out_to_partial_result():
+    model = SlowSectionModel(slow_field="climate_security", slow_latency=1.0, latency=0.01, jitter=0.0)
+    make_client(model, max_in_flight=50)
+    from services.cv_service import CVService
+    service = CVService()
+    service.analysis_cache.clear()
+    service.analysis_mode = "sectioned"
+    service.section_timeout = 0.3
+
+    start = time.perf_counter()
+    result = asyncio.run(service.analyze_cv_text_async(CV_TEXT + "\nSectioned", budget_limit=300000000))
+    assert time.perf_counter() - start < 0.6
+    assert result["partial"] is True
+    assert list(result["section_errors"]) == ["living"]
+    assert result["academic_analysis"] and result["recommended_programs"]
+
+def test_async_streams_and_scholarships_share_sync_caches():
+    model = FakeGeminiModel(latency=0.02, jitter=0.0)
+    make_client(model, max_in_flight=50)
+    from services.chatbot_service import ChatbotService
+    from services.scholarship_service import ScholarshipService
+    chatbot = ChatbotService(ChatSessionStore("test_async_stream"))
+    scholarships = ScholarshipService()
+    scholarships.university_cache.clear()
+
+    async def run():
+        tokens = [text async for text in chatbot.chat_stream_async("stream-user-1", "Tell me about TUM")]
+        fetched = await scholarships.get_university_specific_scholarships_async("TU Delft", "Computer Science")
+        return tokens, fetched
+
+    tokens, fetched = asyncio.run(run())
+    assert "".join(tokens).startswith("Wow, TUM")
+    assert chatbot.conversation_length("stream-user-1") == 1
+
+    calls = model.calls
+    assert scholarships.get_university_specific_scholarships("TU Delft", "Computer Science") is fetched
+    assert model.calls == calls
+
+if __name__ == "__main__":
+    test_hundreds_of_chats_in_flight_on_one_thread()
+    test_async_waiters_respect_concurrency_limit()
+    test_timed_out_async_waiter_frees_its_queue_slot()
+    test_identical_async_cv_analyses_coalesce()
+    test_async_sections_time_out_to_partial_result()
+    test_async_streams_and_scholarships_share_sync_caches()
+    print("Async service tests passed")
@@ -0,0 +1,98 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.budget_engine import BudgetEngine, parse_exchange_rates
+
+def test_programs_priced_in_idr():
+    engine = BudgetEngine(parse_exchange_rates("EUR=17000"))
+    analysis = {"recommended_programs": [
+        {"university": "TUM", "currency": "EUR", "tuition_per_year": 300,
+         "living_cost_per_month": 1000, "scholarship_amount_per_year": 20000},
+        {"university": "UW", "currency": "PLN", "tuition_per_year": 12000,
+         "living_cost_per_month": 3000, "scholarship_amount_per_year": 0}
+    ]}
+    
+    result = engine.apply(analysis, "low")
+    tum, warsaw = result["recommended_programs"]
+    
+    assert tum["annual_cost_idr"] == 17000 * 300 + 17000 * 1000 * 12
+    assert tum["scholarship_amount_idr"] == tum["annual_cost_idr"]
+    assert tum["net_cost_idr"] == 0
+    assert tum["fits_budget"] == "yes"
+    assert warsaw["net_cost_idr"] == 3950 * 12000 + 3950 * 3000 * 12
+    assert warsaw["fits_budget"] == "no"
+    assert result["budget_breakdown"]["minimum_self_funding_idr"] == 0
+    assert result["budget_breakdown"]["best_scholarship_coverage_idr"] == tum["scholarship_amount_idr"]
+
+def test_explicit_budget_overrides_tier():
+    engine = BudgetEngine()
+    programs = engine.price_programs(
+        [{"currency": "USD", "tuition_per_year": 10000, "living_cost_per_month": 0}], "high", budget_limit=100000000
+    )
+    assert programs[0]["net_cost_idr"] == 158000000
+    assert programs[0]["fits_budget"] == "no"
+
+def test_unknown_currency_is_left_unpriced():
+    engine = BudgetEngine()
+    result = engine.apply({"recommended_programs": [
+        {"university": "IIT", "currency": "INR", "tuition_per_year": 200000, "living_cost_per_month": 15000},
+        {"university": "UvA", "currency": "Euro", "tuition_per_year": 2000, "living_cost_per_month": 1000},
+        {"university": "NUS", "currency": "sgd", "tuition_per_year": 10000, "living_cost_per_month": 0}
+    ]}, "medium")
+    india, amsterdam, singapore = result["recommended_programs"]
+
+    for program, currency in ((india, "INR"), (amsterdam, "Euro")):
+        assert program["unsupported_currency"] == currency
+        assert program["annual_cost_idr"] is None
+        assert program["net_cost_idr"] is None
+        assert program["fits_budget"] is None
+    assert "unsupported_currency" not in singapore
+    assert singapore["net_cost_idr"] == 11700 * 10000
+    assert result["budget_breakdown"]["total_annual_cost_idr"] == singapore["annual_cost_idr"]
+    assert engine.to_idr(100, "XYZ") is None
+
+def test_unparseable_amounts_are_left_unpriced():
+    engine = BudgetEngine()
+    result = engine.apply({"recommended_programs": [
+        {"university": "ETH", "currency": "CHF", "tuition_per_year": "varies", "living_cost_per_month": None},
+        {"university": "KTH", "currency": "SEK", "tuition_per_year": 0, "living_cost_per_month": "depends on city"},
+        {"university": "NUS", "currency": "SGD", "tuition_per_year": 10000, "living_cost_per_month": 1000,
+         "scholarship_amount_per_year": "partial"}
+    ]}, "low")
+    zurich, stockholm, singapore = result["recommended_programs"]
+    
+    assert zurich["unpriced_amounts"] == ["tuition_per_year", "living_cost_per_month"]
+    assert stockholm["unpriced_amounts"] == ["living_cost_per_month"]
+    for program in (zurich, stockholm):
+        assert program["annual_cost_idr"] is None
+        assert program["net_cost_idr"] is None
+        assert program["fits_budget"] is None
+    assert singapore["scholarship_amount_idr"] == 0
+    assert result["budget_breakdown"]["minimum_self_funding_idr"] == singapore["net_cost_idr"] > 0
+    assert result["budget_breakdown"]["average_tuition_idr"] == 11700 * 10000
+
+def test_non_numeric_budget_is_rejected():
+    from flask import Flask
+    from routes.cv_routes import cv_bp
+    app = Flask(__name__)
+    app.register_blueprint(cv_bp, url_prefix='/api/cv')
+    client = app.test_client()
+    
+    for field, value in (("budget_limit", "about 100 million"), ("monthly_budget", "-5"), ("budget_limit", "inf")):
+        response = client.post('/api/cv/analyze-text', json={"text": "CV", field: value})
+        assert response.status_code == 400
+        assert field in response.get_json()["error"]
+
+def test_errors_pass_through():
+    assert BudgetEngine().apply({"error": "boom"}, "medium") == {"error": "boom"}
+
+if __name__ == "__main__":
+    test_programs_priced_in_idr()
+    test_explicit_budget_overrides_tier()
+    test_unknown_currency_is_left_unpriced()
+    test_unparseable_amounts_are_left_unpriced()
+    test_non_numeric_budget_is_rejected()
+    test_errors_pass_through()
+    print("Budget engine tests passed")
@@ -0,0 +1,77 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.chat_sessions import ChatSessionStore
+from services.llm_client import LLMClient, LocalContextCache, set_llm_client
+from fake_gemini import FakeGeminiModel
+
+CV_ANALYSIS = {
+    "personal_info": {"name": "  Siti   Rahma ", "email": "", "phone": None},
+    "skills": ["Python", "", "  SQL\n"],
+    "recommended_programs": [{"university": "TU Delft", "notes": []}, {}],
+    "improvement_areas": {}
+}
+
+class RecordingModel(FakeGeminiModel):
+    def __init__(self, **options):
+        super().__init__(latency=0.0, jitter=0.0, **options)
+        self.prompts = []
+
+    def generate_content(self, contents, generation_config=None, stream=False, **kwargs):
+        self.prompts.append(contents)
+        return super().generate_content(contents, generation_config=generation_config, stream=stream, **kwargs)
+
+def make_service(model):
+    client = LLMClient(default_model="fake-gemini", model_factory=lambda name: model)
+    set_llm_client(client)
+    from services.chatbot_service import ChatbotService
+    return ChatbotService(ChatSessionStore("test_context")), client
+
+def test_compact_context_drops_empty_values_and_whitespace():
+    from services.chatbot_service import _compact_context
+    assert _compact_context(CV_ANALYSIS) == {
+        "personal_info": {"name": "Siti Rahma"},
+        "skills": ["Python", "SQL"],
+        "recommended_programs": [{"university": "TU Delft"}]
+    }
+
+def test_context_is_sent_once_ahead_of_each_prompt():
+    model = RecordingModel()
+    service, _ = make_service(model)
+    service.set_cv_context("context-user", CV_ANALYSIS)
+
+    session = service.sessions.get("context-user")
+    assert isinstance(session.context_cache, LocalContextCache)
+    assert json.loads(session.cv_context_json)["personal_info"] == {"name": "Siti Rahma"}
+
+    service.chat("context-user", "Which program fits me?")
+    service.ask_about_universities("context-user", "TU Delft")
+    assert len(model.prompts) == 2
+    for contents in model.prompts:
+        assert isinstance(contents, list) and len(contents) == 2
+        assert contents[0].startswith("CV analysis context")
+        assert session.cv_context_json in contents[0]
+        assert session.cv_context_json not in contents[1]
+    assert "Provided at the start of this session" in model.prompts[1][1]
+
+    service.chat("no-context-user", "Hello")
+    assert isinstance(model.prompts[-1], str)
+    assert "No CV analysis context available" in model.prompts[-1]
+
+def test_remote_cache_only_above_token_threshold():
+    service, client = make_service(RecordingModel())
+    assert client.context_cache_mode == "local"
+
+    client.context_cache_mode = "remote"
+    service.set_cv_context("small-context-user", CV_ANALYSIS)
+    assert isinstance(service.sessions.get("small-context-user").context_cache, LocalContextCache)
+    assert client._remote_cache_disabled_until == 0
+
+if __name__ == "__main__":
+    test_compact_context_drops_empty_values_and_whitespace()
+    test_context_is_sent_once_ahead_of_each_prompt()
+    test_remote_cache_only_above_token_threshold()
+    print("Chat context tests passed")
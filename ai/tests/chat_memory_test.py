@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.chat_sessions import ChatSessionStore
+from services.llm_client import LLMClient, set_llm_client
+from fake_gemini import FakeGeminiModel
+
+def make_service(model):
+    set_llm_client(LLMClient(default_model="fake-gemini", model_factory=lambda name: model))
+    from services.chatbot_service import ChatbotService
+    return ChatbotService(ChatSessionStore("test_memory", history_turns=4))
+
+def wait_for_fold(session, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with session.lock:
+            if not session.pending and not session.summarizing:
+                return
+        time.sleep(0.01)
+    raise AssertionError("summary fold did not finish")
+
+def test_old_turns_fold_into_running_summary():
+    model = FakeGeminiModel(latency=0.0, jitter=0.0)
+    service = make_service(model)
+    
+    for turn in range(10):
+        result = service.chat("memory-user", f"Question {turn} about TU Delft tuition")
+        assert result["conversation_id"] == turn + 1
+    session = service.sessions.get("memory-user")
+    wait_for_fold(session)
+    
+    assert len(session.history) == 4
+    assert session.summarized_turns == 6
+    assert session.summary
+    
+    calls = model.calls
+    summary = service.get_conversation_summary("memory-user")
+    assert model.calls == calls
+    assert summary["summary"] == session.summary
+    assert summary["summarized_turns"] == 6
+    assert len(summary["recent_questions"]) == 4
+
+def test_prompt_size_stays_bounded():
+    service = make_service(FakeGeminiModel(latency=0.0, jitter=0.0))
+    sizes = []
+    for turn in range(40):
+        service.chat("bounded-user", "Tell me about scholarships in the Netherlands " * 5)
+        session = service.sessions.get("bounded-user")
+        wait_for_fold(session)
+        with session.lock:
+            sizes.append(len(service._build_chat_prompt(session, "next question")))
+    assert max(sizes[10:]) - min(sizes[10:]) < 200
+
+def test_extractive_fold_keeps_latest_turns():
+    service = make_service(FakeGeminiModel(latency=0.0, jitter=0.0))
+    session = service.sessions.get("offline-user")
+    for turn in range(30):
+        session.pending.append((f"What about LPDP requirement {turn}?", "You need an IELTS score of 6.5. " * 10, 0))
+    session.summarizing = True
+    
+    service._fold_summary(session, use_llm=False)
+    assert not session.pending and not session.summarizing
+    assert session.summarized_turns == 30
+    assert "requirement 29" in session.summary
+    assert "requirement 0?" not in session.summary
+    assert len(session.summary) <= 1500
+
+if __name__ == "__main__":
+    test_old_turns_fold_into_running_summary()
+    test_prompt_size_stays_bounded()
+    test_extractive_fold_keeps_latest_turns()
+    print("Chat memory tests passed")
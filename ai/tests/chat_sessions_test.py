@@ -0,0 +1,94 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.chat_sessions import ChatSessionStore
+from services.llm_client import LLMClient, set_llm_client
+from fake_gemini import FakeGeminiModel
+
+class TrackedCache:
+    released = 0
+
+    def release(self):
+        TrackedCache.released += 1
+
+def test_lru_eviction_by_count_and_memory():
+    store = ChatSessionStore("test_lru", max_sessions=3, max_bytes=10 ** 9, idle_ttl=60)
+    for session_id in ("a", "b", "c"):
+        store.get(session_id)
+    store.get("a")
+    store.get("d")
+    assert len(store) == 3
+    assert "b" not in store._sessions
+
+    session = store.get("e")
+    session.context_cache = TrackedCache()
+    session.history.append(("x" * 5000, "y" * 5000, time.time()))
+    store.update(session)
+    store.max_bytes = 8000
+    store.get("f")
+    assert "e" not in store._sessions
+    assert TrackedCache.released == 1
+    assert list(store._sessions) == ["f"]
+    assert store.stats()["evictions"] == 5
+
+def test_idle_sessions_expire():
+    store = ChatSessionStore("test_idle", max_sessions=100, idle_ttl=0.05)
+    first = store.get("idle-session")
+    first.history.append(("hi", "hello", time.time()))
+    time.sleep(0.1)
+    assert store.purge_idle() == 1
+    assert len(store.get("idle-session").history) == 0
+    assert store.stats()["expirations"] == 1
+
+def test_concurrent_sessions_do_not_cross_talk():
+    set_llm_client(LLMClient(default_model="fake-gemini", max_in_flight=64, max_queue=10000,
+                             model_factory=FakeGeminiModel.factory(latency=0.005, jitter=0.0)))
+    from services.chatbot_service import ChatbotService
+    service = ChatbotService(ChatSessionStore("test_chat", max_sessions=5000))
+
+    service.set_cv_context("user-a", {"personal_info": {"name": "Siti"}})
+    service.set_cv_context("user-b", {"personal_info": {"name": "Budi"}})
+
+    def converse(session_id, turns):
+        for turn in range(turns):
+            assert "error" not in service.chat(session_id, f"{session_id} question {turn}")
+
+    threads = [threading.Thread(target=converse, args=(f"user-{i % 40}", 3)) for i in range(120)]
+    threads += [threading.Thread(target=converse, args=(name, 5)) for name in ("user-a", "user-b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for index in range(40):
+        session_id = f"user-{index}"
+        history = service.sessions.get(session_id).history
+        assert all(user.startswith(f"{session_id} ") for user, _, _ in history)
+    assert "Siti" in service.sessions.get("user-a").cv_context_json
+    assert "Budi" in service.sessions.get("user-b").cv_context_json
+
+    service.clear_conversation("user-a")
+    assert len(service.sessions.get("user-a").history) == 0
+    assert len(service.sessions.get("user-b").history) == 5
+
+def test_thousands_of_sessions_stay_within_memory_cap():
+    store = ChatSessionStore("test_scale", max_sessions=100000, max_bytes=2 * 1024 * 1024, idle_ttl=3600)
+    for index in range(5000):
+        session = store.get(f"session-{index}")
+        session.history.append(("question " * 20, "answer " * 60, time.time()))
+        store.update(session)
+    stats = store.stats()
+    assert stats["bytes"] <= 2 * 1024 * 1024
+    assert 0 < stats["sessions"] < 5000
+    assert stats["bytes"] == sum(session.size for session in store._sessions.values())
+
+if __name__ == "__main__":
+    test_lru_eviction_by_count_and_memory()
+    test_idle_sessions_expire()
+    test_concurrent_sessions_do_not_cross_talk()
+    test_thousands_of_sessions_stay_within_memory_cap()
+    print("Chat session tests passed")
@@ -0,0 +1,112 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('WARMUP_ON_START', 'false')
+
+from flask import Flask
+from services.llm_client import LLMClient
+from fake_gemini import CHAT_REPLY, FakeGeminiModel
+
+def make_client(**options):
+    from routes.chatbot_routes import chatbot_bp, chatbot_service
+    chatbot_service.get().llm = LLMClient(
+        default_model="fake-gemini", model_factory=FakeGeminiModel.factory(latency=0.01, jitter=0.0, **options)
+    )
+    app = Flask(__name__)
+    app.register_blueprint(chatbot_bp, url_prefix='/api/chatbot')
+    return app.test_client(), chatbot_service
+
+def parse_events(body):
+    events = []
+    for block in body.split("\n\n"):
+        if not block:
+            continue
+        event_line, data_line = block.split("\n")
+        assert event_line.startswith("event: ") and data_line.startswith("data: ")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+def test_tokens_then_done_and_turn_recorded():
+    client, service = make_client()
+    response = client.post('/api/chatbot/chat/stream', json={"message": "Tell me about TUM", "session_id": "stream-test-1"})
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert response.headers["X-Session-ID"] == "stream-test-1"
+
+    events = parse_events(response.get_data(as_text=True))
+    names = [name for name, _ in events]
+    assert names[-1] == "done" and set(names[:-1]) == {"token"} and len(names) > 2
+    assert "".join(payload["text"] for _, payload in events[:-1]) == CHAT_REPLY
+    assert events[-1][1] == {"conversation_id": 1, "session_id": "stream-test-1"}
+
+    history = service.sessions.get("stream-test-1").history
+    assert [(user, assistant) for user, assistant, _ in history] == [("Tell me about TUM", CHAT_REPLY)]
+
+def test_upstream_failure_becomes_error_event():
+    client, service = make_client(failure_rate=1.0)
+    response = client.post('/api/chatbot/chat/stream', json={"message": "hello", "session_id": "stream-test-2"})
+
+    assert response.status_code == 200
+    events = parse_events(response.get_data(as_text=True))
+    assert [name for name, _ in events] == ["error"]
+    assert "Fake upstream failure" in events[0][1]["error"]
+    assert len(service.sessions.get("stream-test-2").history) == 0
+
+def test_missing_message_is_rejected_before_streaming():
+    client, _ = make_client()
+    response = client.post('/api/chatbot/chat/stream', json={})
+    assert response.status_code == 400
+    assert response.mimetype == "application/json"
+
+def test_clear_keeps_cv_context_and_requires_a_session():
+    client, service = make_client()
+    created = service.sessions.created
+    assert client.get('/api/chatbot/summary').get_json() == {"summary": "No conversation yet"}
+    assert client.post('/api/chatbot/clear').status_code == 200
+    assert service.sessions.created == created
+    
+    headers = {"X-Session-ID": "clear-test-1"}
+    client.post('/api/chatbot/set-context', json={"cv_analysis": {"skills": ["Python"]}}, headers=headers)
+    client.post('/api/chatbot/chat', json={"message": "Which program fits me?"}, headers=headers)
+    session = service.sessions.get("clear-test-1")
+    assert len(session.history) == 1
+    
+    response = client.post('/api/chatbot/clear', headers=headers)
+    assert response.get_json() == {"status": "Conversation cleared"}
+    assert service.sessions.get("clear-test-1") is session
+    assert len(session.history) == 0
+    assert session.has_cv_context and "Python" in session.cv_context_json
+    assert client.get('/api/chatbot/summary', headers=headers).get_json() == {"summary": "No conversation yet"}
+
+def test_cors_allows_and_exposes_session_header():
+    from app import app
+    client = app.test_client()
+    origin = {"Origin": "http://localhost:3000"}
+    
+    preflight = client.options('/api/chatbot/chat', headers=dict(origin, **{
+        "Access-Control-Request-Method": "POST", "Access-Control-Request-Headers": "content-type, x-session-id"
+    }))
+    assert preflight.headers["Access-Control-Allow-Origin"] == "http://localhost:3000"
+    assert "Access-Control-Allow-Credentials" not in preflight.headers
+    assert "x-session-id" in preflight.headers["Access-Control-Allow-Headers"].lower()
+    
+    response = client.post('/api/chatbot/chat', json={}, headers=origin)
+    assert "X-Session-ID" in response.headers["Access-Control-Expose-Headers"]
+
+def test_cors_never_allows_credentials_for_arbitrary_origins():
+    from app import app
+    response = app.test_client().post('/api/chatbot/chat', json={}, headers={"Origin": "https://evil.example"})
+    assert "Access-Control-Allow-Credentials" not in response.headers
+
+if __name__ == "__main__":
+    test_tokens_then_done_and_turn_recorded()
+    test_upstream_failure_becomes_error_event()
+    test_missing_message_is_rejected_before_streaming()
+    test_clear_keeps_cv_context_and_requires_a_session()
+    test_cors_allows_and_exposes_session_header()
+    test_cors_never_allows_credentials_for_arbitrary_origins()
+    print("Chat stream tests passed")
@@ -0,0 +1,57 @@
+import os
+import sys
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fitz
+from services.llm_client import LLMClient, set_llm_client
+from fake_gemini import FakeGeminiModel
+
+def make_pdf(text):
+    document = fitz.open()
+    page = document.new_page()
+    page.insert_text((72, 72), text)
+    data = document.tobytes()
+    document.close()
+    return data
+
+def test_batch_isolates_bad_files_and_caps_concurrency():
+    peak = {"current": 0, "max": 0}
+    lock = threading.Lock()
+    
+    class TrackingModel(FakeGeminiModel):
+        def generate_content(self, *args, **kwargs):
+            with lock:
+                peak["current"] += 1
+                peak["max"] = max(peak["max"], peak["current"])
+            try:
+                return super().generate_content(*args, **kwargs)
+            finally:
+                with lock:
+                    peak["current"] -= 1
+    
+    client = LLMClient(default_model="fake-gemini", lane_limits={"cv": 3, "cv_batch": 2},
+                       model_factory=TrackingModel.factory(latency=0.05, jitter=0.0))
+    set_llm_client(client)
+    
+    from services.cv_service import CVService
+    service = CVService()
+    
+    files = [(f"cv_{i}.pdf", make_pdf(f"Candidate {i}\nComputer Science, GPA 3.{i}")) for i in range(5)]
+    files += [("broken.pdf", b"not a pdf"), ("notes.txt", b"hello")]
+    result = service.analyze_cv_batch(files)
+    
+    assert result["total"] == 7
+    assert result["succeeded"] == 5
+    assert [item["filename"] for item in result["results"]] == [name for name, _ in files]
+    assert result["results"][5]["status"] == "error"
+    assert "supported" in result["results"][6]["error"]
+    assert "recommended_programs" in result["results"][0]["result"]
+    assert peak["max"] <= 2
+    assert "cv" not in client.stats()["lanes"]
+    assert client.stats()["lanes"]["cv_batch"]["in_flight"] == 0
+
+if __name__ == "__main__":
+    test_batch_isolates_bad_files_and_caps_concurrency()
+    print("CV batch tests passed")
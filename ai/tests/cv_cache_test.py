@@ -0,0 +1,84 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fitz
+from services.llm_client import LLMClient, set_llm_client
+from fake_gemini import FakeGeminiModel
+
+def make_pdf(text):
+    document = fitz.open()
+    document.new_page().insert_text((72, 72), text)
+    data = document.tobytes()
+    document.close()
+    return data
+
+def test_repeat_uploads_hit_text_and_analysis_caches():
+    model = FakeGeminiModel(latency=0.01, jitter=0.0)
+    set_llm_client(LLMClient(default_model="fake-gemini", model_factory=lambda name: model))
+    
+    from services.cv_service import CVService
+    service = CVService()
+    service.text_cache.clear()
+    service.analysis_cache.clear()
+    
+    extractions = []
+    extract = service._extract_text_from_pdf
+    service._extract_text_from_pdf = lambda data: extractions.append(1) or extract(data)
+    
+    pdf = make_pdf("Siti Rahma\nB.Eng. Civil Engineering, ITB, GPA 3.65")
+    first = service.analyze_cv_pdf(pdf, budget_limit=300000000)
+    second = service.analyze_cv_pdf(pdf, budget_limit=300000000)
+    assert second is first
+    assert model.calls == 1
+    assert len(extractions) == 1
+    
+    service.analyze_cv_pdf(pdf, budget_limit=900000000)
+    assert model.calls == 2
+    assert len(extractions) == 1
+    
+    events = list(service.analyze_cv_pdf_stream(pdf, budget_limit=900000000))
+    assert model.calls == 2
+    assert events[-1][0] == "result"
+    assert ("section", {"key": "academic_analysis", "value": events[-1][1]["academic_analysis"]}) in events
+
+def test_streamed_results_match_the_cached_response_shape():
+    model = FakeGeminiModel(latency=0.01, jitter=0.0)
+    set_llm_client(LLMClient(default_model="fake-gemini", model_factory=lambda name: model))
+    
+    from services.cv_service import CVService
+    service = CVService()
+    service.text_cache.clear()
+    service.analysis_cache.clear()
+    service.analysis_mode = "single"
+    
+    text = "Rina Putri\nB.Sc. Biology, Universitas Airlangga, GPA 3.8"
+    streamed = list(service.analyze_cv_text_stream(text, budget_limit=300000000))[-1][1]
+    cached = service.analyze_cv_text(text, budget_limit=300000000)
+    assert cached is streamed
+    assert "text_compaction" in cached
+    assert model.calls == 1
+
+def test_batch_skips_extraction_on_analysis_cache_hit():
+    model = FakeGeminiModel(latency=0.01, jitter=0.0)
+    set_llm_client(LLMClient(default_model="fake-gemini", model_factory=lambda name: model))
+    
+    from services.cv_service import CVService
+    service = CVService()
+    service.analysis_cache.clear()
+    pdf = make_pdf("Agus Salim\nM.Sc. Physics, UGM, GPA 3.9")
+    first = service.analyze_cv_pdf(pdf, budget_limit=300000000)
+    
+    service.text_cache.clear()
+    extractions = []
+    service._extract_text_from_pdf = lambda data: extractions.append(1) or ""
+    result = service.analyze_cv_batch([("cv.pdf", pdf)], budget_limit=300000000)
+    assert result["results"][0]["result"] is first
+    assert extractions == []
+
+if __name__ == "__main__":
+    test_repeat_uploads_hit_text_and_analysis_caches()
+    test_streamed_results_match_the_cached_response_shape()
+    test_batch_skips_extraction_on_analysis_cache_hit()
+    print("CV cache tests passed")
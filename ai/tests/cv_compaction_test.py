@@ -0,0 +1,94 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.cv_compaction import compact_cv_text, normalize_text
+
+PAGE = """Budi Santoso - Curriculum Vitae
+EDUCATION
+Universitas Indonesia, B.Sc. Computer Science, GPA 3.72
+EXPERIENCE
+•   Data Analyst Intern at Tokopedia,  built   dashboards for the marketing team
+SKILLS
+Python, SQL, machine learn-
+ing, TOEFL iBT 95
+ORGANIZATIONS
+{organizations}
+REFERENCES
+Dr. Andi Wijaya, Universitas Indonesia, andi@ui.ac.id
+Hobbies
+Football, chess, hiking
+Page {page} of 3
+"""
+
+def make_cv(organizations=3):
+    lines = "\n".join(f"- Committee member for campus event {i}, handled logistics and sponsors" for i in range(organizations))
+    return "\f".join(PAGE.format(organizations=lines, page=page) for page in range(1, 4))
+
+def test_normalizes_whitespace_bullets_and_hyphenation():
+    text = normalize_text("•   Built   dashboards\n\n\n\nmachine learn-\ning")
+    assert text == "- Built dashboards\n\nmachine learning"
+
+def test_drops_page_furniture_and_reports_reduction():
+    compacted, report = compact_cv_text(make_cv(), token_budget=10000)
+    
+    assert "Page 2 of 3" not in compacted
+    assert compacted.count("Budi Santoso - Curriculum Vitae") == 1
+    assert "machine learning" in compacted
+    assert report["token_reduction"] > 0
+    assert report["dropped_sections"] == []
+
+def test_budget_trims_low_value_sections_first():
+    compacted, report = compact_cv_text(PAGE.format(organizations="\n".join(
+        f"- Committee member for campus event {i}, handled logistics and sponsors" for i in range(30)
+    ), page=1), token_budget=150)
+    
+    assert report["compacted_tokens"] <= 150
+    assert report["dropped_sections"][:2] == ["references", "interests"]
+    assert "organizations" in report["truncated_sections"]
+    assert "Universitas Indonesia, B.Sc. Computer Science" in compacted
+    assert "Tokopedia" in compacted
+    assert "Dr. Andi Wijaya" not in compacted
+
+def test_keeps_repeated_content_outside_page_edges():
+    body = "Teaching Assistant\n- Graded weekly assignments\nGPA\n3\n"
+    pages = [f"Budi Santoso\n{body * 2}Thesis chapter {number}\nSupervised by Dr. Lee\n{number}" for number in range(1, 4)]
+    compacted, _ = compact_cv_text("\f".join(pages), token_budget=10000)
+    lines = compacted.split("\n")
+    
+    assert lines.count("Budi Santoso") == 1
+    assert lines.count("- Graded weekly assignments") == 6
+    assert lines.count("3") == 6
+    assert lines.count("Supervised by Dr. Lee") == 1
+    assert "2" not in lines
+    
+    compacted, _ = compact_cv_text("Budi Santoso\nAwards\n1\nBest thesis\n2")
+    assert compacted.split("\n") == ["Budi Santoso", "Awards", "1", "Best thesis", "2"]
+
+def test_single_line_cv_is_truncated_not_emptied():
+    text = "Budi Santoso Universitas Indonesia B.Sc. Computer Science GPA 3.72 Python SQL " * 300
+    compacted, report = compact_cv_text(text, token_budget=100)
+    
+    assert compacted.startswith("Budi Santoso Universitas Indonesia")
+    assert 0 < report["compacted_tokens"] <= 100
+    assert report["dropped_sections"] == []
+    assert report["truncated_sections"] == ["header"]
+
+def test_oversized_section_keeps_its_content():
+    text = "EDUCATION\n" + "Universitas Indonesia, B.Sc. Computer Science, thesis on graph learning. " * 200
+    compacted, report = compact_cv_text(text, token_budget=100)
+    
+    assert compacted.startswith("EDUCATION\nUniversitas Indonesia, B.Sc. Computer Science")
+    assert report["compacted_tokens"] <= 100
+    assert report["sections"] == ["education"]
+    assert report["truncated_sections"] == ["education"]
+
+if __name__ == "__main__":
+    test_normalizes_whitespace_bullets_and_hyphenation()
+    test_drops_page_furniture_and_reports_reduction()
+    test_budget_trims_low_value_sections_first()
+    test_keeps_repeated_content_outside_page_edges()
+    test_single_line_cv_is_truncated_not_emptied()
+    test_oversized_section_keeps_its_content()
+    print("CV compaction tests passed")
@@ -0,0 +1,142 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.llm_client import LLMClient, set_llm_client
+from services.schemas import CV_ANALYSIS_SCHEMA
+from fake_gemini import FakeGeminiModel
+
+CV_TEXT = "Dewi Lestari\nEducation\nB.Sc. Computer Science, Universitas Gadjah Mada, GPA 3.72\nSkills\nPython, SQL"
+
+class SlowSectionModel(FakeGeminiModel):
+    def __init__(self, slow_field=None, slow_latency=2.0, **options):
+        super().__init__(**options)
+        self.slow_field = slow_field
+        self.slow_latency = slow_latency
+
+    def generate_content(self, contents, generation_config=None, stream=False, **kwargs):
+        schema = (generation_config or {}).get("response_schema") or {}
+        if self.slow_field in schema.get("properties", {}):
+            self._sleep(self.slow_latency, kwargs.get("request_options"))
+        return super().generate_content(contents, generation_config=generation_config, stream=stream, **kwargs)
+
+def make_service(model, **client_options):
+    set_llm_client(LLMClient(default_model="fake-gemini", model_factory=lambda name: model, **client_options))
+    from services.cv_service import CVService
+    service = CVService()
+    service.analysis_cache.clear()
+    service.analysis_mode = "sectioned"
+    return service
+
+def test_sections_run_concurrently_and_merge():
+    model = SlowSectionModel(latency=0.3, jitter=0.0)
+    service = make_service(model)
+    
+    start = time.perf_counter()
+    result = service.analyze_cv_text(CV_TEXT, budget_limit=300000000)
+    elapsed = time.perf_counter() - start
+    
+    assert model.calls == 5
+    assert elapsed < 0.9
+    assert "partial" not in result
+    assert set(CV_ANALYSIS_SCHEMA["properties"]) <= set(result)
+    assert result["recommended_programs"][0]["annual_cost_idr"] >= 0
+    assert "budget_breakdown" in result
+    assert "text_compaction" in result
+
+def test_slow_section_returns_partial_result():
+    model = SlowSectionModel(slow_field="climate_security", slow_latency=1.0, latency=0.01, jitter=0.0)
+    service = make_service(model)
+    service.section_timeout = 0.3
+    
+    start = time.perf_counter()
+    result = service.analyze_cv_text(CV_TEXT + "\nPartial", budget_limit=300000000)
+    assert time.perf_counter() - start < 0.6
+    assert result["partial"] is True
+    assert list(result["section_errors"]) == ["living"]
+    assert result["climate_security"] == {} and result["religious_facilities"] == {}
+    assert result["academic_analysis"] and result["scholarship_priorities"]
+    
+    again = service.analyze_cv_text(CV_TEXT + "\nPartial", budget_limit=300000000)
+    assert again is not result and again["partial"] is True
+
+def test_timed_out_sections_release_their_slots():
+    model = SlowSectionModel(slow_field="climate_security", slow_latency=2.0, latency=0.01, jitter=0.0)
+    service = make_service(model)
+    service.section_timeout = 0.3
+    
+    start = time.perf_counter()
+    result = service.analyze_cv_text(CV_TEXT + "\nSlots", budget_limit=300000000)
+    assert list(result["section_errors"]) == ["living"]
+    while service.llm.stats()["lanes"]["cv_section"]["in_flight"]:
+        time.sleep(0.01)
+    assert time.perf_counter() - start < 0.6
+    assert service._section_pool("cv_section")._max_workers == service.llm.lane_limits["cv_section"]
+
+def test_sections_queued_past_the_deadline_never_call_the_model():
+    model = SlowSectionModel(latency=0.2, jitter=0.0)
+    service = make_service(model, lane_limits={"cv_section": 1})
+    service.section_timeout = 0.3
+    
+    result = service.analyze_cv_text(CV_TEXT + "\nQueued", budget_limit=300000000)
+    assert result["partial"] is True
+    assert "profile" not in result["section_errors"] and len(result["section_errors"]) == 4
+    time.sleep(0.2)
+    assert model.calls == 2
+    assert service.llm.stats()["lanes"]["cv_section"]["in_flight"] == 0
+
+def test_concurrent_sectioned_analyses_leave_model_slots_for_chat():
+    import threading
+    model = SlowSectionModel(latency=0.3, jitter=0.0)
+    service = make_service(model)
+    assert service.llm.lane_limits["cv_section"] <= service.llm.max_in_flight // 2
+    
+    analyses = [
+        threading.Thread(target=service.analyze_cv_text, args=(f"{CV_TEXT}\nBurst {index}",), kwargs={"budget_limit": 300000000})
+        for index in range(3)
+    ]
+    for thread in analyses:
+        thread.start()
+    time.sleep(0.1)
+    
+    start = time.perf_counter()
+    service.llm.generate_content("How do I apply to TU Delft?", lane="chat")
+    assert time.perf_counter() - start < 0.5
+    for thread in analyses:
+        thread.join()
+    assert service._section_pool("cv_section")._max_workers == service.llm.lane_limits["cv_section"]
+
+def test_cancelled_async_analysis_cancels_its_sections():
+    model = SlowSectionModel(latency=1.0, jitter=0.0)
+    service = make_service(model)
+    
+    async def cancel_midway():
+        analysis = asyncio.ensure_future(service.analyze_cv_text_async(CV_TEXT + "\nCancelled", budget_limit=300000000))
+        await asyncio.sleep(0.2)
+        analysis.cancel()
+        try:
+            await analysis
+        except asyncio.CancelledError:
+            pass
+        for _ in range(20):
+            pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            if not pending:
+                break
+            await asyncio.sleep(0.01)
+        return pending
+    
+    start = time.perf_counter()
+    assert asyncio.run(cancel_midway()) == []
+    assert time.perf_counter() - start < 0.6
+
+if __name__ == "__main__":
+    test_sections_run_concurrently_and_merge()
+    test_slow_section_returns_partial_result()
+    test_timed_out_sections_release_their_slots()
+    test_sections_queued_past_the_deadline_never_call_the_model()
+    test_concurrent_sectioned_analyses_leave_model_slots_for_chat()
+    test_cancelled_async_analysis_cancels_its_sections()
+    print("CV section tests passed")
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from google.api_core import exceptions as google_exceptions
+
+CHAT_REPLY = (
+    "Wow, TUM is a great pick! It's one of Germany's top technical universities and tuition is "
+    "almost free for most programs. Want me to dig into the DAAD scholarship or the application timeline?"
+)
+
+
+class FakeUsage:
+    def __init__(self, prompt_token_count, candidates_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+
+class FakeResponse:
+    def __init__(self, text, prompt_tokens=0):
+        self.text = text
+        self.usage_metadata = FakeUsage(prompt_tokens, len(text) // 4)
+
+
+def sample_from_schema(schema, name="value"):
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        return {key: sample_from_schema(sub_schema, key) for key, sub_schema in schema.get("properties", {}).items()}
+    if schema_type == "array":
+        return [sample_from_schema(schema["items"], name) for _ in range(2)]
+    if schema_type == "integer":
+        return 100000000 if name.endswith("_idr") else 8
+    if schema_type == "number":
+        return 1.0
+    if schema_type == "boolean":
+        return True
+    if "enum" in schema:
+        return schema["enum"][0]
+    if name == "currency":
+        return "EUR"
+    if "date" in name or "deadline" in name:
+        return "2026-03-15"
+    return f"Sample {name.replace('_', ' ')}"
+
+
+class FakeGeminiModel:
+    def __init__(self, model_name=None, latency=1.0, jitter=0.2, failure_rate=0.0, rate_limit_rate=0.0,
+                 stream_chunks=8, seed=None):
+        self.model_name = model_name
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.stream_chunks = stream_chunks
+        self.random = random.Random(seed)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def factory(cls, **options):
+        return lambda model_name: cls(model_name, **options)
+
+    def _roll(self):
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+            outcome = self.random.random()
+        return delay, outcome
+
+    def _response_text(self, generation_config):
+        schema = (generation_config or {}).get("response_schema")
+        if schema is None:
+            return CHAT_REPLY
+        return json.dumps(sample_from_schema(schema))
+
+    def _prompt_tokens(self, contents):
+        parts = contents if isinstance(contents, list) else [contents]
+        return sum(len(part) for part in parts if isinstance(part, str)) // 4
+
+    def _sleep(self, delay, request_options=None):
+        timeout = (request_options or {}).get("timeout")
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise google_exceptions.DeadlineExceeded("Fake request timed out")
+        time.sleep(delay)
+
+    def generate_content(self, contents, generation_config=None, stream=False, **kwargs):
+        delay, outcome = self._roll()
+        if outcome < self.rate_limit_rate:
+            time.sleep(delay * 0.1)
+            raise google_exceptions.ResourceExhausted("Fake quota exceeded")
+        if outcome < self.rate_limit_rate + self.failure_rate:
+            time.sleep(delay * 0.5)
+            raise google_exceptions.ServiceUnavailable("Fake upstream failure")
+
+        text = self._response_text(generation_config)
+        prompt_tokens = self._prompt_tokens(contents)
+        if not stream:
+            self._sleep(delay, kwargs.get("request_options"))
+            return FakeResponse(text, prompt_tokens)
+        return self._stream(text, delay, prompt_tokens)
+
+    def _stream(self, text, delay, prompt_tokens):
+        size = max(1, len(text) // self.stream_chunks + 1)
+        step = delay / self.stream_chunks
+        for start in range(0, len(text), size):
+            time.sleep(step)
+            yield FakeResponse(text[start:start + size], prompt_tokens)
+
+    async def generate_content_async(self, contents, generation_config=None, stream=False, **kwargs):
+        delay, outcome = self._roll()
+        if outcome < self.rate_limit_rate:
+            await asyncio.sleep(delay * 0.1)
+            raise google_exceptions.ResourceExhausted("Fake quota exceeded")
+        if outcome < self.rate_limit_rate + self.failure_rate:
+            await asyncio.sleep(delay * 0.5)
+            raise google_exceptions.ServiceUnavailable("Fake upstream failure")
+
+        text = self._response_text(generation_config)
+        prompt_tokens = self._prompt_tokens(contents)
+        if not stream:
+            await asyncio.sleep(delay)
+            return FakeResponse(text, prompt_tokens)
+        return self._stream_async(text, delay, prompt_tokens)
+
+    async def _stream_async(self, text, delay, prompt_tokens):
+        size = max(1, len(text) // self.stream_chunks + 1)
+        step = delay / self.stream_chunks
+        for start in range(0, len(text), size):
+            await asyncio.sleep(step)
+            yield FakeResponse(text[start:start + size], prompt_tokens)
@@ -0,0 +1,75 @@
+import io
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PIL import Image, ImageDraw
+from services.image_preprocessing import ImagePreprocessor, ImageTooLargeError
+
+def make_photo(size=(3000, 4000), angle=0):
+    image = Image.new("RGB", size, (250, 250, 245))
+    draw = ImageDraw.Draw(image)
+    for line in range(40):
+        draw.rectangle((600, 600 + line * 60, 2400, 630 + line * 60), fill=(20, 20, 20))
+    image = image.rotate(angle, fillcolor=(250, 250, 245))
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=95)
+    return output.getvalue()
+
+def test_shrinks_deskews_and_crops_photos():
+    blob, stats = ImagePreprocessor(max_side=1600).process(make_photo(angle=4))
+    
+    assert blob["mime_type"] == "image/jpeg"
+    assert stats["bytes_saved"] > 0
+    assert stats["original_size"] == [3000, 4000]
+    assert max(stats["processed_size"]) <= 1600
+    assert abs(stats["deskew_angle"] + 4) < 0.5
+    assert stats["cropped"]
+    assert Image.open(io.BytesIO(blob["data"])).mode == "L"
+
+def test_small_images_are_not_inflated():
+    image = Image.new("L", (200, 100), 255)
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    data = output.getvalue()
+    
+    blob, stats = ImagePreprocessor().process(data)
+    assert stats["bytes_saved"] >= 0
+    assert len(blob["data"]) <= len(data)
+
+def test_decompression_bomb_guard():
+    try:
+        ImagePreprocessor(max_pixels=1000000).process(make_photo(size=(2000, 2000)))
+        raise AssertionError("expected ImageTooLargeError")
+    except ImageTooLargeError:
+        pass
+
+def test_pillow_bomb_error_becomes_image_too_large():
+    limit = Image.MAX_IMAGE_PIXELS
+    Image.MAX_IMAGE_PIXELS = 100000
+    try:
+        ImagePreprocessor(max_pixels=10 ** 9).process(make_photo(size=(1000, 1000)))
+        raise AssertionError("expected ImageTooLargeError")
+    except ImageTooLargeError:
+        pass
+    finally:
+        Image.MAX_IMAGE_PIXELS = limit
+
+def test_mpo_photos_use_draft_decoding():
+    output = io.BytesIO()
+    photo = Image.open(io.BytesIO(make_photo()))
+    photo.save(output, format="MPO", save_all=True, append_images=[photo.copy()])
+    preprocessor = ImagePreprocessor(max_side=500)
+    source = preprocessor.open(output.getvalue())
+    
+    assert source.format == "MPO"
+    assert max(preprocessor.decode(source).size) < 4000
+
+if __name__ == "__main__":
+    test_shrinks_deskews_and_crops_photos()
+    test_small_images_are_not_inflated()
+    test_decompression_bomb_guard()
+    test_pillow_bomb_error_becomes_image_too_large()
+    test_mpo_photos_use_draft_decoding()
+    print("Image preprocessing tests passed")
@@ -0,0 +1,59 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.job_queue import JobQueue, JobQueueFullError
+
+def wait_for(job_queue, job_id, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = job_queue.get(job_id)
+        if job and job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+def test_jobs_complete_and_fail_independently():
+    job_queue = JobQueue("test_complete", workers=2, max_depth=10)
+    ok = job_queue.submit(lambda value: {"value": value}, 42)
+    failed = job_queue.submit(lambda: {"error": "bad CV"})
+    crashed = job_queue.submit(lambda: 1 / 0)
+    
+    assert wait_for(job_queue, ok)["result"] == {"value": 42}
+    assert wait_for(job_queue, failed)["error"] == "bad CV"
+    assert wait_for(job_queue, crashed)["status"] == "failed"
+    assert job_queue.stats()["completed"] == 1
+
+def test_queue_depth_is_bounded():
+    release = threading.Event()
+    job_queue = JobQueue("test_bounded", workers=1, max_depth=1)
+    running = job_queue.submit(release.wait)
+    while job_queue.get(running)["status"] != "running":
+        time.sleep(0.01)
+    
+    job_queue.submit(lambda: {})
+    try:
+        job_queue.submit(lambda: {})
+        raise AssertionError("expected JobQueueFullError")
+    except JobQueueFullError:
+        pass
+    finally:
+        release.set()
+    assert job_queue.stats()["rejected"] == 1
+
+def test_results_expire():
+    job_queue = JobQueue("test_expiry", workers=1, max_depth=10, result_ttl=0.05)
+    job_id = job_queue.submit(lambda: {"ok": True})
+    wait_for(job_queue, job_id)
+    time.sleep(0.1)
+    assert job_queue.get(job_id) is None
+    assert job_queue.stats()["expired"] == 1
+
+if __name__ == "__main__":
+    test_jobs_complete_and_fail_independently()
+    test_queue_depth_is_bounded()
+    test_results_expire()
+    print("Job queue tests passed")
@@ -0,0 +1,46 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.json_stream import StreamingJSONParser
+
+SAMPLE_ANALYSIS = {
+    "academic_analysis": "Strong GPA 3.8, \"top\" of class {honours}",
+    "recommended_programs": [
+        {"university": "University of Warsaw", "jurusan": "Computer Science MSc", "match_score": 9}
+    ],
+    "budget_breakdown": {"average_tuition_idr": 120000000, "minimum_self_funding_idr": 50000000},
+    "fits_budget": True,
+    "world_ranking": None
+}
+
+def test_sections_emitted_in_order():
+    text = "```json\n" + json.dumps(SAMPLE_ANALYSIS, indent=2) + "\n```"
+    parser = StreamingJSONParser()
+    sections = []
+    for i in range(0, len(text), 5):
+        sections.extend(parser.feed(text[i:i + 5]))
+    sections.extend(parser.close())
+    
+    assert [key for key, _ in sections] == list(SAMPLE_ANALYSIS)
+    assert dict(sections) == SAMPLE_ANALYSIS
+
+def test_section_available_before_document_ends():
+    parser = StreamingJSONParser()
+    sections = parser.feed('{"academic_analysis": "Good", "recommended_programs": [{"university": "X"')
+    assert sections == [("academic_analysis", "Good")]
+    assert not parser.done
+
+def test_trailing_commas_repaired_per_section():
+    parser = StreamingJSONParser()
+    sections = parser.feed('{"recommended_programs": [{"university": "X",},], "skills_assessment": "ok"}')
+    assert sections == [("recommended_programs", [{"university": "X"}]), ("skills_assessment", "ok")]
+    assert parser.errors == {}
+
+if __name__ == "__main__":
+    test_sections_emitted_in_order()
+    test_section_available_before_document_ends()
+    test_trailing_commas_repaired_per_section()
+    print("Streaming JSON parser tests passed")
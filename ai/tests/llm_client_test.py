@@ -0,0 +1,142 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from google.api_core import exceptions as google_exceptions
+from services.llm_client import LLMBusyError, LLMClient, _Limiter
+from fake_gemini import FakeGeminiModel
+
+class ScriptedModel(FakeGeminiModel):
+    def __init__(self, script, **options):
+        super().__init__(latency=0.0, jitter=0.0, **options)
+        self.script = list(script)
+
+    def generate_content(self, contents, generation_config=None, stream=False, **kwargs):
+        with self._lock:
+            step = self.script.pop(0) if self.script else None
+        if step is not None:
+            self.calls += 1
+            raise step
+        return super().generate_content(contents, generation_config=generation_config, stream=stream, **kwargs)
+
+def model_stats(client):
+    return client.stats()["models"]["fake-gemini"]
+
+def test_waiters_are_served_in_fifo_order():
+    limiter = _Limiter(max_in_flight=1, max_queue=10)
+    limiter.acquire()
+    order = []
+
+    def wait(index):
+        limiter.acquire(timeout=5)
+        order.append(index)
+        limiter.release()
+
+    threads = []
+    for index in range(5):
+        thread = threading.Thread(target=wait, args=(index,))
+        thread.start()
+        threads.append(thread)
+        while limiter.stats()["queued"] < index + 1:
+            time.sleep(0.001)
+
+    limiter.release()
+    for thread in threads:
+        thread.join()
+    assert order == [0, 1, 2, 3, 4]
+    assert limiter.stats() == {"in_flight": 0, "queued": 0, "max_in_flight": 1, "max_queue": 10}
+
+def test_full_queue_and_timeout_raise_busy():
+    limiter = _Limiter(max_in_flight=1, max_queue=1)
+    limiter.acquire()
+    waiter = threading.Thread(target=lambda: (limiter.acquire(timeout=5), limiter.release()))
+    waiter.start()
+    while limiter.stats()["queued"] < 1:
+        time.sleep(0.001)
+
+    try:
+        limiter.acquire(timeout=1)
+        raise AssertionError("expected LLMBusyError for a full queue")
+    except LLMBusyError:
+        pass
+
+    limiter.release()
+    waiter.join()
+    limiter.acquire()
+    start = time.perf_counter()
+    try:
+        limiter.acquire(timeout=0.05)
+        raise AssertionError("expected LLMBusyError after the queue timeout")
+    except LLMBusyError:
+        assert time.perf_counter() - start < 0.5
+    assert limiter.stats()["queued"] == 0
+    limiter.release()
+
+def test_lane_limit_applies_under_model_limit():
+    model = FakeGeminiModel(latency=0.1, jitter=0.0)
+    client = LLMClient(default_model="fake-gemini", max_in_flight=4, max_queue=50, lane_limits={"cv": 1},
+                       model_factory=lambda name: model)
+    peaks = {"cv": 0, "model": 0}
+    stop = threading.Event()
+
+    def sample():
+        while not stop.is_set():
+            stats = client.stats()
+            peaks["cv"] = max(peaks["cv"], stats["lanes"].get("cv", {}).get("in_flight", 0))
+            peaks["model"] = max(peaks["model"], stats["models"]["fake-gemini"]["in_flight"])
+            time.sleep(0.005)
+
+    client.get_model()
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    calls = [threading.Thread(target=client.generate_content, args=("cv",), kwargs={"lane": "cv"}) for _ in range(3)]
+    calls += [threading.Thread(target=client.generate_content, args=("chat",), kwargs={"lane": "chat"}) for _ in range(6)]
+    start = time.perf_counter()
+    for thread in calls:
+        thread.start()
+    for thread in calls:
+        thread.join()
+    stop.set()
+    sampler.join()
+
+    assert peaks["cv"] == 1
+    assert peaks["model"] == 4
+    assert time.perf_counter() - start >= 0.3
+    assert model_stats(client)["in_flight"] == 0
+    assert client.stats()["lanes"]["cv"]["in_flight"] == 0
+
+def test_slots_released_on_errors_and_rate_limit_retries():
+    model = ScriptedModel([google_exceptions.ServiceUnavailable("down"), google_exceptions.ResourceExhausted("429")])
+    client = LLMClient(default_model="fake-gemini", max_in_flight=1, max_queue=0, max_retries=1,
+                       lane_limits={"cv": 1}, model_factory=lambda name: model)
+
+    try:
+        client.generate_content("first", lane="cv")
+        raise AssertionError("expected the upstream failure to propagate")
+    except google_exceptions.ServiceUnavailable:
+        pass
+    assert model_stats(client)["in_flight"] == 0
+
+    response = client.generate_content("second", lane="cv")
+    assert response.text and model.calls == 3
+    assert model_stats(client)["in_flight"] == 0
+    assert client.stats()["lanes"]["cv"]["in_flight"] == 0
+
+    model.script = [google_exceptions.ResourceExhausted("429")] * 2
+    try:
+        client.generate_content("third", lane="cv")
+        raise AssertionError("expected ResourceExhausted after the last retry")
+    except google_exceptions.ResourceExhausted:
+        pass
+    assert model_stats(client)["in_flight"] == 0
+    assert client.generate_content("fourth").text
+
+if __name__ == "__main__":
+    test_waiters_are_served_in_fifo_order()
+    test_full_queue_and_timeout_raise_busy()
+    test_lane_limit_applies_under_model_limit()
+    test_slots_released_on_errors_and_rate_limit_retries()
+    print("LLM client tests passed")
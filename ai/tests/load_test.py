@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.llm_client import LLMClient, set_llm_client
+from fake_gemini import FakeGeminiModel
+
+SAMPLE_CV = """
+Budi Santoso - budi@example.com
+Education: Universitas Indonesia, B.Sc. Computer Science, GPA 3.72
+Experience: Data Analyst Intern at Tokopedia (2023), Teaching Assistant for Algorithms (2022-2023)
+Skills: Python, SQL, machine learning, TOEFL iBT 95
+"""
+
+UNIVERSITIES = [
+    "Technical University of Munich", "University of Warsaw", "National Taiwan University",
+    "Delft University of Technology", "University of Melbourne", "KU Leuven"
+]
+
+SCENARIOS = {
+    "cv_analyze_text": lambda i: ("/api/cv/analyze-text", {"text": f"{SAMPLE_CV}\nReference #{i}"}),
+    "cv_scholarship_timeline": lambda i: ("/api/cv/scholarship-timeline", {
+        "countries": ["Germany", "Netherlands"], "field": "Computer Science"
+    }),
+    "university_scholarships": lambda i: ("/api/scholarship/university-scholarships", {
+        "university_name": UNIVERSITIES[i % len(UNIVERSITIES)], "field_of_study": "Computer Science"
+    }),
+    "scholarship_timeline": lambda i: ("/api/scholarship/timeline", {
+        "university_name": UNIVERSITIES[i % len(UNIVERSITIES)], "user_country": "Indonesia",
+        "departure_date": "2027-09-01", "field_of_study": "Computer Science"
+    }),
+    "preparation_timeline": lambda i: ("/api/scholarship/preparation-timeline", {
+        "departure_date": "2027-09-01", "user_country": "Indonesia"
+    }),
+    "scholarship_search": lambda i: ("/api/scholarship/search", {
+        "field_of_study": "Computer Science", "target_countries": ["Germany", "Poland"], "budget_limit": 100000000
+    }),
+    "chat": lambda i: ("/api/chatbot/chat", {"message": f"Tell me about {UNIVERSITIES[i % len(UNIVERSITIES)]}"})
+}
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def build_app(latency, jitter, failure_rate, rate_limit_rate, max_concurrency, seed=None):
+    client = LLMClient(
+        default_model="fake-gemini",
+        max_in_flight=max_concurrency,
+        model_factory=FakeGeminiModel.factory(
+            latency=latency, jitter=jitter, failure_rate=failure_rate,
+            rate_limit_rate=rate_limit_rate, seed=seed
+        )
+    )
+    client.context_cache_mode = "local"
+    set_llm_client(client)
+
+    from app import app
+    return app
+
+def run_benchmark(app, scenarios, clients=16, requests_per_scenario=50):
+    local = threading.local()
+
+    def call(name, index):
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        path, payload = SCENARIOS[name](index)
+        start = time.perf_counter()
+        try:
+            response = local.client.post(path, json=payload)
+            body = response.get_json(silent=True) or {}
+            ok = response.status_code == 200 and "error" not in body
+        except Exception:
+            ok = False
+        return name, time.perf_counter() - start, ok
+
+    jobs = [(name, index) for index in range(requests_per_scenario) for name in scenarios]
+    results = {name: {"latencies": [], "errors": 0} for name in scenarios}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        for name, latency, ok in executor.map(lambda job: call(*job), jobs):
+            results[name]["latencies"].append(latency)
+            if not ok:
+                results[name]["errors"] += 1
+    wall_time = time.perf_counter() - start
+
+    report = {"wall_time_s": round(wall_time, 3), "endpoints": {}}
+    for name, result in results.items():
+        latencies = sorted(result["latencies"])
+        count = len(latencies)
+        report["endpoints"][name] = {
+            "requests": count,
+            "throughput_rps": round(count / wall_time, 2) if wall_time else 0.0,
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "error_rate": round(result["errors"] / count, 4) if count else 0.0
+        }
+    return report
+
+def print_report(report):
+    print(f"Wall time: {report['wall_time_s']}s")
+    print(f"{'endpoint':<26}{'reqs':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for name, stats in report["endpoints"].items():
+        print(
+            f"{name:<26}{stats['requests']:>6}{stats['throughput_rps']:>9}{stats['p50_ms']:>10}"
+            f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['error_rate']:>9.2%}"
+        )
+
+def test_benchmark_smoke():
+    app = build_app(latency=0.01, jitter=0.0, failure_rate=0.0, rate_limit_rate=0.0, max_concurrency=8, seed=1)
+    report = run_benchmark(app, list(SCENARIOS), clients=4, requests_per_scenario=3)
+
+    for name, stats in report["endpoints"].items():
+        assert stats["requests"] == 3, name
+        assert stats["error_rate"] == 0.0, name
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the AI API against a local fake Gemini backend")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent client threads")
+    parser.add_argument("--requests", type=int, default=50, help="requests per endpoint")
+    parser.add_argument("--latency", type=float, default=1.0, help="mean fake Gemini latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.25, help="latency standard deviation in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of calls failing with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of calls failing with 429")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="GEMINI_MAX_CONCURRENCY for the run")
+    parser.add_argument("--endpoints", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    app = build_app(args.latency, args.jitter, args.failure_rate, args.rate_limit_rate, args.max_concurrency, args.seed)
+    report = run_benchmark(app, args.endpoints, args.clients, args.requests)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
@@ -0,0 +1,80 @@
+import os
+import re
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('WARMUP_ON_START', 'false')
+
+from services.metrics import Counter, Histogram
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{([a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*",?)*\})? (-?[0-9.e+-]+|\+Inf)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+def parse_exposition(text):
+    assert text.endswith("\n")
+    declared, samples = {}, []
+    for line in text.splitlines():
+        if line.startswith("# HELP ") or line.startswith("# TYPE "):
+            parts = line.split(" ", 3)
+            if parts[1] == "TYPE":
+                declared[parts[2]] = parts[3]
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"invalid sample line: {line!r}"
+        name = match.group(1)
+        assert any(name == base or name.startswith(base + "_") for base in declared), f"undeclared metric: {name}"
+        samples.append((name, dict(LABEL.findall(match.group(2) or "")), float(match.group(4))))
+    return declared, samples
+
+def find(samples, name, **labels):
+    return [value for sample_name, sample_labels, value in samples
+            if sample_name == name and all(sample_labels.get(key) == value for key, value in labels.items())]
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_latency_seconds", "Test latency", ("route",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.7, 3):
+        histogram.observe(value, route='/a"b')
+    counter = Counter("test_events_total", "Test events", ("kind",))
+    counter.inc(kind="x")
+    counter.inc(2, kind="x")
+
+    text = "\n".join(histogram.render() + counter.render()) + "\n"
+    declared, samples = parse_exposition(text)
+    assert declared == {"test_latency_seconds": "histogram", "test_events_total": "counter"}
+    assert 'route="/a\\"b"' in text
+    assert [value for name, _, value in samples if name == "test_latency_seconds_bucket"] == [1, 3, 4]
+    assert find(samples, "test_latency_seconds_bucket", le="+Inf") == [4]
+    assert find(samples, "test_latency_seconds_count") == [4]
+    assert find(samples, "test_latency_seconds_sum") == [4.25]
+    assert find(samples, "test_events_total", kind="x") == [3]
+
+def test_metrics_endpoint_records_requests():
+    from app import app
+    client = app.test_client()
+    for _ in range(2):
+        assert client.get('/api/health').status_code == 200
+    assert client.get('/api/does-not-exist').status_code == 404
+
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+
+    declared, samples = parse_exposition(response.get_data(as_text=True))
+    assert declared["http_requests_total"] == "counter"
+    assert declared["http_request_duration_seconds"] == "histogram"
+    assert find(samples, "http_requests_total", method="GET", endpoint="/api/health", status="200")[0] >= 2
+    assert find(samples, "http_requests_total", method="GET", endpoint="unmatched", status="404")[0] >= 1
+
+    buckets = [
+        (labels["le"], value) for name, labels, value in samples
+        if name == "http_request_duration_seconds_bucket" and labels.get("endpoint") == "/api/health"
+    ]
+    assert buckets[-1][0] == "+Inf"
+    counts = [value for _, value in buckets]
+    assert counts == sorted(counts)
+    assert counts[-1] == find(samples, "http_request_duration_seconds_count", endpoint="/api/health")[0] >= 2
+
+if __name__ == "__main__":
+    test_histogram_buckets_are_cumulative()
+    test_metrics_endpoint_records_requests()
+    print("Metrics tests passed")
@@ -0,0 +1,153 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fitz
+from services.pdf_extraction import PDFLimitError, PDFTimeoutError, PDFTextExtractor
+
+def make_pdf(pages):
+    document = fitz.open()
+    for number in range(pages):
+        page = document.new_page()
+        page.insert_text((72, 72), f"Page {number} of the curriculum vitae")
+    data = document.tobytes()
+    document.close()
+    return data
+
+def expect_limit(extractor, data):
+    try:
+        extractor.extract(data)
+    except PDFLimitError as e:
+        return str(e)
+    raise AssertionError("expected PDFLimitError")
+
+def test_page_parallel_extraction_keeps_page_order():
+    extractor = PDFTextExtractor(workers=2, parallel_threshold=4, pages_per_task=3)
+    try:
+        text = extractor.extract(make_pdf(10))
+    finally:
+        extractor.shutdown()
+    positions = [text.index(f"Page {number} ") for number in range(10)]
+    assert positions == sorted(positions)
+
+def test_limits():
+    extractor = PDFTextExtractor(workers=0, max_pages=3, max_bytes=50000, max_chars=40)
+    assert "pages" in expect_limit(extractor, make_pdf(5))
+    assert "bytes" in expect_limit(extractor, b"%PDF" + b"0" * 60000)
+    assert len(extractor.extract(make_pdf(3))) == 40
+
+def test_pypdf2_fallback_runs_under_same_limits():
+    import services.pdf_extraction as pdf_extraction
+    
+    def broken_fitz(*args):
+        raise RuntimeError("fitz failed")
+    
+    original = pdf_extraction._fitz_extract_document
+    pdf_extraction._fitz_extract_document = broken_fitz
+    try:
+        extractor = PDFTextExtractor(workers=0, max_pages=2)
+        assert "Page 1 of the curriculum vitae" in extractor.extract(make_pdf(2))
+        assert "pages" in expect_limit(extractor, make_pdf(3))
+    finally:
+        pdf_extraction._fitz_extract_document = original
+
+def test_timeout_kills_stuck_workers():
+    extractor = PDFTextExtractor(workers=1, timeout=0.5)
+    try:
+        try:
+            extractor._run(time.monotonic() + 0.5, time.sleep, 30)
+            raise AssertionError("expected PDFTimeoutError")
+        except PDFTimeoutError as e:
+            assert "timed out" in str(e)
+        assert "Page 0" in extractor.extract(make_pdf(1))
+    finally:
+        extractor.shutdown()
+
+def test_timeout_only_stops_the_hung_task():
+    extractor = PDFTextExtractor(workers=2, timeout=1.0)
+    errors = []
+    
+    def hang():
+        try:
+            extractor._run(time.monotonic() + 1.0, time.sleep, 30)
+        except PDFTimeoutError as e:
+            errors.append(e)
+    
+    try:
+        hung = threading.Thread(target=hang)
+        hung.start()
+        while extractor._slots._value > 1:
+            time.sleep(0.01)
+        assert "Page 0" in extractor.extract(make_pdf(1))
+        survivor = extractor._idle[0].process
+        
+        hung.join()
+        assert errors and "timed out" in str(errors[0])
+        assert survivor.is_alive()
+        assert "Page 0" in extractor.extract(make_pdf(1))
+        assert [worker.process for worker in extractor._idle] == [survivor]
+    finally:
+        extractor.shutdown()
+
+def test_render_pages_in_process_at_target_dpi():
+    extractor = PDFTextExtractor(workers=0)
+    images = extractor.render_pages(make_pdf(3), max_pages=2, dpi=100, max_side=4000)
+    
+    assert len(images) == 2
+    assert images[0].mode == "L"
+    assert abs(images[0].size[0] - 595 * 100 / 72) <= 1
+    assert abs(images[0].size[1] - 842 * 100 / 72) <= 1
+    
+    capped = extractor.render_pages(make_pdf(1), dpi=600, max_side=1000, grayscale=False)
+    assert max(capped[0].size) <= 1000
+    assert capped[0].mode == "RGB"
+
+def test_pdf_limits_return_413_on_every_route():
+    from io import BytesIO
+    from flask import Flask
+    from services.llm_client import LLMClient, set_llm_client
+    from fake_gemini import FakeGeminiModel
+    set_llm_client(LLMClient(default_model="fake-gemini", model_factory=FakeGeminiModel.factory(latency=0.0)))
+    from routes.cv_routes import cv_bp, cv_service
+    cv_service.get().pdf_extractor = PDFTextExtractor(workers=0, max_pages=1)
+    app = Flask(__name__)
+    app.register_blueprint(cv_bp, url_prefix='/api/cv')
+    client = app.test_client()
+    
+    for route in ('/api/cv/analyze', '/api/cv/analyze-pdf', '/api/cv/analyze/stream'):
+        response = client.post(route, data={"file": (BytesIO(make_pdf(2)), "cv.pdf")})
+        assert response.status_code == 413
+        assert "pages" in response.get_json()["error"]
+
+def test_busy_pool_returns_503_not_413():
+    from io import BytesIO
+    from flask import Flask
+    from routes.cv_routes import cv_bp, cv_service
+    extractor = PDFTextExtractor(workers=1, timeout=0.2)
+    cv_service.get().pdf_extractor = extractor
+    app = Flask(__name__)
+    app.register_blueprint(cv_bp, url_prefix='/api/cv')
+    
+    extractor._slots.acquire()
+    try:
+        response = app.test_client().post('/api/cv/analyze-pdf', data={"file": (BytesIO(make_pdf(1) + b"busy"), "cv.pdf")})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+        assert "worker" in response.get_json()["error"]
+    finally:
+        extractor._slots.release()
+        extractor.shutdown()
+
+if __name__ == "__main__":
+    test_page_parallel_extraction_keeps_page_order()
+    test_limits()
+    test_pypdf2_fallback_runs_under_same_limits()
+    test_timeout_kills_stuck_workers()
+    test_timeout_only_stops_the_hung_task()
+    test_render_pages_in_process_at_target_dpi()
+    test_pdf_limits_return_413_on_every_route()
+    test_busy_pool_returns_503_not_413()
+    print("PDF extraction tests passed")
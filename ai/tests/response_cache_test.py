@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.response_cache import TTLCache, make_cache_key
+
+def test_normalized_keys():
+    key1 = make_cache_key("Technical University of Munich", "Computer Science")
+    key2 = make_cache_key("  technical  university of munich ", "COMPUTER SCIENCE")
+    assert key1 == key2
+    assert make_cache_key(["Germany", "Canada"]) == make_cache_key(["canada", "germany"])
+
+def test_lru_eviction_and_counters():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    
+    stats = cache.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+def test_ttl_expiry():
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+def test_weight_bounded_eviction():
+    cache = TTLCache(maxsize=10, ttl=60, max_weight=10, weigher=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+    cache.set("c", "xxxx")
+    
+    assert cache.get("a") is None
+    assert cache.get("c") == "xxxx"
+    assert cache.stats()["weight"] == 8
+    
+    cache.set("huge", "x" * 11)
+    assert cache.get("huge") is None
+    assert cache.stats()["weight"] == 8
+
+if __name__ == "__main__":
+    test_normalized_keys()
+    test_lru_eviction_and_counters()
+    test_ttl_expiry()
+    test_weight_bounded_eviction()
+    print("Response cache tests passed")
@@ -0,0 +1,83 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.scholarship_catalog import ScholarshipCatalog
+
+def names(results):
+    return [item["scholarship_name"] for item in results]
+
+def test_filters_by_country_field_and_budget():
+    catalog = ScholarshipCatalog(":memory:")
+    
+    results = catalog.search(field_of_study="Computer Science", target_countries=["Poland"], user_country="Indonesia")
+    assert "Ignacy Lukasiewicz Scholarship Programme" in names(results)
+    assert "LPDP Scholarship" in names(results)
+    assert "Chevening Scholarship" not in names(results)
+    
+    results = catalog.search(target_countries="Netherlands", budget_limit=50000000)
+    assert "Holland Scholarship" not in names(results)
+    assert all(item["min_self_funding_idr"] is None or item["min_self_funding_idr"] <= 50000000 for item in results)
+
+def test_nationality_filter():
+    catalog = ScholarshipCatalog(":memory:")
+    results = catalog.search(target_countries=["Indonesia", "United States"], user_country="Malaysia")
+    assert "Fulbright Master's Degree Program" not in names(results)
+
+def test_full_text_query():
+    catalog = ScholarshipCatalog(":memory:")
+    results = catalog.search(query="embassy recommendation", target_countries=["Japan", "Taiwan", "South Korea"])
+    assert set(names(results)) == {"MEXT Japanese Government Scholarship", "Taiwan ICDF International Higher Education Scholarship"}
+
+def test_ingests_llm_answers_without_overriding_curated():
+    catalog = ScholarshipCatalog(":memory:")
+    added = catalog.ingest_university_scholarships({
+        "university_scholarships": [{
+            "scholarship_name": "TUM Deutschlandstipendium", "amount": "EUR 300 per month",
+            "amount_idr": "Rp 62.000.000", "deadline": "2099-08-15", "eligibility": "Excellent grades",
+            "contact_information": "Email the TUM scholarship office"
+        }],
+        "external_scholarships": [{"scholarship_name": "LPDP Scholarship", "provider": "LPDP", "amount_idr": "1"}]
+    }, "Technical University of Munich", "Computer Science")
+    
+    assert added == 1
+    results = catalog.search(field_of_study="computer science", target_countries="Germany")
+    tum = next(item for item in results if item["scholarship_name"] == "TUM Deutschlandstipendium")
+    assert tum["coverage_idr"] == 62000000
+    assert tum["countries"] == ["germany"]
+    assert tum["source"] == "llm"
+    assert tum["application_url"] is None
+    assert catalog.stats() == {"curated": 22, "llm": 1}
+
+def test_unknown_self_funding_ranks_last_and_limit_is_clamped():
+    catalog = ScholarshipCatalog(":memory:")
+    catalog.upsert_many([{"name": "Unpriced Award", "countries": ["Netherlands"], "deadline": "2099-01-01"}])
+    
+    results = catalog.search(target_countries="Netherlands", budget_limit=50000000)
+    assert names(results)[-1] == "Unpriced Award"
+    assert all(item["min_self_funding_idr"] <= 50000000 for item in results[:-1])
+    
+    assert len(catalog.search(limit=0)) == 1
+    assert len(catalog.search(limit=-5)) == 1
+    assert len(catalog.search(limit="abc")) == 20
+    assert len(catalog.search(include_expired=True, limit=10 ** 9)) == catalog.stats()["curated"] + 1
+
+def test_recurring_deadlines_roll_over_at_query_time():
+    catalog = ScholarshipCatalog(":memory:")
+    yesterday = datetime.now() - timedelta(days=1)
+    catalog.upsert_many([{"name": "Annual Award", "countries": ["Iceland"], "deadline": yesterday.strftime("%m-%d")}])
+    
+    award = next(item for item in catalog.search(target_countries="Iceland") if item["scholarship_name"] == "Annual Award")
+    assert award["application_deadline"] == f"{yesterday.year + 1}-{yesterday.strftime('%m-%d')}"
+    assert catalog.conn.execute("SELECT deadline FROM scholarships WHERE name = 'Annual Award'").fetchone()[0] == yesterday.strftime("%m-%d")
+
+if __name__ == "__main__":
+    test_filters_by_country_field_and_budget()
+    test_nationality_filter()
+    test_full_text_query()
+    test_ingests_llm_answers_without_overriding_curated()
+    test_unknown_self_funding_ranks_last_and_limit_is_clamped()
+    test_recurring_deadlines_roll_over_at_query_time()
+    print("Scholarship catalog tests passed")
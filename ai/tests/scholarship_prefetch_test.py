@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SCHOLARSHIP_CATALOG_DB', ':memory:')
+
+from services.llm_client import LLMClient, set_llm_client
+from services.scholarship_prefetch import ScholarshipPrefetcher, top_universities
+from fake_gemini import FakeGeminiModel
+
+ANALYSIS = {
+    "recommended_programs": [
+        {"university": "University of Warsaw", "match_score": 7},
+        {"university": "TU Delft", "match_score": 9},
+        {"university": "tu  delft", "match_score": 8},
+        {"university": "KU Leuven", "match_score": 8},
+        {"university": "Charles University", "match_score": 6}
+    ]
+}
+
+def make_prefetcher(model, **options):
+    set_llm_client(LLMClient(default_model="fake-gemini", model_factory=lambda name: model))
+    from services.scholarship_service import ScholarshipService
+    service = ScholarshipService()
+    service.university_cache.clear()
+    service.timeline_cache.clear()
+    return service, ScholarshipPrefetcher(service, **options)
+
+def wait_until_idle(prefetcher, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        stats = prefetcher.jobs.stats()
+        if not stats["queued"] and not stats["running"]:
+            return
+        time.sleep(0.01)
+    raise AssertionError("prefetch jobs did not finish")
+
+def test_top_universities_ranked_and_deduplicated():
+    assert top_universities(ANALYSIS, 3) == ["TU Delft", "KU Leuven", "University of Warsaw"]
+    assert top_universities({"error": "x"}, 3) == []
+
+def test_follow_up_requests_hit_prefetched_cache():
+    model = FakeGeminiModel(latency=0.01, jitter=0.0)
+    service, prefetcher = make_prefetcher(model, top_n=2)
+    
+    scheduled = prefetcher.schedule(ANALYSIS, user_country="Indonesia", departure_date="2027-09-01")
+    assert len(scheduled) == 4
+    wait_until_idle(prefetcher)
+    calls = model.calls
+    
+    service.get_university_specific_scholarships("TU Delft")
+    service.get_scholarship_timeline("KU Leuven", "Indonesia", "2027-09-01")
+    assert model.calls == calls
+    assert prefetcher.schedule(ANALYSIS, user_country="Indonesia", departure_date="2027-09-01") == []
+
+def test_budget_and_load_limit_prefetching():
+    model = FakeGeminiModel(latency=0.01, jitter=0.0)
+    service, prefetcher = make_prefetcher(model, top_n=3, budget=1)
+    prefetcher.schedule(ANALYSIS)
+    wait_until_idle(prefetcher)
+    assert model.calls == 1
+    
+    service, prefetcher = make_prefetcher(model, top_n=3, max_load=0.0)
+    service.llm.get_model()
+    prefetcher.schedule(ANALYSIS)
+    wait_until_idle(prefetcher)
+    assert model.calls == 1
+
+if __name__ == "__main__":
+    test_top_universities_ranked_and_deduplicated()
+    test_follow_up_requests_hit_prefetched_cache()
+    test_budget_and_load_limit_prefetching()
+    print("Scholarship prefetch tests passed")
@@ -0,0 +1,71 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.single_flight import SingleFlight
+
+def run_concurrently(flight, key, fn, callers):
+    results, errors = [], []
+    barrier = threading.Barrier(callers)
+
+    def call():
+        barrier.wait()
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    runs = []
+
+    def fn():
+        runs.append(1)
+        time.sleep(0.1)
+        return {"value": 42}
+
+    results, errors = run_concurrently(flight, ("analysis", "abc"), fn, 10)
+    assert not errors
+    assert len(runs) == 1
+    assert len(results) == 10 and all(result is results[0] for result in results)
+    assert flight.stats() == {"executed": 1, "coalesced": 9, "in_flight": 0}
+
+def test_errors_are_raised_to_every_caller():
+    flight = SingleFlight()
+    failure = ValueError("upstream failed")
+
+    def fn():
+        time.sleep(0.1)
+        raise failure
+
+    results, errors = run_concurrently(flight, "key", fn, 5)
+    assert not results
+    assert len(errors) == 5 and all(error is failure for error in errors)
+    assert flight.stats()["in_flight"] == 0
+
+def test_key_is_freed_after_completion():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+    try:
+        flight.do("key", lambda: 1 / 0)
+    except ZeroDivisionError:
+        pass
+    assert flight.do("key", lambda: 3) == 3
+    assert flight.stats() == {"executed": 4, "coalesced": 0, "in_flight": 0}
+
+if __name__ == "__main__":
+    test_concurrent_callers_share_one_execution()
+    test_errors_are_raised_to_every_caller()
+    test_key_is_freed_after_completion()
+    print("Single flight tests passed")
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+AI_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_MODULES = ("google.generativeai", "fitz", "PyPDF2", "cv2", "numpy", "PIL.Image")
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import app
+import_s = time.perf_counter() - start
+import_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+loaded = [name for name in {heavy!r} if name in sys.modules]
+warmup_s = None
+if {warm!r}:
+    start = time.perf_counter()
+    app.warm_services()
+    warmup_s = time.perf_counter() - start
+print(json.dumps({{
+    "import_s": round(import_s, 3),
+    "import_rss_mb": round(import_rss / 1024, 1),
+    "warmup_s": round(warmup_s, 3) if warmup_s is not None else None,
+    "warm_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    "heavy_modules_loaded": loaded
+}}))
+"""
+
+def measure_startup(warm=False):
+    env = dict(os.environ, WARMUP_ON_START="false", SCHOLARSHIP_CATALOG_DB=":memory:")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(heavy=HEAVY_MODULES, warm=warm)],
+        cwd=AI_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def test_app_import_defers_heavy_modules():
+    report = measure_startup()
+    assert report["heavy_modules_loaded"] == []
+
+def test_warmup_loads_services():
+    report = measure_startup(warm=True)
+    assert report["warmup_s"] is not None
+    assert report["warm_rss_mb"] >= report["import_rss_mb"]
+
+SPAWN_PROBE = """
+import json, multiprocessing, threading
+
+def probe(queue):
+    import app
+    queue.put([thread.name for thread in threading.enumerate()])
+
+if __name__ == "__main__":
+    import app
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    child = context.Process(target=probe, args=(queue,))
+    child.start()
+    print(json.dumps({"parent": [thread.name for thread in threading.enumerate()], "child": queue.get()}))
+    child.join()
+"""
+
+def test_spawned_workers_do_not_warm_up():
+    import tempfile
+    env = dict(os.environ, WARMUP_ON_START="true", SCHOLARSHIP_CATALOG_DB=":memory:", PYTHONPATH=AI_DIR)
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+        f.write(SPAWN_PROBE)
+    try:
+        output = subprocess.run(
+            [sys.executable, f.name], cwd=AI_DIR, env=env, capture_output=True, text=True, check=True, timeout=120
+        ).stdout
+    finally:
+        os.unlink(f.name)
+    threads = json.loads(output.strip().splitlines()[-1])
+    assert "warmup" in threads["parent"]
+    assert "warmup" not in threads["child"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure API cold start time and resident memory")
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh interpreter runs")
+    parser.add_argument("--warm", action="store_true", help="also run the warmup hook")
+    args = parser.parse_args()
+
+    reports = [measure_startup(args.warm) for _ in range(args.runs)]
+    for key in ("import_s", "import_rss_mb", "warmup_s", "warm_rss_mb"):
+        values = sorted(report[key] for report in reports if report[key] is not None)
+        if values:
+            print(f"{key:<16} min {values[0]:>8}  median {values[len(values) // 2]:>8}  max {values[-1]:>8}")
+    print(f"heavy modules loaded at import: {reports[0]['heavy_modules_loaded'] or 'none'}")
@@ -0,0 +1,89 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.schemas import CV_ANALYSIS_SCHEMA
+from services.structured_output import complete_structured, parse_number, parse_structured
+
+PARTIAL_RESPONSE = """```json
+{
+    "academic_analysis": "GPA 3.6 in Informatics.",
+    "skills_assessment": "Python and data analysis.",
+    "recommended_programs": [
+        {"university": "University of Warsaw", "jurusan": "Computer Science MSc", "country": "Poland",
+         "city": "Warsaw", "currency": "PLN", "tuition_per_year": "12,000", "living_cost_per_month": "3.000",
+         "scholarship_amount_per_year": 30000, "match_score": "9", "reasoning": "Affordable",},
+    ],
+    "scholarship_priorities": [
+        {"name": "Erasmus Mundus", "coverage_idr": "Rp 400.000.000", "coverage_percentage": 100.0,
+         "deadline": "2026-01-15", "application_url": "https://example.org", "success_probability": "Medium",
+         "requirements": "GPA 3.5"}
+    ],
+    "climate_security": {"climate_type": "Temperate"}
+"""
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeLLM:
+    def __init__(self, text):
+        self.text = text
+        self.calls = []
+    
+    def generate_content(self, contents, lane="default", **kwargs):
+        self.calls.append((contents, kwargs))
+        return FakeResponse(self.text)
+
+def test_repairs_types_and_reports_broken_fields():
+    data, invalid = parse_structured(PARTIAL_RESPONSE, CV_ANALYSIS_SCHEMA)
+    program = data["recommended_programs"][0]
+    
+    scholarship = data["scholarship_priorities"][0]
+    
+    assert program["tuition_per_year"] == 12000
+    assert program["living_cost_per_month"] == 3000
+    assert program["match_score"] == 9
+    assert scholarship["coverage_idr"] == 400000000
+    assert scholarship["coverage_percentage"] == 100
+    assert scholarship["success_probability"] == "medium"
+    assert "recommended_programs" not in invalid
+    assert "scholarship_priorities" not in invalid
+    assert "climate_security" in invalid
+    assert "preparation_steps" in invalid
+
+def test_only_broken_fields_are_requested_again():
+    data, invalid = parse_structured(PARTIAL_RESPONSE, CV_ANALYSIS_SCHEMA)
+    llm = FakeLLM('{"climate_security": {"climate_type": "Temperate", "temperature_range": "-5 to 25C", '
+                  '"safety_score": 8, "clothing_budget_idr": 5000000, "adaptation_tips": "Layer up"}}')
+    
+    result = complete_structured(llm, "prompt", CV_ANALYSIS_SCHEMA, data, invalid)
+    
+    assert len(llm.calls) == 1
+    retry_schema = llm.calls[0][1]["generation_config"]["response_schema"]
+    assert set(retry_schema["properties"]) == set(invalid)
+    assert result["climate_security"]["safety_score"] == 8
+    assert result["academic_analysis"] == "GPA 3.6 in Informatics."
+
+def test_ratios_and_ranges_are_not_joined_into_numbers():
+    for text in ("8/10", "8 / 10", "10-20", "IDR 5,000 - 10,000", "3 to 5"):
+        assert parse_number(text) is None
+    
+    response = PARTIAL_RESPONSE.replace('"match_score": "9"', '"match_score": "8/10"')
+    data, invalid = parse_structured(response, CV_ANALYSIS_SCHEMA)
+    assert "recommended_programs" in invalid
+
+def test_comma_is_a_thousands_separator_only_before_three_digits():
+    assert parse_number("1,5") == 1.5
+    assert parse_number("USD 12,500") == 12500
+    assert parse_number("1,234,567") == 1234567
+    assert parse_number("1,50,000") is None
+    assert parse_number("-5") == -5
+
+if __name__ == "__main__":
+    test_repairs_types_and_reports_broken_fields()
+    test_only_broken_fields_are_requested_again()
+    test_ratios_and_ranges_are_not_joined_into_numbers()
+    test_comma_is_a_thousands_separator_only_before_three_digits()
+    print("Structured output tests passed")
@@ -0,0 +1,62 @@
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.timeline_engine import TimelineEngine, days_bucket
+
+TODAY = datetime(2026, 1, 1)
+
+def test_backward_dates_follow_country_template():
+    engine = TimelineEngine()
+    timeline = engine.build("2027-09-01", "Indonesia", today=TODAY)
+    milestones = {item["milestone"]: item for item in timeline["backward_timeline"]}
+    
+    assert milestones["visa collection/final documents"]["date"] == "2027-08-18"
+    assert milestones["visa application submission"]["date"] == "2027-07-04"
+    assert milestones["application submissions"]["days_before_departure"] == "209"
+    assert timeline["timeline_analysis"]["is_sufficient"] == "yes"
+    assert timeline["timeline_analysis"]["risk_level"] == "low"
+    assert all(item["status"] == "upcoming" for item in milestones.values())
+
+def test_tight_timeline_marks_overdue_milestones():
+    engine = TimelineEngine()
+    timeline = engine.build("2026-04-01", "Atlantis", today=TODAY)
+    statuses = [item["status"] for item in timeline["backward_timeline"]]
+    
+    assert timeline["timeline_analysis"]["risk_level"] == "high"
+    assert "overdue" in statuses and "upcoming" in statuses
+    recommendations = engine.default_recommendations(timeline)
+    assert recommendations["emergency_actions"]
+    assert recommendations["start_immediately"][0].startswith("Catch up on")
+
+def test_days_bucket():
+    assert days_bucket(10) == "<=30"
+    assert days_bucket(200) == "<=270"
+    assert days_bucket(1000) == ">540"
+
+def test_include_narrative_string_false_skips_the_model():
+    from flask import Flask
+    from services.llm_client import LLMClient
+    from routes.scholarship_routes import scholarship_bp, scholarship_service
+    from fake_gemini import FakeGeminiModel
+    model = FakeGeminiModel(latency=0.0, jitter=0.0)
+    scholarship_service.get().llm = LLMClient(default_model="fake-gemini", model_factory=lambda name: model)
+    app = Flask(__name__)
+    app.register_blueprint(scholarship_bp, url_prefix='/api/scholarship')
+    client = app.test_client()
+    
+    for value in ("false", "0", "no", False):
+        response = client.post('/api/scholarship/preparation-timeline',
+                               json={"departure_date": "2027-09-01", "include_narrative": value})
+        assert response.status_code == 200
+        assert response.get_json()["recommendations"]
+    assert model.calls == 0
+
+if __name__ == "__main__":
+    test_backward_dates_follow_country_template()
+    test_tight_timeline_marks_overdue_milestones()
+    test_days_bucket()
+    test_include_narrative_string_false_skips_the_model()
+    print("Timeline engine tests passed")
@@ -14,6 +14,21 @@ interface Message {
   timestamp: string;
 }
 
+const SESSION_HEADER = "X-Session-ID";
+const SESSION_STORAGE_KEY = "chatbot_session_id";
+
+const sessionHeaders = (): Record<string, string> => {
+  const sessionId = window.sessionStorage.getItem(SESSION_STORAGE_KEY);
+  return sessionId ? { [SESSION_HEADER]: sessionId } : {};
+};
+
+const rememberSession = (response: Response) => {
+  const sessionId = response.headers.get(SESSION_HEADER);
+  if (sessionId) {
+    window.sessionStorage.setItem(SESSION_STORAGE_KEY, sessionId);
+  }
+};
+
 export const ChatbotSection: React.FC = () => {
   const [messages, setMessages] = useState<Message[]>([]);
   const [inputMessage, setInputMessage] = useState("");
@@ -55,10 +70,11 @@ export const ChatbotSection: React.FC = () => {
         `${process.env.NEXT_PUBLIC_API_BASE_AI_URL}/chatbot/chat`,
         {
           method: "POST",
-          headers: { "Content-Type": "application/json" },
+          headers: { "Content-Type": "application/json", ...sessionHeaders() },
           body: JSON.stringify({ message: userMessage }),
         }
       );
+      rememberSession(response);
 
       const data = await response.json();
 
@@ -84,6 +100,7 @@ export const ChatbotSection: React.FC = () => {
         `${process.env.NEXT_PUBLIC_API_BASE_AI_URL}/chatbot/clear`,
         {
           method: "POST",
+          headers: sessionHeaders(),
         }
       );
 